@@ -0,0 +1 @@
+"""Load-test and micro-benchmark suite, run with ``python -m benchmarks``."""
@@ -0,0 +1,84 @@
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+from typing import List, Optional
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog='python -m benchmarks',
+        description='Benchmark the Holiday API against a seeded SQLite '
+                    'database and print the results as JSON.',
+    )
+    parser.add_argument('--countries', type=int, default=20)
+    parser.add_argument('--years', type=int, default=10)
+    parser.add_argument('--holidays', type=int, default=15,
+                        help='holidays per country and year')
+    parser.add_argument('--requests', type=int, default=500,
+                        help='requests per endpoint')
+    parser.add_argument('--concurrency', type=int, default=10)
+    parser.add_argument('--iterations', type=int, default=1000,
+                        help='iterations per micro-benchmark')
+    parser.add_argument('--no-socket', action='store_true',
+                        help='skip the runs over a real uvicorn socket')
+    parser.add_argument('--only', action='append', default=[],
+                        help='endpoint scenario to run (repeatable)')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--database', help='SQLite file to (re)create')
+    parser.add_argument('--output', help='write JSON here instead of stdout')
+    return parser.parse_args(argv)
+
+
+def git_revision() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', 'HEAD'], capture_output=True, check=True,
+            text=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    args = parse_args(argv)
+    database = args.database or os.path.join(
+        tempfile.mkdtemp(prefix='holiday-bench-'), 'bench.db')
+    # Settings are read when holiday_api is imported, so set them first.
+    os.environ['DATABASE_URL'] = f'sqlite:///{database}'
+
+    from benchmarks import suite  # pylint: disable=import-outside-toplevel
+
+    results = suite.run(
+        countries=args.countries,
+        years=args.years,
+        holidays=args.holidays,
+        requests=args.requests,
+        concurrency=args.concurrency,
+        iterations=args.iterations,
+        over_socket=not args.no_socket,
+        only=args.only,
+        seed_=args.seed,
+    )
+    results['environment'] = {
+        'git_revision': git_revision(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'database': os.environ['DATABASE_URL'],
+        'settings': {key: value for key, value in os.environ.items()
+                     if key in ('AUTH_CACHE_TTL', 'HOLIDAY_CACHE_MAX_BYTES',
+                                'FAST_JSON_RESPONSES', 'UNIQUE_USERS_MODE',
+                                'DB_THREADPOOL_SIZE')},
+    }
+    output = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, 'w') as file_:
+            file_.write(output + '\n')
+    else:
+        sys.stdout.write(output + '\n')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,160 @@
+import asyncio
+import base64
+import http.client
+import socket
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import uvicorn
+
+Headers = Dict[str, str]
+Request = Tuple[str, str, Headers, bytes]
+
+
+def basic_auth(username: str, password: str) -> Headers:
+    token = base64.b64encode(f'{username}:{password}'.encode()).decode()
+    return {'authorization': f'Basic {token}'}
+
+
+async def call_asgi(
+    app: Any,
+    method: str,
+    target: str,
+    headers: Optional[Headers] = None,
+    body: bytes = b'',
+) -> Tuple[int, bytes]:
+    """Send one HTTP request to ``app`` in-process, without a socket."""
+    path, _, query = target.partition('?')
+    raw_headers = [(b'host', b'bench')]
+    raw_headers += [(key.lower().encode(), value.encode())
+                    for key, value in (headers or {}).items()]
+    if body:
+        raw_headers.append((b'content-length', str(len(body)).encode()))
+    scope = {
+        'type': 'http',
+        'asgi': {'version': '3.0'},
+        'http_version': '1.1',
+        'method': method,
+        'scheme': 'http',
+        'path': path,
+        'raw_path': path.encode(),
+        'query_string': query.encode(),
+        'root_path': '',
+        'headers': raw_headers,
+        'client': ('198.51.100.7', 50000),
+        'server': ('bench', 80),
+    }
+    messages = [{'type': 'http.request', 'body': body, 'more_body': False}]
+    status = 0
+    chunks: List[bytes] = []
+
+    async def receive() -> Dict[str, Any]:
+        if messages:
+            return messages.pop(0)
+        await asyncio.Event().wait()
+        return {'type': 'http.disconnect'}
+
+    async def send(message: Dict[str, Any]) -> None:
+        nonlocal status
+        if message['type'] == 'http.response.start':
+            status = message['status']
+        elif message['type'] == 'http.response.body':
+            chunks.append(message.get('body', b''))
+
+    await app(scope, receive, send)
+    return status, b''.join(chunks)
+
+
+async def drive_asgi(
+    app: Any,
+    make_request: Callable[[int], Request],
+    requests: int,
+    concurrency: int,
+) -> Tuple[List[float], int, float]:
+    """Run ``requests`` requests with ``concurrency`` in flight."""
+    latencies: List[float] = []
+    errors = 0
+    counter = iter(range(requests))
+
+    async def worker() -> None:
+        nonlocal errors
+        for number in counter:
+            method, target, headers, body = make_request(number)
+            start = time.perf_counter()
+            status, _ = await call_asgi(app, method, target, headers, body)
+            latencies.append(time.perf_counter() - start)
+            if status >= 500:
+                errors += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return latencies, errors, time.perf_counter() - start
+
+
+class ServerThread:
+    """Serves ``app`` with uvicorn on a free local port in a thread."""
+
+    def __init__(self, app: Any):
+        with socket.socket() as sock:
+            sock.bind(('127.0.0.1', 0))
+            self.port = sock.getsockname()[1]
+        config = uvicorn.Config(
+            app, host='127.0.0.1', port=self.port,
+            log_level='warning', access_log=False, lifespan='on')
+        self.server = uvicorn.Server(config)
+        self.server.install_signal_handlers = lambda: None  # type: ignore
+        self.thread = threading.Thread(target=self.server.run, daemon=True)
+
+    def __enter__(self) -> 'ServerThread':
+        self.thread.start()
+        while not self.server.started:
+            time.sleep(0.01)
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.server.should_exit = True
+        self.thread.join()
+
+
+def drive_socket(
+    port: int,
+    make_request: Callable[[int], Request],
+    requests: int,
+    concurrency: int,
+) -> Tuple[List[float], int, float]:
+    """Like ``drive_asgi`` over keep-alive HTTP connections."""
+    latencies: List[float] = []
+    errors = [0]
+    lock = threading.Lock()
+    counter = iter(range(requests))
+
+    def worker() -> None:
+        connection = http.client.HTTPConnection('127.0.0.1', port)
+        try:
+            while True:
+                with lock:
+                    number = next(counter, None)
+                if number is None:
+                    return
+                method, target, headers, body = make_request(number)
+                start = time.perf_counter()
+                connection.request(method, target, body=body or None,
+                                   headers=headers)
+                response = connection.getresponse()
+                response.read()
+                elapsed = time.perf_counter() - start
+                with lock:
+                    latencies.append(elapsed)
+                    if response.status >= 500:
+                        errors[0] += 1
+        finally:
+            connection.close()
+
+    threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return latencies, errors[0], time.perf_counter() - start
@@ -0,0 +1,61 @@
+import datetime
+import random
+import string
+from typing import List, Tuple
+
+from holiday_api import database, models
+
+USERNAME = 'bench'
+PASSWORD = 'bench'
+
+
+def country_codes(count: int) -> List[str]:
+    letters = string.ascii_uppercase
+    codes = [a + b for a in letters for b in letters]
+    return codes[:count]
+
+
+def seed(
+    countries: int,
+    years: int,
+    holidays: int,
+    first_year: int = 2010,
+    seed_: int = 0,
+) -> Tuple[List[str], List[int]]:
+    """Create the schema and ``countries x years x holidays`` rows.
+
+    Returns the seeded country codes and years.
+    """
+    rng = random.Random(seed_)
+    database.Base.metadata.drop_all(database.engine)
+    database.Base.metadata.create_all(database.engine)
+    session = database.SessionLocal()
+    try:
+        user = models.User(
+            first_name='Bench', last_name='Mark', username=USERNAME)
+        user.set_password(PASSWORD)
+        session.add(user)
+        session.add(models.TotalUniqueUsers(id=1, count=0))
+        codes = country_codes(countries)
+        year_range = list(range(first_year, first_year + years))
+        table = models.Holiday.__table__
+        now = datetime.datetime.utcnow()
+        for country in codes:
+            rows = []
+            for year in year_range:
+                days = rng.sample(range(365), min(holidays, 365))
+                for number, day in enumerate(sorted(days)):
+                    rows.append({
+                        'name': f'Holiday {number} of {country}',
+                        'date': (datetime.date(year, 1, 1)
+                                 + datetime.timedelta(days=day)),
+                        'public': rng.random() < 0.7,
+                        'country': country,
+                        'updated_at': now,
+                    })
+            if rows:
+                session.execute(table.insert(), rows)
+        session.commit()
+    finally:
+        session.close()
+    return codes, year_range
@@ -0,0 +1,215 @@
+import asyncio
+import datetime
+import json
+import random
+import time
+from typing import Any, Callable, Dict, List
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.security import HTTPBasicCredentials
+from starlette.responses import JSONResponse
+
+from benchmarks import clients, seed
+from benchmarks.results import summarize
+from holiday_api import auth, database, models, serialization
+from holiday_api.main import app
+from holiday_api.routers.holidays import cache, schemas
+from holiday_api.routers.holidays.repository import \
+    SQLAlchemyHolidayRepository
+
+Scenario = Callable[[int], clients.Request]
+
+
+def scenarios(
+    countries: List[str],
+    years: List[int],
+    holiday_ids: List[int],
+    rng: random.Random,
+) -> Dict[str, Scenario]:
+    credentials = clients.basic_auth(seed.USERNAME, seed.PASSWORD)
+    json_headers = {**credentials, 'content-type': 'application/json'}
+
+    def partition() -> str:
+        return f'country={rng.choice(countries)}&year={rng.choice(years)}'
+
+    def create_body(number: int) -> bytes:
+        return json.dumps({
+            'name': f'Benchmark {number}',
+            'date': f'{rng.choice(years)}-06-{rng.randint(1, 30):02d}',
+            'public': True,
+            'country': rng.choice(countries),
+        }).encode()
+
+    return {
+        'list_holidays': lambda _: (
+            'GET', f'/holidays?{partition()}', {}, b''),
+        'list_holidays_month': lambda _: (
+            'GET', f'/holidays?{partition()}&month={rng.randint(1, 12)}',
+            {}, b''),
+        'read_holiday': lambda _: (
+            'GET', f'/holidays/item?id={rng.choice(holiday_ids)}',
+            credentials, b''),
+        'list_users': lambda _: ('GET', '/users', credentials, b''),
+        'metrics': lambda _: ('GET', '/metrics', credentials, b''),
+        'create_holiday': lambda number: (
+            'POST', '/holidays', json_headers, create_body(number)),
+        'update_holiday': lambda _: (
+            'PATCH', f'/holidays/item?id={rng.choice(holiday_ids)}',
+            json_headers, json.dumps({'public': rng.random() < 0.5}).encode()),
+    }
+
+
+def run_endpoints(
+    selected: Dict[str, Scenario],
+    requests: int,
+    concurrency: int,
+    over_socket: bool,
+) -> Dict[str, Any]:
+    results: Dict[str, Any] = {'in_process': {}}
+
+    async def in_process() -> None:
+        await app.router.startup()
+        try:
+            for name, scenario in selected.items():
+                latencies, errors, elapsed = await clients.drive_asgi(
+                    app, scenario, requests, concurrency)
+                results['in_process'][name] = summarize(
+                    latencies, elapsed, errors)
+        finally:
+            await app.router.shutdown()
+
+    asyncio.run(in_process())
+    if over_socket:
+        results['socket'] = {}
+        with clients.ServerThread(app) as server:
+            for name, scenario in selected.items():
+                latencies, errors, elapsed = clients.drive_socket(
+                    server.port, scenario, requests, concurrency)
+                results['socket'][name] = summarize(
+                    latencies, elapsed, errors)
+    return results
+
+
+def measure(func: Callable[[], Any], iterations: int) -> Dict[str, Any]:
+    latencies = []
+    start = time.perf_counter()
+    for _ in range(iterations):
+        call_start = time.perf_counter()
+        func()
+        latencies.append(time.perf_counter() - call_start)
+    return summarize(latencies, time.perf_counter() - start)
+
+
+def run_micro(
+    countries: List[str],
+    years: List[int],
+    iterations: int,
+    rng: random.Random,
+) -> Dict[str, Any]:
+    results: Dict[str, Any] = {}
+
+    async def middleware_chain() -> Dict[str, Any]:
+        # An unknown path runs every middleware but no endpoint.
+        await app.router.startup()
+        try:
+            latencies, errors, elapsed = await clients.drive_asgi(
+                app, lambda _: ('GET', '/__benchmark__', {}, b''),
+                iterations, 1)
+        finally:
+            await app.router.shutdown()
+        return summarize(latencies, elapsed, errors)
+
+    results['middleware_chain'] = asyncio.run(middleware_chain())
+
+    uow = database.UnitOfWork()
+    session = uow.session
+    try:
+        user = session.query(models.User).filter_by(
+            username=seed.USERNAME).one()
+        password_iterations = max(iterations // 20, 5)
+        results['pbkdf2_check_password'] = measure(
+            lambda: user.check_password(seed.PASSWORD), password_iterations)
+        credentials = HTTPBasicCredentials(
+            username=seed.USERNAME, password=seed.PASSWORD)
+        results['verify_credentials'] = measure(
+            lambda: auth.verify_credentials(session, credentials),
+            password_iterations)
+
+        repo = SQLAlchemyHolidayRepository(uow)
+
+        def filters() -> schemas.HolidayFilters:
+            return schemas.HolidayFilters(
+                country=rng.choice(countries), year=rng.choice(years),
+                month=rng.randint(1, 12), day=None, public=None)
+
+        max_bytes = cache.HOLIDAY_CACHE.max_bytes
+        try:
+            cache.HOLIDAY_CACHE.max_bytes = 0
+            results['get_holidays_uncached'] = measure(
+                lambda: repo.get_holidays(filters()), iterations)
+            cache.HOLIDAY_CACHE.max_bytes = max_bytes or 64 * 1024 * 1024
+            results['get_holidays_cached'] = measure(
+                lambda: repo.get_holidays(filters()), iterations)
+        finally:
+            cache.HOLIDAY_CACHE.max_bytes = max_bytes
+
+        holidays = repo.get_holidays(schemas.HolidayFilters(
+            country=countries[0], year=years[0], month=None, day=None,
+            public=None))
+        response = JSONResponse([])
+
+        def serialize_pydantic() -> bytes:
+            content = jsonable_encoder(
+                [schemas.HolidayOut.from_orm(holiday) for holiday in holidays])
+            return response.render(content)
+
+        results['serialize_holidays_pydantic'] = measure(
+            serialize_pydantic, iterations)
+        results['serialize_holidays_fast'] = measure(
+            lambda: serialization.dump_holidays(holidays), iterations)
+        results['serialize_holidays_rows'] = len(holidays)
+    finally:
+        uow.close()
+    return results
+
+
+def run(
+    countries: int,
+    years: int,
+    holidays: int,
+    requests: int,
+    concurrency: int,
+    iterations: int,
+    over_socket: bool,
+    only: List[str],
+    seed_: int,
+) -> Dict[str, Any]:
+    rng = random.Random(seed_)
+    seed_start = time.perf_counter()
+    codes, year_range = seed.seed(countries, years, holidays, seed_=seed_)
+    seed_elapsed = time.perf_counter() - seed_start
+    session = database.SessionLocal()
+    try:
+        holiday_ids = [id_ for id_, in session.query(models.Holiday.id)]
+    finally:
+        session.close()  # pylint: disable=no-member
+    available = scenarios(codes, year_range, holiday_ids, rng)
+    selected = {name: scenario for name, scenario in available.items()
+                if not only or name in only}
+    return {
+        'created_at': datetime.datetime.utcnow().isoformat() + 'Z',
+        'scale': {
+            'countries': countries,
+            'years': years,
+            'holidays_per_year': holidays,
+            'rows': len(holiday_ids),
+            'seed_s': round(seed_elapsed, 3),
+        },
+        'load': {
+            'requests_per_endpoint': requests,
+            'concurrency': concurrency,
+        },
+        'endpoints': run_endpoints(
+            selected, requests, concurrency, over_socket),
+        'micro': run_micro(codes, year_range, iterations, rng),
+    }
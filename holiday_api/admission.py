@@ -0,0 +1,145 @@
+import math
+import threading
+import time
+from collections import OrderedDict
+from typing import (AsyncIterator, Callable, Dict, Iterable, NamedTuple,
+                    Optional, Tuple)
+
+from fastapi import status
+from fastapi.responses import JSONResponse
+from prometheus_client import Counter
+
+THROTTLED = Counter(
+    'holiday_api_requests_throttled',
+    'Requests rejected by per-client rate limits.',
+    ['route'],
+)
+SHED = Counter(
+    'holiday_api_requests_shed',
+    'Requests rejected by the global concurrency limit.',
+)
+
+
+class Limit(NamedTuple):
+    rate: float  # tokens per second
+    burst: float
+
+
+def parse_limit(value: str) -> Optional[Limit]:
+    """Parse ``rate[:burst]``; an empty value means no limit."""
+    if not value.strip():
+        return None
+    rate, _, burst = value.partition(':')
+    limit = Limit(float(rate), float(burst or rate))
+    if limit.rate <= 0 or limit.burst < 1:
+        raise ValueError(f'Invalid rate limit: {value!r}')
+    return limit
+
+
+def parse_route_limits(values: Iterable[str]) -> Dict[str, Limit]:
+    """Parse ``METHOD /route/template=rate[:burst]`` entries."""
+    limits = {}
+    for value in values:
+        route, _, limit = value.rpartition('=')
+        if parsed := parse_limit(limit):
+            limits[' '.join(route.split())] = parsed
+    return limits
+
+
+class TokenBuckets:
+    """Token bucket per client, keeping the most recently seen clients."""
+
+    def __init__(self, max_clients: int):
+        self.max_clients = max_clients
+        # (client, route) -> (tokens, last update)
+        self._buckets: 'OrderedDict[Tuple[str, str], Tuple[float, float]]' = \
+            OrderedDict()
+        self._lock = threading.Lock()
+
+    def take(self, key: Tuple[str, str], limit: Limit) -> float:
+        """Take a token; return 0 or the seconds until one is available."""
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated = self._buckets.pop(key, (limit.burst, now))
+            tokens = min(limit.burst, tokens + (now - updated) * limit.rate)
+            if tokens >= 1:
+                tokens -= 1
+                wait = 0.0
+            else:
+                wait = (1 - tokens) / limit.rate
+            self._buckets[key] = (tokens, now)
+            if len(self._buckets) > self.max_clients:
+                self._buckets.popitem(last=False)
+        return wait
+
+
+class AdmissionController:
+    """Per-client rate limits and a global cap on requests in progress.
+
+    Routes are identified as ``METHOD /route/template``; routes without an
+    entry in ``route_limits`` share the ``default`` limit per client.
+    """
+
+    def __init__(
+        self,
+        default: Optional[Limit],
+        route_limits: Dict[str, Limit],
+        max_concurrency: int,
+        retry_after: float,
+        max_clients: int,
+    ):
+        self.default = default
+        self.route_limits = route_limits
+        self.max_concurrency = max_concurrency
+        self.retry_after = retry_after
+        self.buckets = TokenBuckets(max_clients)
+        self.in_progress = 0
+
+    def throttle(
+        self,
+        method: str,
+        route: str,
+        client: Optional[str],
+    ) -> float:
+        key = f'{method} {route}'
+        limit = self.route_limits.get(key, self.default)
+        if limit is None or client is None:
+            return 0.0
+        bucket = key if key in self.route_limits else ''
+        if wait := self.buckets.take((client, bucket), limit):
+            THROTTLED.labels(route=route).inc()
+        return wait
+
+    def enter(self) -> bool:
+        # Only called from the event loop, so no lock is needed.
+        if self.max_concurrency and self.in_progress >= self.max_concurrency:
+            SHED.inc()
+            return False
+        self.in_progress += 1
+        return True
+
+    def leave(self) -> None:
+        self.in_progress -= 1
+
+
+async def release_after(
+    body: AsyncIterator[bytes],
+    release: Callable[[], None],
+) -> AsyncIterator[bytes]:
+    """Yield ``body``, then call ``release``, also if sending stops early."""
+    try:
+        async for chunk in body:
+            yield chunk
+    finally:
+        release()
+
+
+def reject(status_code: int, retry_after: float) -> JSONResponse:
+    detail = ('Too many requests'
+              if status_code == status.HTTP_429_TOO_MANY_REQUESTS
+              else 'Server overloaded')
+    return JSONResponse(
+        {'detail': detail},
+        status_code=status_code,
+        headers={'Retry-After': str(max(1, math.ceil(retry_after)))},
+    )
@@ -1,32 +1,180 @@
+import hashlib
+import hmac
 import secrets
-from typing import Optional
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Set, Tuple
 
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBasic, HTTPBasicCredentials
 from sqlalchemy.orm import Session
 
-from holiday_api import models
-from holiday_api.database import get_session
+from holiday_api import config, models
+from holiday_api.instrumentation import timed
+from holiday_api.database import (UnitOfWork, get_unit_of_work,
+                                  run_in_executor)
 
 security = HTTPBasic()
 
 
+class CredentialsCache:
+    """Bounded TTL cache of successfully verified credentials.
+
+    Entries are keyed on an HMAC of the username, the stored password hash
+    and the password under a per-process secret, so plaintext passwords are
+    never kept in memory. Lookups pass the user's current password hash, so
+    a password changed or a user deleted by another worker stops matching
+    at once; ``invalidate`` only frees this worker's entries early.
+    Callers read ``generation`` before verifying credentials and pass it to
+    ``add``, which drops the entry if the user was invalidated meanwhile.
+    """
+
+    def __init__(self, ttl: float, max_size: int):
+        self.ttl = ttl
+        self.max_size = max_size
+        self._secret = secrets.token_bytes(32)
+        self._entries: 'OrderedDict[bytes, Tuple[int, float]]' = OrderedDict()
+        self._keys_by_user: Dict[int, Set[bytes]] = {}
+        self._generation = 0
+        # generation at which each user, or everyone, was last invalidated
+        self._invalidated_at: Dict[int, int] = {}
+        self._cleared_at = 0
+        self._lock = threading.Lock()
+
+    @property
+    def generation(self) -> int:
+        with self._lock:
+            return self._generation
+
+    def _digest(
+        self,
+        username: str,
+        password_hash: str,
+        password: str,
+    ) -> bytes:
+        message = b''.join(
+            len(part).to_bytes(4, 'big') + part
+            for part in (username.encode(), password_hash.encode(),
+                         password.encode()))
+        return hmac.new(self._secret, message, hashlib.sha256).digest()
+
+    def contains(
+        self,
+        username: str,
+        password_hash: str,
+        password: str,
+    ) -> bool:
+        if self.ttl <= 0:
+            return False
+        key = self._digest(username, password_hash, password)
+        with self._lock:
+            if entry := self._entries.get(key):
+                user_id, expires_at = entry
+                if expires_at > time.monotonic():
+                    self._entries.move_to_end(key)
+                    return True
+                self._remove(key, user_id)
+        return False
+
+    def add(
+        self,
+        username: str,
+        password_hash: str,
+        password: str,
+        user_id: int,
+        generation: int,
+    ) -> None:
+        if self.ttl <= 0:
+            return
+        key = self._digest(username, password_hash, password)
+        with self._lock:
+            # Drop the result if the user changed while it was verified.
+            if max(self._cleared_at,
+                   self._invalidated_at.get(user_id, 0)) > generation:
+                return
+            self._entries[key] = (user_id, time.monotonic() + self.ttl)
+            self._entries.move_to_end(key)
+            self._keys_by_user.setdefault(user_id, set()).add(key)
+            while len(self._entries) > self.max_size:
+                oldest_key, (oldest_user_id, _) = next(
+                    iter(self._entries.items()))
+                self._remove(oldest_key, oldest_user_id)
+
+    def invalidate(self, user_id: int) -> None:
+        with self._lock:
+            self._generation += 1
+            self._invalidated_at[user_id] = self._generation
+            for key in self._keys_by_user.pop(user_id, set()):
+                self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._generation += 1
+            self._cleared_at = self._generation
+            self._invalidated_at.clear()
+            self._entries.clear()
+            self._keys_by_user.clear()
+
+    def _remove(self, key: bytes, user_id: int) -> None:
+        del self._entries[key]
+        keys = self._keys_by_user.get(user_id, set())
+        keys.discard(key)
+        if not keys:
+            self._keys_by_user.pop(user_id, None)
+
+
+CREDENTIALS_CACHE = CredentialsCache(
+    ttl=config.AUTH_CACHE_TTL,
+    max_size=config.AUTH_CACHE_SIZE,
+)
+
+
 def get_user(db: Session, username: str) -> Optional[models.User]:
     user = db.query(  # type: ignore
         models.User).filter_by(username=username).first()
     return user  # type: ignore
 
 
-def authenticate(
+def check_credentials(
+    user: models.User,
+    credentials: HTTPBasicCredentials,
+) -> bool:
+    is_username_correct = secrets.compare_digest(
+        credentials.username, user.username)
+    is_password_correct = user.check_password(credentials.password)
+    return is_username_correct and is_password_correct
+
+
+def verify_credentials(
+    db: Session,
+    credentials: HTTPBasicCredentials,
+) -> Optional[models.User]:
+    if user := get_user(db, credentials.username):
+        if check_credentials(user, credentials):
+            return user
+    return None
+
+
+async def authenticate(
         credentials: HTTPBasicCredentials = Depends(security),
-        db: Session = Depends(get_session),
+        uow: UnitOfWork = Depends(get_unit_of_work),
 ) -> None:
-    if user := get_user(db, credentials.username):
-        is_username_correct = secrets.compare_digest(
-            credentials.username, user.username)
-        is_password_correct = user.check_password(credentials.password)
-        if is_username_correct and is_password_correct:
-            return
+    with timed('auth'):
+        generation = CREDENTIALS_CACHE.generation
+        user: Optional[models.User] = await run_in_executor(
+            get_user, uow.read_session, credentials.username)
+        if user is not None:
+            if CREDENTIALS_CACHE.contains(credentials.username,
+                                          user.password_hash,
+                                          credentials.password):
+                return
+            if await run_in_executor(check_credentials, user, credentials):
+                CREDENTIALS_CACHE.add(credentials.username,
+                                      user.password_hash,
+                                      credentials.password, user.id,
+                                      generation)
+                return
     raise HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail='Incorrect email or password',
@@ -1,5 +1,104 @@
 from starlette.config import Config
+from starlette.datastructures import CommaSeparatedStrings
 
 config = Config()
 
 DATABASE_URL = config('DATABASE_URL')
+DATABASE_REPLICA_URLS = config(
+    'DATABASE_REPLICA_URLS', cast=CommaSeparatedStrings, default='')
+# Clients read from the primary for this long after a successful write.
+READ_YOUR_WRITES_SECONDS = config(
+    'READ_YOUR_WRITES_SECONDS', cast=float, default=5.0)
+DB_THREADPOOL_SIZE = config('DB_THREADPOOL_SIZE', cast=int, default=15)
+DB_POOL_SIZE = config('DB_POOL_SIZE', cast=int, default=DB_THREADPOOL_SIZE)
+DB_MAX_OVERFLOW = config('DB_MAX_OVERFLOW', cast=int, default=10)
+DB_POOL_TIMEOUT = config('DB_POOL_TIMEOUT', cast=float, default=30.0)
+# Seconds after which connections are replaced, -1 keeps them forever.
+DB_POOL_RECYCLE = config('DB_POOL_RECYCLE', cast=int, default=1800)
+DB_POOL_PRE_PING = config('DB_POOL_PRE_PING', cast=bool, default=True)
+SQLITE_MMAP_SIZE = config(
+    'SQLITE_MMAP_SIZE', cast=int, default=256 * 1024 * 1024)
+# Positive values are pages, negative values are KiB (SQLite convention).
+SQLITE_CACHE_SIZE = config('SQLITE_CACHE_SIZE', cast=int, default=-64000)
+# Statements slower than this are logged to the holiday_api.sql logger.
+SLOW_QUERY_MS = config('SLOW_QUERY_MS', cast=float, default=100.0)
+
+# Shared directory for metrics of all worker processes. prometheus_client
+# reads the same (lowercase) variable from the environment on import.
+PROMETHEUS_MULTIPROC_DIR = config('prometheus_multiproc_dir', default=None)
+UNIQUE_USERS_METRIC_TTL = config(
+    'UNIQUE_USERS_METRIC_TTL', cast=float, default=5.0)
+
+# Per-client request rate as "rate[:burst]" per second, empty for none.
+RATE_LIMIT = config('RATE_LIMIT', default='')
+# Overrides as "METHOD /route/template=rate[:burst]", comma separated.
+ROUTE_RATE_LIMITS = config(
+    'ROUTE_RATE_LIMITS', cast=CommaSeparatedStrings, default='')
+RATE_LIMIT_MAX_CLIENTS = config(
+    'RATE_LIMIT_MAX_CLIENTS', cast=int, default=100000)
+# Requests in progress per worker before shedding with 503, 0 for no limit.
+MAX_CONCURRENT_REQUESTS = config(
+    'MAX_CONCURRENT_REQUESTS', cast=int, default=0)
+SHED_RETRY_AFTER = config('SHED_RETRY_AFTER', cast=float, default=1.0)
+
+STATS_FLUSH_INTERVAL = config('STATS_FLUSH_INTERVAL', cast=float, default=1.0)
+STATS_FLUSH_THRESHOLD = config('STATS_FLUSH_THRESHOLD', cast=int, default=1000)
+
+# 'exact' keeps one row per IP address, 'approximate' uses HyperLogLog.
+UNIQUE_USERS_MODE = config('UNIQUE_USERS_MODE', default='exact')
+HLL_PRECISION = config('HLL_PRECISION', cast=int, default=14)
+
+AUTH_CACHE_TTL = config('AUTH_CACHE_TTL', cast=float, default=60.0)
+AUTH_CACHE_SIZE = config('AUTH_CACHE_SIZE', cast=int, default=1024)
+
+HOLIDAY_CACHE_MAX_BYTES = config(
+    'HOLIDAY_CACHE_MAX_BYTES', cast=int, default=16 * 1024 * 1024)
+HOLIDAY_CACHE_TTL = config('HOLIDAY_CACHE_TTL', cast=float, default=60.0)
+HOLIDAY_CALENDAR_TTL = config(
+    'HOLIDAY_CALENDAR_TTL', cast=float, default=60.0)
+HOLIDAY_BITMAP_TTL = config('HOLIDAY_BITMAP_TTL', cast=float, default=60.0)
+HOLIDAY_RULES_TTL = config('HOLIDAY_RULES_TTL', cast=float, default=60.0)
+
+HTTP_CACHE_CONTROL = config('HTTP_CACHE_CONTROL', default='no-cache')
+
+BULK_IMPORT_BATCH_SIZE = config(
+    'BULK_IMPORT_BATCH_SIZE', cast=int, default=500)
+BULK_IMPORT_MAX_ERRORS = config(
+    'BULK_IMPORT_MAX_ERRORS', cast=int, default=1000)
+BULK_IMPORT_MAX_LINE_BYTES = config(
+    'BULK_IMPORT_MAX_LINE_BYTES', cast=int, default=64 * 1024)
+
+EXPORT_BATCH_SIZE = config('EXPORT_BATCH_SIZE', cast=int, default=1000)
+
+BATCH_QUERY_MAX_SELECTORS = config(
+    'BATCH_QUERY_MAX_SELECTORS', cast=int, default=100)
+BATCH_QUERY_MAX_PARTITIONS = config(
+    'BATCH_QUERY_MAX_PARTITIONS', cast=int, default=1000)
+BATCH_CHECK_MAX_DATES = config(
+    'BATCH_CHECK_MAX_DATES', cast=int, default=10000)
+
+CHANGE_FEED_POLL_INTERVAL = config(
+    'CHANGE_FEED_POLL_INTERVAL', cast=float, default=1.0)
+CHANGE_FEED_HEARTBEAT = config(
+    'CHANGE_FEED_HEARTBEAT', cast=float, default=15.0)
+CHANGE_FEED_BATCH_SIZE = config(
+    'CHANGE_FEED_BATCH_SIZE', cast=int, default=500)
+# Batches buffered per stream before a slow client has to catch up from
+# the database.
+CHANGE_FEED_QUEUE_SIZE = config(
+    'CHANGE_FEED_QUEUE_SIZE', cast=int, default=100)
+# Sequences re-read on every poll to pick up writes that committed out of
+# sequence order.
+CHANGE_FEED_LOOKBACK = config('CHANGE_FEED_LOOKBACK', cast=int, default=100)
+
+# Serve holiday reads from this snapshot file instead of the database,
+# see ``python -m holiday_api.snapshot``.
+HOLIDAY_SNAPSHOT_PATH = config('HOLIDAY_SNAPSHOT_PATH', default='')
+HOLIDAY_SNAPSHOT_CHECK_INTERVAL = config(
+    'HOLIDAY_SNAPSHOT_CHECK_INTERVAL', cast=float, default=5.0)
+
+PAGE_SIZE = config('PAGE_SIZE', cast=int, default=100)
+MAX_PAGE_SIZE = config('MAX_PAGE_SIZE', cast=int, default=1000)
+
+# Serialize list responses without per-item pydantic validation.
+FAST_JSON_RESPONSES = config('FAST_JSON_RESPONSES', cast=bool, default=False)
@@ -1,16 +1,102 @@
-from sqlalchemy import create_engine
+import asyncio
+import contextvars
+import functools
+import itertools
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, TypeVar
+
+from fastapi import Request
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine
+from sqlalchemy.engine.url import make_url
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
 
 import holiday_api.config as config
+from holiday_api import instrumentation
+
+
+def engine_options(url: str) -> Dict[str, Any]:
+    """Return ``create_engine`` arguments for the configured database."""
+    parsed = make_url(url)
+    options: Dict[str, Any] = {
+        'poolclass': instrumentation.InstrumentedQueuePool,
+        'pool_size': config.DB_POOL_SIZE,
+        'max_overflow': config.DB_MAX_OVERFLOW,
+        'pool_timeout': config.DB_POOL_TIMEOUT,
+    }
+    if parsed.get_backend_name() != 'sqlite':  # type: ignore
+        options.update(
+            pool_recycle=config.DB_POOL_RECYCLE,
+            pool_pre_ping=config.DB_POOL_PRE_PING,
+        )
+        return options
+    # In-memory databases exist per connection and keep the default pool.
+    if parsed.database in (None, '', ':memory:'):
+        options = {}
+    options['connect_args'] = {'check_same_thread': False}
+    return options
+
+
+def set_sqlite_pragmas(dbapi_connection: Any, _: Any) -> None:
+    # WAL lets readers proceed while another connection writes.
+    cursor = dbapi_connection.cursor()
+    cursor.execute('PRAGMA journal_mode=WAL')
+    cursor.execute('PRAGMA synchronous=NORMAL')
+    cursor.execute(f'PRAGMA mmap_size={config.SQLITE_MMAP_SIZE:d}')
+    cursor.execute(f'PRAGMA cache_size={config.SQLITE_CACHE_SIZE:d}')
+    cursor.close()
+
 
-engine = create_engine(config.DATABASE_URL, connect_args={
-                       'check_same_thread': False}, echo=True)
+def make_engine(url: str) -> Engine:
+    engine_ = create_engine(url, **engine_options(url))
+    if engine_.dialect.name == 'sqlite':
+        event.listen(engine_, 'connect', set_sqlite_pragmas)  # type: ignore
+    instrumentation.instrument_engine(engine_, config.SLOW_QUERY_MS)
+    instrumentation.instrument_pool(engine_.pool, config.DB_MAX_OVERFLOW)
+    return engine_
+
+
+engine = make_engine(config.DATABASE_URL)
 SessionLocal = sessionmaker(
     autocommit=False, autoflush=False, bind=engine)
 
+# Read-only sessions on replicas, used round-robin by replica_for.
+REPLICA_SESSIONS = [
+    sessionmaker(autocommit=False, autoflush=False, bind=make_engine(url))
+    for url in config.DATABASE_REPLICA_URLS
+]
+_replica_cycle = itertools.cycle(REPLICA_SESSIONS)
+_replica_lock = threading.Lock()
+
 Base = declarative_base()
 
+T = TypeVar('T')
+
+# Bounds the number of blocking database calls in flight per worker.
+DB_EXECUTOR = ThreadPoolExecutor(
+    max_workers=config.DB_THREADPOOL_SIZE,
+    thread_name_prefix='db',
+)
+
+
+async def run_in_executor(
+    func: Callable[..., T],
+    *args: Any,
+    **kwargs: Any,
+) -> T:
+    """Run blocking ``func`` on the database thread pool.
+
+    Calls beyond the pool size wait in its queue instead of blocking the
+    event loop.
+    """
+    loop = asyncio.get_event_loop()
+    context = contextvars.copy_context()
+    call = functools.partial(func, *args, **kwargs)
+    return await loop.run_in_executor(DB_EXECUTOR, context.run, call)
+
 
 def get_session() -> None:  # type: ignore
     try:
@@ -18,3 +104,128 @@ def get_session() -> None:  # type: ignore
         yield session
     finally:
         session.close()  # pylint: disable=no-member
+
+
+class RecentWriters:
+    """Clients that wrote within the last ``window`` seconds.
+
+    Tracked per process, so read-your-writes holds for clients whose
+    requests reach the same worker.
+    """
+
+    def __init__(self, window: float, max_size: int = 10000):
+        self.window = window
+        self.max_size = max_size
+        self._expiry: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def mark(self, client: str) -> None:
+        now = time.monotonic()
+        with self._lock:
+            if len(self._expiry) >= self.max_size:
+                self._expiry = {key: expires_at
+                                for key, expires_at in self._expiry.items()
+                                if expires_at > now}
+            self._expiry[client] = now + self.window
+
+    def __contains__(self, client: object) -> bool:
+        expires_at = self._expiry.get(client)  # type: ignore
+        return expires_at is not None and expires_at > time.monotonic()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._expiry.clear()
+
+
+RECENT_WRITERS = RecentWriters(window=config.READ_YOUR_WRITES_SECONDS)
+
+
+def client_key(request: Request) -> Optional[str]:
+    if not request.client:
+        return None
+    host: str = request.client.host
+    return host
+
+
+def replica_for(client: Optional[str]) -> Optional[sessionmaker]:
+    """The next replica in turn, or None to read from the primary.
+
+    Clients that wrote recently read from the primary.
+    """
+    if not REPLICA_SESSIONS or client in RECENT_WRITERS:
+        return None
+    with _replica_lock:
+        return next(_replica_cycle)
+
+
+class UnitOfWork:
+    """Request-scoped sessions, opened on first use and committed once.
+
+    Repositories flush their writes and register them with ``changed``;
+    ``commit`` then commits the primary session and runs the callbacks
+    registered with the changes, such as cache invalidations.
+    """
+
+    def __init__(self, replica: Optional[sessionmaker] = None):
+        self._replica = replica
+        self._session: Optional[Session] = None
+        self._read_session: Optional[Session] = None
+        self._changed = False
+        self._committed = False
+        self._after_commit: List[Callable[[], Any]] = []
+
+    @property
+    def session(self) -> Session:
+        if self._session is None:
+            self._session = SessionLocal()
+        return self._session
+
+    @property
+    def read_session(self) -> Session:
+        """A replica session, or the primary one without a replica."""
+        if self._replica is None:
+            return self.session
+        if self._read_session is None:
+            self._read_session = self._replica()
+        return self._read_session
+
+    @property
+    def uses_replica(self) -> bool:
+        return self._replica is not None
+
+    @property
+    def has_changes(self) -> bool:
+        return self._changed
+
+    @property
+    def committed(self) -> bool:
+        """Whether any changes were committed."""
+        return self._committed
+
+    def changed(self, *after_commit: Callable[[], Any]) -> None:
+        self._changed = True
+        self._after_commit.extend(after_commit)
+
+    def commit(self) -> None:
+        if self._session is not None:
+            self._session.commit()
+        callbacks, self._after_commit = self._after_commit, []
+        self._committed = self._committed or self._changed
+        self._changed = False
+        for callback in callbacks:
+            callback()
+
+    def rollback(self) -> None:
+        if self._session is not None:
+            self._session.rollback()
+        self._after_commit = []
+        self._changed = False
+
+    def close(self) -> None:
+        for session in (self._read_session, self._session):
+            if session is not None:
+                session.close()
+
+
+def get_unit_of_work(request: Request) -> UnitOfWork:
+    return request.state.unit_of_work  # type: ignore
@@ -0,0 +1,227 @@
+import contextlib
+import contextvars
+import logging
+import os
+import threading
+import time
+from typing import Any, Dict, Iterator, List, Optional
+
+from fastapi import Request
+from fastapi.responses import JSONResponse
+from prometheus_client import REGISTRY, CollectorRegistry, Gauge, Histogram
+from prometheus_client import multiprocess
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import Pool, QueuePool
+from starlette.routing import Match
+
+from holiday_api import config
+
+logger = logging.getLogger('holiday_api.sql')
+
+PHASES = ('db', 'auth', 'stats', 'render')
+UNHANDLED_ROUTE = '<unhandled>'
+
+REQUEST_PHASE_SECONDS = Histogram(
+    'holiday_api_request_phase_seconds',
+    'Time spent per request in each phase (in seconds).',
+    ['route', 'phase'],
+)
+DB_QUERIES_PER_REQUEST = Histogram(
+    'holiday_api_db_queries_per_request',
+    'Number of SQL statements executed per request.',
+    ['route'],
+    buckets=(0, 1, 2, 3, 5, 8, 13, 21, 34, 55, float('inf')),
+)
+POOL_CHECKOUT_SECONDS = Histogram(
+    'holiday_api_db_pool_checkout_seconds',
+    'Time spent waiting for a pooled database connection (in seconds).',
+    buckets=(.0001, .0005, .001, .005, .01, .05, .1, .5, 1.0, 5.0,
+             float('inf')),
+)
+POOL_CHECKED_OUT = Gauge(
+    'holiday_api_db_pool_checked_out',
+    'Database connections currently checked out of the pool.',
+    multiprocess_mode='livesum',
+)
+POOL_SATURATION = Gauge(
+    'holiday_api_db_pool_saturation',
+    'Checked out connections relative to pool size plus overflow.',
+    multiprocess_mode='liveall',
+)
+
+# Custom collectors; in multiprocess mode they are added to every scrape.
+_COLLECTORS: List[Any] = []
+
+
+def register_collector(collector: Any) -> None:
+    _COLLECTORS.append(collector)
+    if not config.PROMETHEUS_MULTIPROC_DIR:
+        REGISTRY.register(collector)
+
+
+def metrics_registry() -> CollectorRegistry:
+    """The registry to expose on ``/metrics``.
+
+    In multiprocess mode it aggregates the value files of all workers.
+    """
+    if not config.PROMETHEUS_MULTIPROC_DIR:
+        return REGISTRY
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry)
+    for collector in _COLLECTORS:
+        registry.register(collector)
+    return registry
+
+
+def mark_process_dead(pid: Optional[int] = None) -> None:
+    """Drop the live gauges of a stopped worker in multiprocess mode."""
+    if config.PROMETHEUS_MULTIPROC_DIR:
+        multiprocess.mark_process_dead(pid or os.getpid())
+
+
+class RequestTimings:
+    """Durations per phase and SQL statement count of one request.
+
+    Phases may be recorded from database threads, hence the lock.
+    """
+
+    def __init__(self) -> None:
+        self.durations: Dict[str, float] = {}
+        self.db_queries = 0
+        self._lock = threading.Lock()
+
+    def add(self, phase: str, seconds: float) -> None:
+        with self._lock:
+            self.durations[phase] = self.durations.get(phase, 0.0) + seconds
+
+    def add_query(self, seconds: float) -> None:
+        with self._lock:
+            self.durations['db'] = self.durations.get('db', 0.0) + seconds
+            self.db_queries += 1
+
+    def server_timing(self) -> str:
+        entries = []
+        for phase, seconds in self.durations.items():
+            entry = f'{phase};dur={seconds * 1000:.3f}'
+            if phase == 'db':
+                entry += f';desc="{self.db_queries} queries"'
+            entries.append(entry)
+        return ', '.join(entries)
+
+
+_CURRENT: contextvars.ContextVar[Optional[RequestTimings]] = \
+    contextvars.ContextVar('request_timings', default=None)
+
+
+def start_request() -> RequestTimings:
+    timings = RequestTimings()
+    _CURRENT.set(timings)
+    return timings
+
+
+@contextlib.contextmanager
+def timed(phase: str) -> Iterator[None]:
+    """Add the duration of the block to ``phase`` of the current request."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        if timings := _CURRENT.get():
+            timings.add(phase, time.perf_counter() - start)
+
+
+def get_route_template(request: Request) -> str:
+    for route in request.app.routes:
+        match, _ = route.matches(request.scope)
+        if match == Match.FULL:
+            return route.path  # type: ignore
+    return UNHANDLED_ROUTE
+
+
+def observe(route: str, timings: RequestTimings) -> None:
+    for phase in PHASES:
+        REQUEST_PHASE_SECONDS.labels(route=route, phase=phase).observe(
+            timings.durations.get(phase, 0.0))
+    DB_QUERIES_PER_REQUEST.labels(route=route).observe(timings.db_queries)
+
+
+class TimedJSONResponse(JSONResponse):
+    def render(self, content: Any) -> bytes:
+        with timed('render'):
+            return super().render(content)
+
+
+def instrument_engine(engine: Engine, slow_query_ms: float) -> None:
+    """Count statements per request and log those slower than the threshold."""
+
+    # pylint: disable=unused-variable,too-many-arguments
+    @event.listens_for(engine, 'before_cursor_execute')  # type: ignore
+    def before_cursor_execute(
+            conn: Any, cursor: Any, statement: str, parameters: Any,
+            context: Any, executemany: bool) -> None:
+        conn.info.setdefault('query_start_time', []).append(
+            time.perf_counter())
+
+    @event.listens_for(engine, 'after_cursor_execute')  # type: ignore
+    def after_cursor_execute(
+            conn: Any, cursor: Any, statement: str, parameters: Any,
+            context: Any, executemany: bool) -> None:
+        seconds = time.perf_counter() - conn.info['query_start_time'].pop()
+        if timings := _CURRENT.get():
+            timings.add_query(seconds)
+        if seconds * 1000 >= slow_query_ms:
+            logger.warning('Slow query (%.1f ms): %s',
+                           seconds * 1000, statement)
+
+    @event.listens_for(engine, 'handle_error')  # type: ignore
+    def handle_error(context: Any) -> None:
+        start_times = context.connection.info.get('query_start_time')
+        if start_times:
+            start_times.pop()
+
+
+@contextlib.contextmanager
+def timed_checkout() -> Iterator[None]:
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        POOL_CHECKOUT_SECONDS.observe(time.perf_counter() - start)
+
+
+class InstrumentedQueuePool(QueuePool):
+    """``QueuePool`` timing how long checkouts wait for a connection.
+
+    Sessions check out through ``connect`` and ``Engine.connect`` through
+    ``unique_connection``.
+    """
+
+    def connect(self) -> Any:
+        with timed_checkout():
+            return super().connect()  # type: ignore
+
+    def unique_connection(self) -> Any:
+        with timed_checkout():
+            return super().unique_connection()  # type: ignore
+
+
+def instrument_pool(pool: Pool, max_overflow: int) -> None:
+    """Export how many connections are checked out of a ``QueuePool``."""
+    if not isinstance(pool, QueuePool):
+        return
+    capacity = pool.size() + max(max_overflow, 0)  # type: ignore
+
+    def report_usage(checked_out: int) -> None:
+        POOL_CHECKED_OUT.set(checked_out)
+        POOL_SATURATION.set(checked_out / capacity if capacity else 0.0)
+
+    def checkout(*_: Any) -> None:
+        report_usage(pool.checkedout())  # type: ignore
+
+    def checkin(*_: Any) -> None:
+        # The connection is returned to the pool after this event.
+        report_usage(pool.checkedout() - 1)  # type: ignore
+
+    event.listen(pool, 'checkout', checkout)  # type: ignore
+    event.listen(pool, 'checkin', checkin)  # type: ignore
@@ -2,16 +2,23 @@ import time
 from ipaddress import ip_address
 from typing import Callable
 
-from fastapi import Depends, FastAPI, Request, Response
-from starlette_prometheus import PrometheusMiddleware, metrics
+from fastapi import Depends, FastAPI, Request, Response, status
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
+from starlette.background import BackgroundTask, BackgroundTasks
+from starlette_prometheus import PrometheusMiddleware
+
+from holiday_api import (admission, auth, config, database, instrumentation,
+                         stats)
+from holiday_api.routers import holidays, rules, users
+from holiday_api.routers.holidays.repository import (
+    SnapshotHolidayRepository, SQLAlchemyHolidayRepository)
 
-from holiday_api import auth, database, stats
-from holiday_api.routers import holidays, users
 
 app = FastAPI(
     title='Holiday API',
     description='Easy access to holiday data',
     redoc_url=None,
+    default_response_class=instrumentation.TimedJSONResponse,
 )
 
 app.include_router(
@@ -27,38 +34,157 @@ app.include_router(
     tags=['Holidays'],
 )
 
+app.include_router(
+    rules.ROUTER,
+    prefix='/rules',
+    tags=['Rules'],
+)
+
+if config.HOLIDAY_SNAPSHOT_PATH:
+    app.dependency_overrides[SQLAlchemyHolidayRepository] = \
+        SnapshotHolidayRepository
+
 app.add_middleware(PrometheusMiddleware)  # TODO prometheus server
 
+unique_users_store = (stats.UniqueUsersSketches
+                      if config.UNIQUE_USERS_MODE == 'approximate'
+                      else stats.UniqueUsers)
+
+unique_users_aggregator = stats.UniqueUsersAggregator(
+    flush_interval=config.STATS_FLUSH_INTERVAL,
+    flush_threshold=config.STATS_FLUSH_THRESHOLD,
+    store=unique_users_store,
+)
+
+admission_controller = admission.AdmissionController(
+    default=admission.parse_limit(config.RATE_LIMIT),
+    route_limits=admission.parse_route_limits(config.ROUTE_RATE_LIMITS),
+    max_concurrency=config.MAX_CONCURRENT_REQUESTS,
+    retry_after=config.SHED_RETRY_AFTER,
+    max_clients=config.RATE_LIMIT_MAX_CLIENTS,
+)
+
+instrumentation.register_collector(stats.UniqueUsersCollector(
+    store=unique_users_store,
+    ttl=config.UNIQUE_USERS_METRIC_TTL,
+))
+
+
+@app.on_event('startup')
+async def start_unique_users_aggregator() -> None:
+    await unique_users_aggregator.start()
+
+
+@app.on_event('shutdown')
+async def stop_unique_users_aggregator() -> None:
+    await unique_users_aggregator.stop()
+
+
+@app.on_event('shutdown')
+async def stop_change_broadcaster() -> None:
+    await holidays.CHANGE_BROADCASTER.stop()
+
+
+@app.on_event('shutdown')
+async def mark_metrics_process_dead() -> None:
+    instrumentation.mark_process_dead()
+
 
 @app.api_route(
     path='/metrics',
     dependencies=[Depends(auth.authenticate)],
     include_in_schema=False,
 )
-async def show_metrics(request: Request) -> Response:
-    return metrics(request)  # type: ignore
+async def show_metrics() -> Response:
+    body = await database.run_in_executor(
+        generate_latest, instrumentation.metrics_registry())
+    return Response(body, media_type=CONTENT_TYPE_LATEST)
 
 
 @app.middleware('http')
-async def update_unique_users_stats(
+async def manage_unit_of_work(
     request: Request,
     call_next: Callable,
 ) -> Response:
+    """Share one lazily opened unit of work per request and commit it once.
+
+    Sessions are closed after the response body is sent, so streamed
+    responses can keep reading.
+    """
+    client = database.client_key(request)
+    uow = database.UnitOfWork(replica=database.replica_for(client))
+    request.state.unit_of_work = uow
     try:
-        session = database.SessionLocal()
-        unique_users = stats.UniqueUsers(session)
-        unique_users.update(ip_address(request.client.host))
         response = await call_next(request)
-    finally:
-        session.close()  # pylint: disable=no-member
+        if uow.has_changes:
+            if response.status_code < 400:
+                await database.run_in_executor(uow.commit)
+            else:
+                await database.run_in_executor(uow.rollback)
+    except BaseException:
+        await database.run_in_executor(uow.close)
+        raise
+    if uow.committed and client and database.REPLICA_SESSIONS:
+        database.RECENT_WRITERS.mark(client)
+    # Close after any tasks the response already runs, which may read.
+    tasks = [response.background] if response.background else []
+    response.background = BackgroundTasks(
+        [*tasks, BackgroundTask(uow.close)])
+    return response  # type: ignore
+
+
+@app.middleware('http')
+async def update_unique_users_stats(
+    request: Request,
+    call_next: Callable,
+) -> Response:
+    with instrumentation.timed('stats'):
+        try:
+            client_ip = ip_address(request.client.host)
+        except ValueError:
+            pass
+        else:
+            unique_users_aggregator.add(client_ip)
+    response = await call_next(request)
     return response  # type: ignore
 
 
 @app.middleware('http')
 async def add_process_time_header(
         request: Request, call_next: Callable,) -> Response:
-    start_time = time.time()
+    timings = instrumentation.start_request()
+    start_time = time.perf_counter()
     response = await call_next(request)
-    process_time = (time.time() - start_time) * 1000
-    response.headers['Server-Timing'] = f'total;dur={process_time}'
+    timings.add('total', time.perf_counter() - start_time)
+    response.headers['Server-Timing'] = timings.server_timing()
+    instrumentation.observe(
+        instrumentation.get_route_template(request), timings)
+    return response  # type: ignore
+
+
+# Registered last so that it is the outermost middleware and rejects
+# requests before any other work is done.
+@app.middleware('http')
+async def admit_request(
+    request: Request,
+    call_next: Callable,
+) -> Response:
+    route = instrumentation.get_route_template(request)
+    client = database.client_key(request)
+    if wait := admission_controller.throttle(request.method, route, client):
+        return admission.reject(status.HTTP_429_TOO_MANY_REQUESTS, wait)
+    if not admission_controller.enter():
+        return admission.reject(
+            status.HTTP_503_SERVICE_UNAVAILABLE,
+            admission_controller.retry_after,
+        )
+    try:
+        response = await call_next(request)
+    except BaseException:
+        admission_controller.leave()
+        raise
+    # call_next returns once the headers are sent; streamed bodies such as
+    # exports and change streams hold their slot until they end.
+    response.body_iterator = admission.release_after(
+        response.body_iterator, admission_controller.leave)
     return response  # type: ignore
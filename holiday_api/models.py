@@ -1,6 +1,9 @@
 # pylint: disable=too-few-public-methods
 
-from sqlalchemy import Boolean, Column, Date, Integer, String, Text
+import datetime
+
+from sqlalchemy import (Boolean, Column, Date, DateTime, Index, Integer,
+                        LargeBinary, String, Text)
 from werkzeug.security import check_password_hash, generate_password_hash
 
 from holiday_api.database import Base
@@ -20,6 +23,13 @@ class TotalUniqueUsers(Base):
     count = Column(Integer, default=0, nullable=False)
 
 
+class UniqueUsersSketch(Base):
+    __tablename__ = 'unique_users_sketches'
+
+    period = Column(String, primary_key=True)
+    registers = Column(LargeBinary, nullable=False)
+
+
 class User(Base):
     __tablename__ = 'users'
 
@@ -39,9 +49,71 @@ class User(Base):
 
 class Holiday(Base):
     __tablename__ = 'holidays'
+    __table_args__ = (
+        Index('ix_holidays_country_date', 'country', 'date'),
+        Index('ix_holidays_country_public_date', 'country', 'public', 'date'),
+    )
 
     id = Column(Integer, primary_key=True)
     name = Column(String, nullable=False)
     date = Column(Date, nullable=False)
     public = Column(Boolean, nullable=False)
     country = Column(String, nullable=False)
+    updated_at = Column(DateTime, nullable=False,
+                        default=datetime.datetime.utcnow,
+                        onupdate=datetime.datetime.utcnow)
+
+
+class HolidayRule(Base):
+    """A recurring holiday, expanded into dates per year on demand."""
+    __tablename__ = 'holiday_rules'
+    __table_args__ = (
+        Index('ix_holiday_rules_country', 'country'),
+    )
+
+    id = Column(Integer, primary_key=True)
+    name = Column(String, nullable=False)
+    country = Column(String, nullable=False)
+    public = Column(Boolean, nullable=False)
+    # 'fixed' (month, day), 'nth_weekday' (month, weekday, nth) or
+    # 'easter' (offset in days from Easter Sunday).
+    kind = Column(String, nullable=False)
+    month = Column(Integer)
+    day = Column(Integer)
+    weekday = Column(Integer)
+    nth = Column(Integer)
+    offset = Column(Integer)
+    observed = Column(String, nullable=False, default='none')
+    year_from = Column(Integer)
+    year_to = Column(Integer)
+    updated_at = Column(DateTime, nullable=False,
+                        default=datetime.datetime.utcnow,
+                        onupdate=datetime.datetime.utcnow)
+
+
+class HolidayChange(Base):
+    """Append-only log of holiday writes, ordered by ``sequence``.
+
+    Writes of a single holiday record its id; bulk writes record only the
+    (country, year) partitions they touched.
+    """
+    __tablename__ = 'holiday_changes'
+    # Never reuse sequence numbers, even of deleted rows.
+    __table_args__ = {'sqlite_autoincrement': True}
+
+    sequence = Column(Integer, primary_key=True)
+    operation = Column(String, nullable=False)
+    holiday_id = Column(Integer)
+    country = Column(String, nullable=False)
+    year = Column(Integer, nullable=False)
+    changed_at = Column(DateTime, nullable=False)
+
+
+class HolidayPartitionVersion(Base):
+    """Version of all holidays of a country in a year, bumped on writes."""
+    __tablename__ = 'holiday_partition_versions'
+
+    country = Column(String, primary_key=True)
+    year = Column(Integer, primary_key=True, autoincrement=False)
+    version = Column(Integer, nullable=False)
+    updated_at = Column(DateTime, nullable=False)
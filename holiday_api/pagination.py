@@ -0,0 +1,50 @@
+# pylint: disable=too-few-public-methods
+
+import base64
+import json
+from typing import Any, Callable, Optional, Tuple
+
+import pydantic
+from fastapi import HTTPException, Query, Request, Response, status
+
+from holiday_api import config
+
+
+class PageParams(pydantic.BaseModel):
+    limit: int = Query(config.PAGE_SIZE, ge=1, le=config.MAX_PAGE_SIZE)
+    cursor: Optional[str] = Query(None)
+    paginate: bool = Query(True)
+
+
+def encode_cursor(*key: Any) -> str:
+    """Encode a keyset position as an opaque URL-safe token."""
+    data = json.dumps(key, separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(data).rstrip(b'=').decode()
+
+
+def decode_cursor(
+    cursor: str,
+    *parsers: Callable[[Any], Any],
+) -> Tuple[Any, ...]:
+    """Decode a token from ``encode_cursor``, parsing each key part."""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if not isinstance(values, list) or len(values) != len(parsers):
+            raise ValueError(cursor)
+        return tuple(parse(value) for parse, value in zip(parsers, values))
+    except (TypeError, ValueError):
+        raise HTTPException(  # pylint: disable=raise-missing-from
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail='Invalid cursor',
+        )
+
+
+def set_next_page(
+    request: Request,
+    response: Response,
+    next_cursor: str,
+) -> None:
+    url = request.url.include_query_params(cursor=next_cursor)
+    response.headers['Link'] = f'<{url}>; rel="next"'
+    response.headers['X-Next-Cursor'] = next_cursor
@@ -1,5 +1,7 @@
+from holiday_api.routers.holidays.changes import CHANGE_BROADCASTER
 from holiday_api.routers.holidays.router import ROUTER
 
 __all__ = [
+    'CHANGE_BROADCASTER',
     'ROUTER',
 ]
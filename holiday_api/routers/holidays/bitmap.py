@@ -0,0 +1,123 @@
+import datetime
+import threading
+import time
+from typing import Callable, Dict, Sequence, Tuple
+
+from prometheus_client import Gauge
+
+from holiday_api import config
+
+BITMAP_SIZE = Gauge(
+    'holiday_bitmap_bytes', 'Size of the loaded holiday bitmaps.',
+    multiprocess_mode='livesum',
+)
+
+# One bit per day of a (leap) year, rounded up to whole bytes.
+PLANE_BYTES = 46
+ALL, PUBLIC = 0, 1
+YEAR_BYTES = 2 * PLANE_BYTES
+
+HolidayDate = Tuple[datetime.date, bool]
+
+
+def _offset(date: datetime.date) -> Tuple[int, int]:
+    day = date.timetuple().tm_yday - 1
+    return day >> 3, 1 << (day & 7)
+
+
+class CountryBitmap:
+    """Holiday dates of one country as bit planes per year.
+
+    Years from the first to the last one with a holiday are stored back to
+    back in a single ``bytearray``, each as an all-holidays plane followed by
+    a public-holidays plane.
+    """
+
+    def __init__(self, dates: Sequence[HolidayDate]):
+        years = [date.year for date, _ in dates]
+        self.first_year = min(years, default=0)
+        self.last_year = max(years, default=-1)
+        self.bits = bytearray(
+            (self.last_year - self.first_year + 1) * YEAR_BYTES)
+        for date, public in dates:
+            base = (date.year - self.first_year) * YEAR_BYTES
+            byte, mask = _offset(date)
+            self.bits[base + byte] |= mask
+            if public:
+                self.bits[base + PLANE_BYTES + byte] |= mask
+
+    @property
+    def nbytes(self) -> int:
+        return len(self.bits)
+
+    def contains(self, date: datetime.date, public: bool = False) -> bool:
+        if not self.first_year <= date.year <= self.last_year:
+            return False
+        byte, mask = _offset(date)
+        index = ((date.year - self.first_year) * YEAR_BYTES
+                 + (PLANE_BYTES if public else 0) + byte)
+        return bool(self.bits[index] & mask)
+
+
+Entry = Tuple[CountryBitmap, float]
+
+
+class HolidayBitmapIndex:
+    """Per-country bitmaps, loaded on first use and dropped on writes.
+
+    ``ttl`` bounds staleness caused by writes handled by other processes.
+    """
+
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        # country -> (bitmap, expiry time)
+        self._entries: Dict[str, Entry] = {}
+        self._size = 0
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    def get_or_load(
+        self,
+        country: str,
+        loader: Callable[[str], Sequence[HolidayDate]],
+    ) -> CountryBitmap:
+        with self._lock:
+            if entry := self._entries.get(country):
+                bitmap, expires_at = entry
+                if expires_at > time.monotonic():
+                    return bitmap
+                self._remove(country)
+            generation = self._generation
+        bitmap = CountryBitmap(loader(country))
+        with self._lock:
+            # Drop the result if a write changed anything while loading.
+            if generation == self._generation:
+                if country in self._entries:
+                    self._remove(country)
+                self._entries[country] = (
+                    bitmap, time.monotonic() + self.ttl)
+                self._size += bitmap.nbytes
+                BITMAP_SIZE.set(self._size)
+        return bitmap
+
+    def invalidate(self, *countries: str) -> None:
+        with self._lock:
+            self._generation += 1
+            for country in countries:
+                if country in self._entries:
+                    self._remove(country)
+            BITMAP_SIZE.set(self._size)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+            self._size = 0
+            BITMAP_SIZE.set(0)
+
+    def _remove(self, country: str) -> None:
+        bitmap, _ = self._entries.pop(country)
+        self._size -= bitmap.nbytes
+
+
+HOLIDAY_BITMAPS = HolidayBitmapIndex(ttl=config.HOLIDAY_BITMAP_TTL)
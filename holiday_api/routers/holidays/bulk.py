@@ -0,0 +1,191 @@
+import csv
+import json
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+import pydantic
+from sqlalchemy.exc import SQLAlchemyError
+
+from holiday_api.database import run_in_executor
+from holiday_api.routers.holidays import schemas
+from holiday_api.routers.holidays.repository import HolidayRepository
+
+Row = Tuple[int, Optional[Dict[str, Any]], Optional[List[Dict[str, Any]]]]
+
+
+class LineTooLong(ValueError):
+    def __init__(self, line: int, max_length: int):
+        super().__init__(f'Line {line} is longer than {max_length} bytes')
+        self.line = line
+        self.max_length = max_length
+
+
+async def iter_lines(
+    chunks: AsyncIterator[bytes],
+    max_length: int,
+) -> AsyncIterator[bytes]:
+    """Split ``chunks`` into lines, buffering at most one partial line.
+
+    Raises ``LineTooLong`` as soon as a line exceeds ``max_length`` bytes.
+    """
+    buffer = b''
+    line_number = 0
+    async for chunk in chunks:
+        buffer += chunk
+        *lines, buffer = buffer.split(b'\n')
+        for line in lines:
+            line_number += 1
+            if len(line) > max_length:
+                raise LineTooLong(line_number, max_length)
+            yield line
+        if len(buffer) > max_length:
+            raise LineTooLong(line_number + 1, max_length)
+    if buffer:
+        yield buffer
+
+
+def _decode_error(error: UnicodeDecodeError) -> List[Dict[str, Any]]:
+    return [{'loc': [], 'msg': str(error), 'type': 'value_error.encoding'}]
+
+
+async def parse_ndjson(
+    chunks: AsyncIterator[bytes],
+    max_line_length: int,
+) -> AsyncIterator[Row]:
+    """Yield ``(line number, object, errors)`` for every non-blank line."""
+    line_number = 0
+    async for line in iter_lines(chunks, max_line_length):
+        line_number += 1
+        if not line.strip():
+            continue
+        try:
+            data = json.loads(line)
+        except UnicodeDecodeError as error:
+            yield line_number, None, _decode_error(error)
+        except ValueError as error:
+            yield line_number, None, [
+                {'loc': [], 'msg': str(error), 'type': 'value_error.json'}]
+        else:
+            yield line_number, data, None
+
+
+async def parse_csv(
+    chunks: AsyncIterator[bytes],
+    max_line_length: int,
+) -> AsyncIterator[Row]:
+    """Like ``parse_ndjson`` for CSV with a header line.
+
+    Records are read line by line, so quoted values cannot contain newlines.
+    """
+    header: Optional[List[str]] = None
+    line_number = 0
+    async for line in iter_lines(chunks, max_line_length):
+        line_number += 1
+        try:
+            text = line.decode('utf-8-sig' if line_number == 1 else 'utf-8')
+        except UnicodeDecodeError as error:
+            yield line_number, None, _decode_error(error)
+            continue
+        if not text.strip():
+            continue
+        values = next(csv.reader([text]))
+        if header is None:
+            header = [name.strip() for name in values]
+            continue
+        yield line_number, dict(zip(header, values)), None
+
+
+class HolidayImporter:
+    """Validates parsed rows and inserts them in batches.
+
+    In atomic mode all rows are inserted in one transaction that is rolled
+    back if any row fails; in best-effort mode each batch is committed and
+    invalid rows are skipped. A batch the database rejects in best-effort
+    mode is retried row by row, so only the failing lines are reported.
+    """
+
+    def __init__(
+        self,
+        repo: HolidayRepository,
+        mode: schemas.ImportMode,
+        batch_size: int,
+        max_errors: int,
+    ):
+        self.repo = repo
+        self.mode = mode
+        self.batch_size = batch_size
+        self.max_errors = max_errors
+        self.inserted = 0
+        self.failed = 0
+        self.errors: List[schemas.ImportRowError] = []
+        self._batch: List[Tuple[int, schemas.HolidayInPOST]] = []
+
+    async def run(self, rows: AsyncIterator[Row]) -> schemas.ImportResult:
+        async for line, data, errors in rows:
+            if errors is None:
+                try:
+                    holiday = schemas.HolidayInPOST.parse_obj(data)
+                except pydantic.ValidationError as error:
+                    errors = error.errors()
+            if errors is not None:
+                self._add_error(line, errors)
+            elif not self._is_aborted:
+                self._batch.append((line, holiday))
+                if len(self._batch) >= self.batch_size:
+                    await self._flush()
+        await self._finish()
+        return schemas.ImportResult(
+            mode=self.mode,
+            inserted=self.inserted,
+            failed=self.failed,
+            errors=self.errors,
+            errors_truncated=self.failed > len(self.errors),
+        )
+
+    @property
+    def _is_aborted(self) -> bool:
+        return self.mode == schemas.ImportMode.ATOMIC and self.failed > 0
+
+    def _add_error(self, line: int, errors: List[Dict[str, Any]]) -> None:
+        self.failed += 1
+        if len(self.errors) < self.max_errors:
+            self.errors.append(
+                schemas.ImportRowError(line=line, errors=errors))
+
+    async def _flush(self) -> None:
+        batch, self._batch = self._batch, []
+        if batch and not self._is_aborted:
+            await self._insert(batch)
+
+    async def _insert(
+        self,
+        batch: List[Tuple[int, schemas.HolidayInPOST]],
+    ) -> None:
+        try:
+            inserted = await run_in_executor(
+                self.repo.create_many, [holiday for _, holiday in batch])
+            if self.mode == schemas.ImportMode.BEST_EFFORT:
+                await run_in_executor(self.repo.commit)
+        except SQLAlchemyError as error:
+            await run_in_executor(self.repo.rollback)
+            if self.mode == schemas.ImportMode.ATOMIC:
+                self.inserted = 0
+            elif len(batch) > 1:
+                for row in batch:
+                    await self._insert([row])
+                return
+            message = str(getattr(error, 'orig', error))
+            for line, _ in batch:
+                self._add_error(line, [
+                    {'loc': [], 'msg': message, 'type': 'database_error'}])
+        else:
+            self.inserted += inserted
+
+    async def _finish(self) -> None:
+        await self._flush()
+        if self.mode != schemas.ImportMode.ATOMIC:
+            return
+        if self.failed:
+            await run_in_executor(self.repo.rollback)
+            self.inserted = 0
+        else:
+            await run_in_executor(self.repo.commit)
@@ -0,0 +1,203 @@
+import datetime
+import sys
+import threading
+import time
+from collections import OrderedDict
+from typing import (Callable, Dict, Iterable, List, NamedTuple, Optional,
+                    Sequence, Tuple)
+
+from prometheus_client import Counter, Gauge
+
+from holiday_api import config
+
+CACHE_HITS = Counter(
+    'holiday_cache_hits', 'Holiday partition cache hits.'
+)
+CACHE_MISSES = Counter(
+    'holiday_cache_misses', 'Holiday partition cache misses.'
+)
+CACHE_EVICTIONS = Counter(
+    'holiday_cache_evictions', 'Holiday partitions evicted from the cache.'
+)
+CACHE_SIZE = Gauge(
+    'holiday_cache_bytes', 'Estimated size of cached holiday partitions.',
+    multiprocess_mode='livesum',
+)
+
+Partition = Tuple[str, int]
+
+
+class CachedHoliday(NamedTuple):
+    id: int
+    name: str
+    date: datetime.date
+    public: bool
+    country: str
+
+
+# holidays, estimated size, expiry time, partition version if known
+Entry = Tuple[Tuple[CachedHoliday, ...], int, float, Optional[int]]
+
+
+def estimate_size(holidays: Iterable[CachedHoliday]) -> int:
+    size = 0
+    for holiday in holidays:
+        size += (sys.getsizeof(holiday) + sys.getsizeof(holiday.name)
+                 + sys.getsizeof(holiday.date))
+    return size
+
+
+class HolidayPartitionCache:
+    """Read-through LRU cache of date-sorted holidays per (country, year).
+
+    The cache is bounded by an estimated memory budget. Entries expire after
+    ``ttl`` seconds, which bounds staleness caused by writes handled by other
+    processes; writes in this process invalidate partitions immediately.
+    Callers that know the current partition version pass it to
+    ``get_or_load``, which reloads entries loaded for another version.
+    """
+
+    def __init__(self, max_bytes: int, ttl: float):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        # partition -> entry
+        self._entries: 'OrderedDict[Partition, Entry]' = OrderedDict()
+        self._size = 0
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_bytes > 0
+
+    def get_or_load(
+        self,
+        partition: Partition,
+        loader: Callable[[Partition], List[CachedHoliday]],
+        version: Optional[int] = None,
+    ) -> Tuple[CachedHoliday, ...]:
+        """Cached holidays of ``partition``, loaded on a miss.
+
+        The loader must read the partition after ``version`` was read, so
+        that the holidays are at least as recent as ``version``.
+        """
+        if not self.enabled:
+            return tuple(loader(partition))
+        with self._lock:
+            if (holidays := self._lookup(partition, version)) is not None:
+                CACHE_HITS.inc()
+                return holidays
+            generation = self._generation
+        CACHE_MISSES.inc()
+        holidays = tuple(loader(partition))
+        self._store(partition, holidays, generation, version)
+        return holidays
+
+    def get_many_or_load(
+        self,
+        partitions: Iterable[Partition],
+        loader: Callable[[Sequence[Partition]],
+                         Dict[Partition, List[CachedHoliday]]],
+    ) -> Dict[Partition, Tuple[CachedHoliday, ...]]:
+        """Like ``get_or_load`` for many partitions, loading the missing
+        ones with a single ``loader`` call."""
+        partitions = list(dict.fromkeys(partitions))
+        if not self.enabled:
+            loaded = loader(partitions)
+            return {partition: tuple(loaded.get(partition, ()))
+                    for partition in partitions}
+        found: Dict[Partition, Tuple[CachedHoliday, ...]] = {}
+        missing: List[Partition] = []
+        with self._lock:
+            for partition in partitions:
+                if (holidays := self._lookup(partition)) is not None:
+                    found[partition] = holidays
+                else:
+                    missing.append(partition)
+            generation = self._generation
+        CACHE_HITS.inc(len(found))
+        if missing:
+            CACHE_MISSES.inc(len(missing))
+            loaded = loader(missing)
+            for partition in missing:
+                holidays = tuple(loaded.get(partition, ()))
+                self._store(partition, holidays, generation)
+                found[partition] = holidays
+        return found
+
+    def _lookup(
+        self,
+        partition: Partition,
+        version: Optional[int] = None,
+    ) -> Optional[Tuple[CachedHoliday, ...]]:
+        if entry := self._entries.get(partition):
+            holidays, _, expires_at, entry_version = entry
+            if expires_at > time.monotonic() and (
+                    version is None or version == entry_version):
+                self._entries.move_to_end(partition)
+                return holidays
+            self._remove(partition)
+        return None
+
+    def _store(
+        self,
+        partition: Partition,
+        holidays: Tuple[CachedHoliday, ...],
+        generation: int,
+        version: Optional[int] = None,
+    ) -> None:
+        size = estimate_size(holidays)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            # Drop the result if a write invalidated anything while loading.
+            if generation != self._generation:
+                return
+            if partition in self._entries:
+                self._remove(partition)
+            self._entries[partition] = (
+                holidays, size, time.monotonic() + self.ttl, version)
+            self._size += size
+            while self._size > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+                CACHE_EVICTIONS.inc()
+            CACHE_SIZE.set(self._size)
+
+    def invalidate(self, *partitions: Partition) -> None:
+        with self._lock:
+            self._generation += 1
+            for partition in partitions:
+                if partition in self._entries:
+                    self._remove(partition)
+            CACHE_SIZE.set(self._size)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+            self._size = 0
+            CACHE_SIZE.set(0)
+
+    def _remove(self, partition: Partition) -> None:
+        _, size, _, _ = self._entries.pop(partition)
+        self._size -= size
+
+
+def filter_partition(
+    holidays: Iterable[CachedHoliday],
+    month: Optional[int] = None,
+    day: Optional[int] = None,
+    public: Optional[bool] = None,
+) -> List[CachedHoliday]:
+    return [
+        holiday for holiday in holidays
+        if (month is None or holiday.date.month == month)
+        and (day is None or holiday.date.day == day)
+        and (public is None or holiday.public == public)
+    ]
+
+
+HOLIDAY_CACHE = HolidayPartitionCache(
+    max_bytes=config.HOLIDAY_CACHE_MAX_BYTES,
+    ttl=config.HOLIDAY_CACHE_TTL,
+)
@@ -0,0 +1,155 @@
+import bisect
+import datetime
+import threading
+import time
+from typing import (Callable, Dict, Iterable, List, Optional, Sequence,
+                    Tuple)
+
+from holiday_api import config
+from holiday_api.routers.holidays.cache import CachedHoliday
+
+WORKING_WEEKDAYS = 5
+
+
+def weekdays_before(ordinal: int) -> int:
+    """Number of Monday to Friday dates with an ordinal below ``ordinal``.
+
+    Ordinal 1 (0001-01-01) is a Monday.
+    """
+    weeks, days = divmod(ordinal - 1, 7)
+    return weeks * WORKING_WEEKDAYS + min(days, WORKING_WEEKDAYS)
+
+
+def is_weekday(ordinal: int) -> bool:
+    return (ordinal - 1) % 7 < WORKING_WEEKDAYS
+
+
+class CountryCalendar:
+    """Holidays of one country sorted by (date, id), searched by bisection.
+
+    ``closed`` holds the distinct ordinals of public holidays on weekdays,
+    so the number of them in a range is the difference of two positions.
+    """
+
+    def __init__(self, holidays: Iterable[CachedHoliday]):
+        self.holidays = tuple(sorted(
+            holidays, key=lambda holiday: (holiday.date, holiday.id)))
+        self.ordinals = [holiday.date.toordinal() for holiday in self.holidays]
+        self.closed = sorted({
+            ordinal
+            for ordinal, holiday in zip(self.ordinals, self.holidays)
+            if holiday.public and is_weekday(ordinal)
+        })
+
+    def replace(
+        self,
+        removed_ids: Iterable[int] = (),
+        added: Iterable[CachedHoliday] = (),
+    ) -> 'CountryCalendar':
+        removed = set(removed_ids)
+        return CountryCalendar([
+            *(holiday for holiday in self.holidays
+              if holiday.id not in removed),
+            *added,
+        ])
+
+    def next_holidays(
+        self,
+        after: datetime.date,
+        limit: int,
+        public: Optional[bool] = None,
+    ) -> List[CachedHoliday]:
+        start = bisect.bisect_right(self.ordinals, after.toordinal())
+        holidays: List[CachedHoliday] = []
+        for holiday in self.holidays[start:]:
+            if len(holidays) >= limit:
+                break
+            if public is None or holiday.public == public:
+                holidays.append(holiday)
+        return holidays
+
+    def holidays_on(
+        self,
+        date: datetime.date,
+        public: Optional[bool] = None,
+    ) -> List[CachedHoliday]:
+        ordinal = date.toordinal()
+        start = bisect.bisect_left(self.ordinals, ordinal)
+        end = bisect.bisect_right(self.ordinals, ordinal, lo=start)
+        return [holiday for holiday in self.holidays[start:end]
+                if public is None or holiday.public == public]
+
+    def business_days(self, start: datetime.date, end: datetime.date) -> int:
+        """Weekdays in ``[start, end)`` that are not public holidays."""
+        first, last = start.toordinal(), end.toordinal()
+        if last <= first:
+            return 0
+        closed = (bisect.bisect_left(self.closed, last)
+                  - bisect.bisect_left(self.closed, first))
+        return weekdays_before(last) - weekdays_before(first) - closed
+
+
+Entry = Tuple[CountryCalendar, float]
+
+
+class HolidayCalendarIndex:
+    """Per-country calendars, loaded on first use and patched on writes.
+
+    Writes in this process replace the affected country's calendar right
+    after commit; ``ttl`` bounds staleness caused by other processes.
+    """
+
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        # country -> (calendar, expiry time)
+        self._entries: Dict[str, Entry] = {}
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    def get_or_load(
+        self,
+        country: str,
+        loader: Callable[[str], Sequence[CachedHoliday]],
+    ) -> CountryCalendar:
+        with self._lock:
+            if entry := self._entries.get(country):
+                calendar, expires_at = entry
+                if expires_at > time.monotonic():
+                    return calendar
+                del self._entries[country]
+            generation = self._generation
+        calendar = CountryCalendar(loader(country))
+        with self._lock:
+            # Drop the result if a write changed anything while loading.
+            if generation == self._generation:
+                self._entries[country] = (
+                    calendar, time.monotonic() + self.ttl)
+        return calendar
+
+    def apply(
+        self,
+        country: str,
+        removed_ids: Iterable[int] = (),
+        added: Iterable[CachedHoliday] = (),
+    ) -> None:
+        """Update a loaded calendar after a committed write."""
+        with self._lock:
+            self._generation += 1
+            if entry := self._entries.get(country):
+                calendar, expires_at = entry
+                self._entries[country] = (
+                    calendar.replace(removed_ids, added), expires_at)
+
+    def invalidate(self, *countries: str) -> None:
+        with self._lock:
+            self._generation += 1
+            for country in countries:
+                self._entries.pop(country, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+
+
+HOLIDAY_CALENDARS = HolidayCalendarIndex(ttl=config.HOLIDAY_CALENDAR_TTL)
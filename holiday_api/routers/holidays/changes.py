@@ -0,0 +1,276 @@
+import asyncio
+import json
+import logging
+from typing import (AsyncIterator, Callable, Iterable, List, Optional,
+                    Protocol, Set, Tuple)
+
+from fastapi import Request
+
+from holiday_api import config
+from holiday_api.database import UnitOfWork, replica_for, run_in_executor
+from holiday_api.routers.holidays.repository import (
+    HolidayChange, SQLAlchemyHolidayRepository)
+
+logger = logging.getLogger(__name__)
+
+MEDIA_TYPE = 'text/event-stream'
+HEARTBEAT = ': heartbeat\n\n'
+
+# None asks a stream that fell behind to catch up from the database.
+Batch = Optional[List[HolidayChange]]
+
+
+class ChangeLog(Protocol):
+    """The part of a holiday repository the change feed reads."""
+
+    def get_changes(self, after: int, limit: int) -> List[HolidayChange]:
+        raise NotImplementedError
+
+    def get_last_sequence(self) -> int:
+        raise NotImplementedError
+
+
+RepositoryFactory = Callable[[UnitOfWork], ChangeLog]
+
+
+def holiday_repository(request: Request) -> RepositoryFactory:
+    """The holiday repository endpoints get, honouring dependency overrides.
+
+    Streams outlive their request's unit of work, so they read through
+    short-lived ones instead.
+    """
+    factory: RepositoryFactory = request.app.dependency_overrides.get(
+        SQLAlchemyHolidayRepository, SQLAlchemyHolidayRepository)
+    return factory
+
+
+def load_changes(
+    repository: RepositoryFactory,
+    after: int,
+    limit: int,
+) -> List[HolidayChange]:
+    """Read changes in a short-lived unit of work outside any request."""
+    uow = UnitOfWork(replica=replica_for(None))
+    try:
+        return repository(uow).get_changes(after, limit)
+    finally:
+        uow.close()
+
+
+def load_recent_sequences(
+    repository: RepositoryFactory,
+    lookback: int,
+) -> Tuple[int, List[int]]:
+    """The last sequence and the sequences of the ``lookback`` before it."""
+    uow = UnitOfWork(replica=replica_for(None))
+    try:
+        repo = repository(uow)
+        last = repo.get_last_sequence()
+        recent = repo.get_changes(max(last - lookback, 0), lookback)
+        return last, [change.sequence for change in recent
+                      if change.sequence <= last]
+    finally:
+        uow.close()
+
+
+def format_event(change: HolidayChange, event_id: int) -> str:
+    data = change._asdict()
+    data['changed_at'] = change.changed_at.isoformat()
+    return (f'id: {event_id}\nevent: change\n'
+            f'data: {json.dumps(data, separators=(",", ":"))}\n\n')
+
+
+class SequenceWindow:
+    """Change sequences seen within ``size`` of the highest one.
+
+    Sequences are allocated when a write starts but become visible when it
+    commits, so on most databases a lower sequence can appear after higher
+    ones. Changes are de-duplicated by sequence within the window;
+    sequences at or below ``start`` are treated as seen, as are those at
+    or below ``floor``, which defaults to ``last``.
+    """
+
+    def __init__(
+        self,
+        size: int,
+        last: int = 0,
+        seen: Iterable[int] = (),
+        floor: Optional[int] = None,
+    ):
+        self.size = size
+        self.last = last
+        self.floor = last if floor is None else floor
+        self._seen = set(seen)
+
+    @property
+    def start(self) -> int:
+        return max(self.last - self.size, self.floor)
+
+    def add(self, sequence: int) -> bool:
+        """Record ``sequence``, returning whether it is new."""
+        if sequence <= self.start or sequence in self._seen:
+            return False
+        self._seen.add(sequence)
+        if sequence > self.last:
+            self.last = sequence
+            if len(self._seen) > 2 * self.size:
+                self._seen = {seen for seen in self._seen
+                              if seen > self.start}
+        return True
+
+
+class ChangeBroadcaster:
+    """Polls the change log once per process and fans it out to streams.
+
+    Polling runs only while streams are subscribed. Each poll re-reads the
+    last ``lookback`` sequences, so changes committed out of sequence order
+    are still delivered, once, to the queues subscribed at the time; a
+    queue that fills up is replaced by a single None.
+    """
+
+    def __init__(self, poll_interval: float, batch_size: int,
+                 queue_size: int, lookback: int):
+        self.poll_interval = poll_interval
+        self.batch_size = batch_size
+        self.queue_size = queue_size
+        self.lookback = lookback
+        self._window = SequenceWindow(lookback)
+        self._repository: RepositoryFactory = SQLAlchemyHolidayRepository
+        self._queues: Set['asyncio.Queue[Batch]'] = set()
+        self._task: Optional[asyncio.Task] = None
+        self._start_lock: Optional[asyncio.Lock] = None
+
+    @property
+    def position(self) -> int:
+        """The highest sequence published so far."""
+        return self._window.last
+
+    async def subscribe(
+        self,
+        repository: RepositoryFactory,
+    ) -> Tuple['asyncio.Queue[Batch]', int]:
+        """Return a new queue and the position it receives changes after.
+
+        Changes below the position that become visible later are delivered
+        through the queue too. The log is polled through ``repository``.
+        """
+        if self._start_lock is None:
+            self._start_lock = asyncio.Lock()
+        async with self._start_lock:
+            if self._task is None or self._task.done():
+                self._repository = repository
+                last, seen = await run_in_executor(
+                    load_recent_sequences, repository, self.lookback)
+                self._window = SequenceWindow(
+                    self.lookback, last, seen, floor=0)
+                self._task = asyncio.create_task(self._run())
+        queue: 'asyncio.Queue[Batch]' = asyncio.Queue(self.queue_size)
+        self._queues.add(queue)
+        return queue, self.position
+
+    def unsubscribe(self, queue: 'asyncio.Queue[Batch]') -> None:
+        self._queues.discard(queue)
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        self._start_lock = None
+
+    async def _run(self) -> None:
+        limit = self.lookback + self.batch_size
+        while self._queues:
+            changes: List[HolidayChange] = []
+            try:
+                changes = await run_in_executor(
+                    load_changes, self._repository, self._window.start,
+                    limit)
+            except Exception:  # pylint: disable=broad-except
+                logger.exception('Failed to poll holiday changes')
+            if new := [change for change in changes
+                       if self._window.add(change.sequence)]:
+                self._publish(new)
+            if len(changes) < limit:
+                await asyncio.sleep(self.poll_interval)
+
+    def _publish(self, changes: List[HolidayChange]) -> None:
+        for queue in self._queues:
+            try:
+                queue.put_nowait(changes)
+            except asyncio.QueueFull:
+                while not queue.empty():
+                    queue.get_nowait()
+                queue.put_nowait(None)
+
+
+async def _catch_up(
+    repository: RepositoryFactory,
+    after: int,
+    until: int,
+    batch_size: int,
+) -> AsyncIterator[HolidayChange]:
+    while after < until:
+        changes = await run_in_executor(
+            load_changes, repository, after, batch_size)
+        if not changes:
+            return
+        for change in changes:
+            yield change
+        after = changes[-1].sequence
+
+
+async def stream_changes(
+    request: Request,
+    broadcaster: ChangeBroadcaster,
+    repository: RepositoryFactory,
+    since: Optional[int],
+    heartbeat: float,
+) -> AsyncIterator[str]:
+    """Server-Sent Events for the changes after ``since``, then live ones.
+
+    ``since`` defaults to the last change when the stream starts.
+
+    A comment line is sent when nothing happened for ``heartbeat`` seconds;
+    the stream ends when the client disconnects. Changes committed out of
+    sequence order may arrive after higher sequences; each event's ``id``
+    is the highest sequence sent so far, to resume from.
+    """
+    queue, position = await broadcaster.subscribe(repository)
+    if since is None:
+        since = position
+    sent = SequenceWindow(broadcaster.lookback, last=since)
+    try:
+        async for change in _catch_up(
+                repository, since, position, broadcaster.batch_size):
+            if sent.add(change.sequence):
+                yield format_event(change, sent.last)
+        while not await request.is_disconnected():
+            try:
+                batch = await asyncio.wait_for(queue.get(), timeout=heartbeat)
+            except asyncio.TimeoutError:
+                yield HEARTBEAT
+                continue
+            if batch is None:
+                async for change in _catch_up(
+                        repository, sent.start, broadcaster.position,
+                        broadcaster.batch_size):
+                    if sent.add(change.sequence):
+                        yield format_event(change, sent.last)
+                continue
+            for change in batch:
+                if sent.add(change.sequence):
+                    yield format_event(change, sent.last)
+    finally:
+        broadcaster.unsubscribe(queue)
+
+
+CHANGE_BROADCASTER = ChangeBroadcaster(
+    poll_interval=config.CHANGE_FEED_POLL_INTERVAL,
+    batch_size=config.CHANGE_FEED_BATCH_SIZE,
+    queue_size=config.CHANGE_FEED_QUEUE_SIZE,
+    lookback=config.CHANGE_FEED_LOOKBACK,
+)
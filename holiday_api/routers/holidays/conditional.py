@@ -0,0 +1,65 @@
+import datetime
+import hashlib
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Any, Optional
+
+from fastapi import Request, Response, status
+
+from holiday_api import config
+
+
+def make_etag(*parts: Any) -> str:
+    digest = hashlib.sha1(repr(parts).encode()).hexdigest()
+    return f'"{digest}"'
+
+
+def _http_date(value: datetime.datetime) -> str:
+    return format_datetime(
+        value.replace(microsecond=0, tzinfo=datetime.timezone.utc),
+        usegmt=True,
+    )
+
+
+def is_not_modified(
+    request: Request,
+    etag: str,
+    last_modified: Optional[datetime.datetime],
+) -> bool:
+    """Evaluate ``If-None-Match`` and ``If-Modified-Since`` (RFC 7232)."""
+    if if_none_match := request.headers.get('if-none-match'):
+        tags = [tag.strip() for tag in if_none_match.split(',')]
+        return '*' in tags or etag in (
+            tag[2:] if tag.startswith('W/') else tag for tag in tags)
+    if_modified_since = request.headers.get('if-modified-since')
+    if if_modified_since and last_modified is not None:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        if since.tzinfo is None:
+            since = since.replace(tzinfo=datetime.timezone.utc)
+        modified = last_modified.replace(
+            microsecond=0, tzinfo=datetime.timezone.utc)
+        return modified <= since
+    return False
+
+
+def set_validators(
+    response: Response,
+    etag: str,
+    last_modified: Optional[datetime.datetime],
+) -> None:
+    response.headers['ETag'] = etag
+    if last_modified is not None:
+        response.headers['Last-Modified'] = _http_date(last_modified)
+    if config.HTTP_CACHE_CONTROL:
+        response.headers['Cache-Control'] = config.HTTP_CACHE_CONTROL
+
+
+def not_modified(
+    etag: str,
+    last_modified: Optional[datetime.datetime],
+) -> Response:
+    response = Response(status_code=status.HTTP_304_NOT_MODIFIED)
+    set_validators(response, etag, last_modified)
+    return response
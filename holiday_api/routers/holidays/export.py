@@ -0,0 +1,60 @@
+import csv
+import io
+import json
+from typing import AsyncIterator, Iterator, List, Optional
+
+from holiday_api.database import run_in_executor
+from holiday_api.routers.holidays import schemas
+from holiday_api.routers.holidays.repository import ExportedHoliday
+
+MEDIA_TYPES = {
+    schemas.ExportFormat.NDJSON: 'application/x-ndjson',
+    schemas.ExportFormat.CSV: 'text/csv',
+}
+
+
+def _as_row(holiday: ExportedHoliday) -> List[str]:
+    return [
+        str(holiday.id),
+        holiday.name,
+        holiday.date.isoformat(),
+        'true' if holiday.public else 'false',
+        holiday.country,
+        holiday.updated_at.isoformat(),
+    ]
+
+
+def encode_ndjson(holidays: List[ExportedHoliday]) -> bytes:
+    lines = []
+    for holiday in holidays:
+        data = holiday._asdict()
+        data['date'] = holiday.date.isoformat()
+        data['updated_at'] = holiday.updated_at.isoformat()
+        lines.append(json.dumps(data, ensure_ascii=False) + '\n')
+    return ''.join(lines).encode()
+
+
+def encode_csv(holidays: List[ExportedHoliday]) -> bytes:
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows(_as_row(holiday) for holiday in holidays)
+    return buffer.getvalue().encode()
+
+
+def next_batch(
+    batches: Iterator[List[ExportedHoliday]],
+) -> Optional[List[ExportedHoliday]]:
+    return next(batches, None)
+
+
+async def stream_holidays(
+    batches: Iterator[List[ExportedHoliday]],
+    format_: schemas.ExportFormat,
+) -> AsyncIterator[bytes]:
+    """Encode ``batches`` lazily, fetching each one on the database pool."""
+    if format_ == schemas.ExportFormat.CSV:
+        yield ','.join(ExportedHoliday._fields).encode() + b'\r\n'
+        encode = encode_csv
+    else:
+        encode = encode_ndjson
+    while batch := await run_in_executor(next_batch, batches):
+        yield encode(batch)
@@ -1,16 +1,93 @@
+import datetime
+import itertools
 from dataclasses import dataclass
-from typing import List, Optional, Protocol, TypeVar, Union
+from typing import (Any, Dict, Iterable, Iterator, List, NamedTuple,
+                    NoReturn, Optional, Protocol, Sequence, Set, Tuple,
+                    TypeVar, Union)
 
-from fastapi import Depends
-from sqlalchemy.orm import Session
-from sqlalchemy.sql.expression import extract
+from fastapi import Depends, HTTPException, status
+from sqlalchemy import and_, extract, func, or_
+from sqlalchemy.orm import Query, Session
 
 from holiday_api import models
-from holiday_api.database import get_session
+from holiday_api.database import (REPLICA_SESSIONS, UnitOfWork,
+                                  get_unit_of_work)
 from holiday_api.routers.holidays import schemas
+from holiday_api.routers.holidays.bitmap import (HOLIDAY_BITMAPS,
+                                                 CountryBitmap, HolidayDate)
+from holiday_api.routers.holidays.cache import (HOLIDAY_CACHE, CachedHoliday,
+                                                Partition, filter_partition)
+from holiday_api.routers.holidays.calendar import (HOLIDAY_CALENDARS,
+                                                   CountryCalendar)
+from holiday_api.snapshot import HOLIDAY_SNAPSHOT, Snapshot, SnapshotHoliday
 
 Holiday = TypeVar('Holiday')
 
+# Keyset pagination position: (date, id) of the last holiday returned.
+HolidayKey = Tuple[datetime.date, int]
+
+
+def date_range(
+    year: int,
+    month: Optional[int] = None,
+    day: Optional[int] = None,
+) -> Tuple[datetime.date, datetime.date]:
+    """Half-open date range, usable by the (country, date) indexes.
+
+    Raises ``ValueError`` for days that do not exist, e.g. 30 February.
+    """
+    if month is None:
+        return datetime.date(year, 1, 1), datetime.date(year + 1, 1, 1)
+    if day is None:
+        return (datetime.date(year, month, 1),
+                datetime.date(year + month // 12, month % 12 + 1, 1))
+    start = datetime.date(year, month, day)
+    return start, start + datetime.timedelta(days=1)
+
+
+def year_runs(years: Iterable[int]) -> List[Tuple[int, int]]:
+    """Group years into ``(first, last)`` runs of consecutive years."""
+    runs: List[Tuple[int, int]] = []
+    for year in sorted(years):
+        if runs and runs[-1][1] == year - 1:
+            runs[-1] = (runs[-1][0], year)
+        else:
+            runs.append((year, year))
+    return runs
+
+
+def cached_holiday(holiday: models.Holiday) -> CachedHoliday:
+    return CachedHoliday(
+        holiday.id, holiday.name, holiday.date, holiday.public,
+        holiday.country)
+
+
+def partition_of(holiday: models.Holiday) -> Partition:
+    return holiday.country, holiday.date.year
+
+
+class ExportedHoliday(NamedTuple):
+    id: int
+    name: str
+    date: datetime.date
+    public: bool
+    country: str
+    updated_at: datetime.datetime
+
+
+class PartitionVersion(NamedTuple):
+    version: int
+    updated_at: datetime.datetime
+
+
+class HolidayChange(NamedTuple):
+    sequence: int
+    operation: str
+    holiday_id: Optional[int]
+    country: str
+    year: int
+    changed_at: datetime.datetime
+
 
 class HolidayRepository(Protocol):
     def create(
@@ -19,15 +96,56 @@ class HolidayRepository(Protocol):
     ) -> Holiday:
         raise NotImplementedError
 
+    def create_many(self, holidays: List[schemas.HolidayInPOST]) -> int:
+        raise NotImplementedError
+
+    def commit(self) -> None:
+        raise NotImplementedError
+
+    def rollback(self) -> None:
+        raise NotImplementedError
+
     def get_holiday(self, id_: int) -> Optional[Holiday]:
         raise NotImplementedError
 
     def get_holidays(
         self,
         filters: schemas.HolidayFilters,
+        after: Optional[HolidayKey] = None,
+        limit: Optional[int] = None,
+        version: Optional[int] = None,
     ) -> List[Holiday]:
         raise NotImplementedError
 
+    def get_holidays_batch(
+        self,
+        selectors: List[schemas.HolidaySelector],
+    ) -> List[List[Holiday]]:
+        raise NotImplementedError
+
+    def iter_holidays(
+        self,
+        filters: schemas.HolidayExportFilters,
+        batch_size: int,
+    ) -> Iterator[List[ExportedHoliday]]:
+        raise NotImplementedError
+
+    def get_calendar(self, country: str) -> CountryCalendar:
+        raise NotImplementedError
+
+    def get_bitmap(self, country: str) -> CountryBitmap:
+        raise NotImplementedError
+
+    def get_holiday_version(self, id_: int) -> Optional[datetime.datetime]:
+        raise NotImplementedError
+
+    def get_partition_version(
+        self,
+        country: str,
+        year: int,
+    ) -> Optional[PartitionVersion]:
+        raise NotImplementedError
+
     def update(
         self,
         id_: int,
@@ -39,10 +157,43 @@ class HolidayRepository(Protocol):
     def delete(self, id_: int) -> bool:
         raise NotImplementedError
 
+    def count_many(self, selection: schemas.HolidaySelection) -> int:
+        raise NotImplementedError
+
+    def update_many(
+        self,
+        selection: schemas.HolidaySelection,
+        changes: schemas.HolidayChanges,
+    ) -> int:
+        raise NotImplementedError
+
+    def delete_many(self, selection: schemas.HolidaySelection) -> int:
+        raise NotImplementedError
+
+    def get_changes(self, after: int, limit: int) -> List[HolidayChange]:
+        raise NotImplementedError
+
+    def get_last_sequence(self) -> int:
+        raise NotImplementedError
+
 
 @dataclass
 class SQLAlchemyHolidayRepository:
-    session: Session = Depends(get_session)
+    """Holidays in the request's unit of work.
+
+    Writes are flushed, and committed at the end of the request unless
+    ``commit`` is called earlier; caches are updated after the commit.
+    """
+
+    uow: UnitOfWork = Depends(get_unit_of_work)
+
+    @property
+    def session(self) -> Session:
+        return self.uow.session
+
+    @property
+    def read_session(self) -> Session:
+        return self.uow.read_session
 
     def create(
         self,
@@ -50,28 +201,341 @@ class SQLAlchemyHolidayRepository:
     ) -> models.Holiday:
         holiday_db = models.Holiday(**holiday.dict())
         self.session.add(holiday_db)
-        self.session.commit()  # type: ignore
+        self.session.flush()
+        self._record_changes(
+            schemas.ChangeOperation.CREATE, [partition_of(holiday_db)],
+            holiday_db.id)
+        # Load the stored state here rather than lazily on the event loop.
+        self.session.refresh(holiday_db)
+        self._changed(
+            [partition_of(holiday_db)], added=[cached_holiday(holiday_db)])
         return holiday_db
 
+    def create_many(self, holidays: List[schemas.HolidayInPOST]) -> int:
+        """Insert ``holidays`` with one executemany."""
+        if not holidays:
+            return 0
+        rows = [holiday.dict() for holiday in holidays]
+        self.session.execute(
+            models.Holiday.__table__.insert(), rows)
+        partitions = {(row['country'], row['date'].year) for row in rows}
+        self._record_changes(schemas.ChangeOperation.CREATE, partitions)
+        self._changed(partitions)
+        return len(rows)
+
+    def commit(self) -> None:
+        self.uow.commit()
+
+    def rollback(self) -> None:
+        self.uow.rollback()
+
+    def _changed(
+        self,
+        partitions: Iterable[Partition],
+        removed_ids: Iterable[int] = (),
+        added: Optional[Iterable[CachedHoliday]] = None,
+    ) -> None:
+        """Register flushed changes to ``partitions`` with the unit of work.
+
+        Calendars are patched with ``removed_ids`` and ``added``, or
+        reloaded if ``added`` is None.
+        """
+        changed = set(partitions)
+        countries = {country for country, _ in changed}
+        removed = list(removed_ids)
+        added = None if added is None else list(added)
+
+        def update_caches() -> None:
+            HOLIDAY_CACHE.invalidate(*changed)
+            HOLIDAY_BITMAPS.invalidate(*countries)
+            if added is None:
+                HOLIDAY_CALENDARS.invalidate(*countries)
+                return
+            for country in countries:
+                HOLIDAY_CALENDARS.apply(
+                    country,
+                    removed_ids=removed,
+                    added=[holiday for holiday in added
+                           if holiday.country == country],
+                )
+
+        self.uow.changed(update_caches)
+
     def get_holiday(self, id_: int) -> Optional[models.Holiday]:
+        holiday = self.read_session.query(
+            models.Holiday).get(id_)
+        return holiday
+
+    def _get_for_write(self, id_: int) -> Optional[models.Holiday]:
         holiday = self.session.query(models.Holiday).get(id_)  # type: ignore
         return holiday  # type: ignore
 
+    @property
+    def _use_cache(self) -> bool:
+        # The cache is filled from replicas, so clients that must see their
+        # own writes bypass it and read the primary.
+        if REPLICA_SESSIONS and not self.uow.uses_replica:
+            return False
+        return HOLIDAY_CACHE.enabled
+
     def get_holidays(
         self,
         filters: schemas.HolidayFilters,
-    ) -> List[models.Holiday]:
-        query = self.session.query(models.Holiday)  # type: ignore
-        filters = filters.dict(exclude_none=True)  # type: ignore
-        for name, value in filters.items():  # type: ignore
-            if name in ('year', 'month', 'day'):
-                query = query.filter(
-                    extract(name, models.Holiday.date) == value)
-            else:
-                filter_dict = {name: value}
-                query = query.filter_by(**filter_dict)
-        holidays = query.all()
-        return holidays  # type: ignore
+        after: Optional[HolidayKey] = None,
+        limit: Optional[int] = None,
+        version: Optional[int] = None,
+    ) -> List[CachedHoliday]:
+        """Holidays matching ``filters`` ordered by (date, id).
+
+        ``after`` and ``limit`` select a page: at most ``limit`` holidays
+        that sort after the ``after`` key. ``version`` is the partition
+        version read earlier in this unit of work, e.g. for an ETag; cached
+        partitions loaded for another version are reloaded.
+        """
+        if not self._use_cache:
+            try:
+                start, end = date_range(
+                    filters.year, filters.month, filters.day)
+            except ValueError:
+                return []
+            return self._query_holidays(
+                filters.country, start, end, filters.public, after, limit)
+        partition = HOLIDAY_CACHE.get_or_load(
+            (filters.country, filters.year), self._load_partition, version)
+        holidays = filter_partition(
+            partition,
+            month=filters.month,
+            day=filters.day,
+            public=filters.public,
+        )
+        if after is not None:
+            holidays = [holiday for holiday in holidays
+                        if (holiday.date, holiday.id) > after]
+        return holidays[:limit]
+
+    def get_holidays_batch(
+        self,
+        selectors: List[schemas.HolidaySelector],
+    ) -> List[List[CachedHoliday]]:
+        """Holidays per selector, ordered by (date, id).
+
+        Partitions missing from the cache are loaded with one query.
+        """
+        partitions = [(selector.country, year)
+                      for selector in selectors for year in selector.years]
+        if self._use_cache:
+            loaded = HOLIDAY_CACHE.get_many_or_load(
+                partitions, self._load_partitions)
+        else:
+            loaded = self._load_partitions(partitions)  # type: ignore
+        return [
+            [holiday
+             for year in selector.years
+             for holiday in loaded.get((selector.country, year), ())
+             if selector.public is None or holiday.public == selector.public]
+            for selector in selectors
+        ]
+
+    def _load_partitions(
+        self,
+        partitions: Sequence[Partition],
+    ) -> Dict[Partition, List[CachedHoliday]]:
+        years: Dict[str, Set[int]] = {}
+        for country, year in partitions:
+            years.setdefault(country, set()).add(year)
+        ranges = [
+            and_(
+                models.Holiday.country == country,
+                models.Holiday.date >= datetime.date(first, 1, 1),
+                models.Holiday.date < datetime.date(last + 1, 1, 1),
+            )
+            for country, country_years in years.items()
+            for first, last in year_runs(country_years)
+        ]
+        query = self.read_session.query(
+            models.Holiday.id,
+            models.Holiday.name,
+            models.Holiday.date,
+            models.Holiday.public,
+            models.Holiday.country,
+        ).filter(or_(*ranges)).order_by(models.Holiday.date, models.Holiday.id)
+        loaded: Dict[Partition, List[CachedHoliday]] = {
+            partition: [] for partition in partitions}
+        for row in query:
+            holiday = CachedHoliday(*row)
+            loaded[holiday.country, holiday.date.year].append(holiday)
+        return loaded
+
+    def _load_partition(self, partition: Partition) -> List[CachedHoliday]:
+        country, year = partition
+        return self._query_holidays(country, *date_range(year))
+
+    def _query_holidays(
+        self,
+        country: str,
+        start: datetime.date,
+        end: datetime.date,
+        public: Optional[bool] = None,
+        after: Optional[HolidayKey] = None,
+        limit: Optional[int] = None,
+    ) -> List[CachedHoliday]:
+        query = self.read_session.query(
+            models.Holiday.id,
+            models.Holiday.name,
+            models.Holiday.date,
+            models.Holiday.public,
+            models.Holiday.country,
+        ).filter(
+            models.Holiday.country == country,
+            models.Holiday.date >= start,
+            models.Holiday.date < end,
+        )
+        if public is not None:
+            query = query.filter(models.Holiday.public == public)
+        if after is not None:
+            after_date, after_id = after
+            query = query.filter(or_(
+                models.Holiday.date > after_date,
+                and_(models.Holiday.date == after_date,
+                     models.Holiday.id > after_id),
+            ))
+        query = query.order_by(models.Holiday.date, models.Holiday.id)
+        if limit is not None:
+            query = query.limit(limit)
+        return [CachedHoliday(*row) for row in query]
+
+    def iter_holidays(
+        self,
+        filters: schemas.HolidayExportFilters,
+        batch_size: int,
+    ) -> Iterator[List[ExportedHoliday]]:
+        """Yield matching holidays in id order, ``batch_size`` at a time.
+
+        Rows are fetched with ``yield_per`` (a server-side cursor where the
+        driver supports it), so memory use does not depend on table size.
+        """
+        query = self.read_session.query(
+            *(getattr(models.Holiday, name)
+              for name in ExportedHoliday._fields))
+        if filters.country:
+            query = query.filter(models.Holiday.country.in_(filters.country))
+        if filters.date_from:
+            query = query.filter(models.Holiday.date >= filters.date_from)
+        if filters.date_to:
+            query = query.filter(models.Holiday.date <= filters.date_to)
+        if filters.changed_since:
+            query = query.filter(
+                models.Holiday.updated_at >= filters.changed_since)
+        rows = iter(query.order_by(models.Holiday.id).yield_per(batch_size))
+        while batch := list(itertools.islice(rows, batch_size)):
+            yield [ExportedHoliday(*row) for row in batch]
+
+    def get_calendar(self, country: str) -> CountryCalendar:
+        return HOLIDAY_CALENDARS.get_or_load(country, self._load_calendar)
+
+    def _load_calendar(self, country: str) -> List[CachedHoliday]:
+        query = self.read_session.query(
+            models.Holiday.id,
+            models.Holiday.name,
+            models.Holiday.date,
+            models.Holiday.public,
+            models.Holiday.country,
+        ).filter(models.Holiday.country == country)
+        return [CachedHoliday(*row) for row in query]
+
+    def get_bitmap(self, country: str) -> CountryBitmap:
+        return HOLIDAY_BITMAPS.get_or_load(country, self._load_dates)
+
+    def _load_dates(self, country: str) -> List[HolidayDate]:
+        query = self.read_session.query(
+            models.Holiday.date,
+            models.Holiday.public,
+        ).filter(models.Holiday.country == country)
+        return [(date, public) for date, public in query]
+
+    def get_holiday_version(self, id_: int) -> Optional[datetime.datetime]:
+        updated_at = self.read_session.query(  # type: ignore
+            models.Holiday.updated_at).filter_by(id=id_).scalar()
+        return updated_at  # type: ignore
+
+    def get_partition_version(
+        self,
+        country: str,
+        year: int,
+    ) -> Optional[PartitionVersion]:
+        row = self.read_session.query(
+            models.HolidayPartitionVersion.version,
+            models.HolidayPartitionVersion.updated_at,
+        ).filter_by(country=country, year=year).first()
+        return PartitionVersion(*row) if row else None
+
+    def _record_changes(
+        self,
+        operation: schemas.ChangeOperation,
+        partitions: Iterable[Partition],
+        holiday_id: Optional[int] = None,
+    ) -> None:
+        """Bump partition versions and append to the change log, in the
+        transaction of the write."""
+        partitions = set(partitions)
+        if not partitions:
+            return
+        self._bump_versions(partitions)
+        now = datetime.datetime.utcnow()
+        self.session.execute(
+            models.HolidayChange.__table__.insert(),
+            [{'operation': operation.value, 'holiday_id': holiday_id,
+              'country': country, 'year': year, 'changed_at': now}
+             for country, year in sorted(partitions)],
+        )
+
+    def get_changes(self, after: int, limit: int) -> List[HolidayChange]:
+        """Up to ``limit`` changes with a sequence above ``after``."""
+        query = self.read_session.query(
+            *(getattr(models.HolidayChange, name)
+              for name in HolidayChange._fields)
+        ).filter(models.HolidayChange.sequence > after)\
+            .order_by(models.HolidayChange.sequence).limit(limit)
+        return [HolidayChange(*row) for row in query]
+
+    def get_last_sequence(self) -> int:
+        sequence = self.read_session.query(  # type: ignore
+            func.max(models.HolidayChange.sequence)).scalar()
+        return sequence or 0
+
+    def _bump_versions(self, partitions: Iterable[Partition]) -> None:
+        """Bump the versions of ``partitions`` with a single UPDATE.
+
+        Partitions without a version row yet are inserted afterwards.
+        """
+        partitions = set(partitions)
+        if not partitions:
+            return
+        table = models.HolidayPartitionVersion.__table__
+        now = datetime.datetime.utcnow()
+        selected = or_(*(
+            and_(table.c.country == country, table.c.year == year)
+            for country, year in partitions
+        ))
+        result = self.session.execute(
+            table.update()
+            .where(selected)
+            .values(version=table.c.version + 1, updated_at=now))
+        if result.rowcount == len(partitions):
+            return
+        existing = {
+            (country, year)
+            for country, year in self.session.execute(
+                table.select().with_only_columns(
+                    [table.c.country, table.c.year]).where(selected))
+        }
+        missing = [
+            {'country': country, 'year': year,
+             'version': 1, 'updated_at': now}
+            for country, year in partitions - existing
+        ]
+        if missing:
+            self.session.execute(table.insert(), missing)
 
     def update(
         self,
@@ -79,15 +543,212 @@ class SQLAlchemyHolidayRepository:
         holiday: Union[schemas.HolidayInPUT,
                        schemas.HolidayInPATCH],
     ) -> Optional[models.Holiday]:
-        if holiday_db := self.get_holiday(id_):
+        if holiday_db := self._get_for_write(id_):
+            old_partition = partition_of(holiday_db)
             self.session.query(  # type: ignore
                 models.Holiday).filter_by(id=id_)\
                 .update(holiday.dict(exclude_unset=True))
-            self.session.commit()  # type: ignore
+            new_partition = partition_of(holiday_db)
+            self._record_changes(
+                schemas.ChangeOperation.UPDATE,
+                {old_partition, new_partition}, id_)
+            self.session.flush()
+            self.session.refresh(holiday_db)
+            self._changed(
+                [old_partition, new_partition],
+                removed_ids=[id_],
+                added=[cached_holiday(holiday_db)],
+            )
         return holiday_db
 
     def delete(self, id_: int,) -> Optional[models.Holiday]:
-        if holiday_db := self.get_holiday(id_):
+        if holiday_db := self._get_for_write(id_):
+            partition = partition_of(holiday_db)
             self.session.delete(holiday_db)  # type: ignore
-            self.session.commit()  # type: ignore
+            self._record_changes(
+                schemas.ChangeOperation.DELETE, [partition], id_)
+            self.session.flush()
+            self._changed([partition], removed_ids=[id_], added=[])
         return holiday_db
+
+    def _select(self, selection: schemas.HolidaySelection) -> Query:
+        query = self.session.query(models.Holiday).filter(
+            models.Holiday.country == selection.country)
+        if selection.date_from:
+            query = query.filter(models.Holiday.date >= selection.date_from)
+        if selection.date_to:
+            query = query.filter(models.Holiday.date <= selection.date_to)
+        if selection.name is not None:
+            query = query.filter(models.Holiday.name == selection.name)
+        if selection.public is not None:
+            query = query.filter(models.Holiday.public == selection.public)
+        return query
+
+    def _selected_partitions(self, query: Query) -> Set[Partition]:
+        year = extract('year', models.Holiday.date)
+        return {
+            (country, int(year))
+            for country, year in query.with_entities(  # type: ignore
+                models.Holiday.country, year).distinct()
+        }
+
+    def count_many(self, selection: schemas.HolidaySelection) -> int:
+        count = self._select(selection).with_entities(  # type: ignore
+            func.count(models.Holiday.id)).scalar()
+        return count  # type: ignore
+
+    def update_many(
+        self,
+        selection: schemas.HolidaySelection,
+        changes: schemas.HolidayChanges,
+    ) -> int:
+        """Apply ``changes`` to all selected holidays with one UPDATE."""
+        query = self._select(selection)
+        partitions = self._selected_partitions(query)
+        if not partitions:
+            return 0
+        updated: int = query.update(
+            changes.dict(exclude_none=True), synchronize_session=False)
+        self._record_changes(schemas.ChangeOperation.UPDATE, partitions)
+        self._changed(partitions)
+        return updated
+
+    def delete_many(self, selection: schemas.HolidaySelection) -> int:
+        """Delete all selected holidays with one DELETE."""
+        query = self._select(selection)
+        partitions = self._selected_partitions(query)
+        if not partitions:
+            return 0
+        deleted: int = query.delete(synchronize_session=False)
+        self._record_changes(schemas.ChangeOperation.DELETE, partitions)
+        self._changed(partitions)
+        return deleted
+
+
+def _read_only(*_args: Any, **_kwargs: Any) -> NoReturn:
+    raise HTTPException(
+        status_code=status.HTTP_405_METHOD_NOT_ALLOWED,
+        detail='Holidays are read-only on this server',
+    )
+
+
+def _cached_holiday(holiday: SnapshotHoliday) -> CachedHoliday:
+    return CachedHoliday(
+        holiday.id, holiday.name, holiday.date, holiday.public,
+        holiday.country)
+
+
+@dataclass
+class SnapshotHolidayRepository:
+    """Holidays read from the memory-mapped ``HOLIDAY_SNAPSHOT_PATH``.
+
+    Reads never touch the database; the unit of work is only taken so that
+    both implementations are constructed alike. Writes raise 405, and the
+    change log is not part of snapshots, so it reads as empty.
+    """
+
+    uow: UnitOfWork = Depends(get_unit_of_work)
+
+    @property
+    def snapshot(self) -> Snapshot:
+        return HOLIDAY_SNAPSHOT.get()
+
+    create = create_many = update = delete = _read_only
+    count_many = update_many = delete_many = _read_only
+
+    def commit(self) -> None:
+        pass
+
+    def rollback(self) -> None:
+        pass
+
+    def get_holiday(self, id_: int) -> Optional[SnapshotHoliday]:
+        return self.snapshot.holiday(id_)
+
+    def get_holidays(
+        self,
+        filters: schemas.HolidayFilters,
+        after: Optional[HolidayKey] = None,
+        limit: Optional[int] = None,
+        version: Optional[int] = None,
+    ) -> List[CachedHoliday]:
+        holidays = filter_partition(
+            [_cached_holiday(holiday) for holiday in
+             self.snapshot.holidays(filters.country, filters.year)],
+            month=filters.month,
+            day=filters.day,
+            public=filters.public,
+        )
+        if after is not None:
+            holidays = [holiday for holiday in holidays
+                        if (holiday.date, holiday.id) > after]
+        return holidays[:limit]
+
+    def get_holidays_batch(
+        self,
+        selectors: List[schemas.HolidaySelector],
+    ) -> List[List[CachedHoliday]]:
+        snapshot = self.snapshot
+        return [
+            [_cached_holiday(holiday)
+             for year in selector.years
+             for holiday in snapshot.holidays(selector.country, year)
+             if selector.public is None or holiday.public == selector.public]
+            for selector in selectors
+        ]
+
+    def iter_holidays(
+        self,
+        filters: schemas.HolidayExportFilters,
+        batch_size: int,
+    ) -> Iterator[List[ExportedHoliday]]:
+        holidays = (
+            ExportedHoliday(*holiday)
+            for holiday in self.snapshot.iter_holidays()
+            if (not filters.country or holiday.country in filters.country)
+            and (not filters.date_from or holiday.date >= filters.date_from)
+            and (not filters.date_to or holiday.date <= filters.date_to)
+            and (not filters.changed_since
+                 or holiday.updated_at >= filters.changed_since)
+        )
+        while batch := list(itertools.islice(holidays, batch_size)):
+            yield batch
+
+    def get_calendar(self, country: str) -> CountryCalendar:
+        return HOLIDAY_CALENDARS.get_or_load(country, self._load_calendar)
+
+    def _load_calendar(self, country: str) -> List[CachedHoliday]:
+        return [_cached_holiday(holiday)
+                for holiday in self.snapshot.country_holidays(country)]
+
+    def get_bitmap(self, country: str) -> CountryBitmap:
+        return HOLIDAY_BITMAPS.get_or_load(country, self._load_dates)
+
+    def _load_dates(self, country: str) -> List[HolidayDate]:
+        return [(holiday.date, holiday.public)
+                for holiday in self.snapshot.country_holidays(country)]
+
+    def get_holiday_version(self, id_: int) -> Optional[datetime.datetime]:
+        holiday = self.snapshot.holiday(id_)
+        return holiday.updated_at if holiday else None
+
+    def get_partition_version(
+        self,
+        country: str,
+        year: int,
+    ) -> Optional[PartitionVersion]:
+        partition = self.snapshot.partition(country, year)
+        if partition is None:
+            return None
+        return PartitionVersion(partition.version, partition.updated_at)
+
+    def get_changes(self, after: int, limit: int) -> List[HolidayChange]:
+        return []
+
+    def get_last_sequence(self) -> int:
+        return self.snapshot.sequence
+
+
+# Calendars and bitmaps built from a replaced snapshot are stale.
+HOLIDAY_SNAPSHOT.on_swap(HOLIDAY_CALENDARS.clear)
+HOLIDAY_SNAPSHOT.on_swap(HOLIDAY_BITMAPS.clear)
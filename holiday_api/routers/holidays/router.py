@@ -1,9 +1,15 @@
-from typing import Any, List
+import datetime
+from typing import Any, List, Optional, Union
 
-from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
-from holiday_api import models
+from fastapi import (APIRouter, Depends, Header, HTTPException, Query,
+                     Request, Response, status)
+from fastapi.responses import StreamingResponse
+from holiday_api import config, models, pagination, serialization
 from holiday_api.auth import authenticate
-from holiday_api.routers.holidays import schemas
+from holiday_api.database import run_in_executor
+from holiday_api.routers.holidays import (bulk, changes, conditional, export,
+                                          schemas)
+from holiday_api.routers.holidays.cache import CachedHoliday
 from holiday_api.routers.holidays.repository import (
     HolidayRepository, SQLAlchemyHolidayRepository)
 
@@ -22,10 +28,243 @@ async def create_holiday(
     _auth: Any = Depends(authenticate),
     repo: HolidayRepository = Depends(SQLAlchemyHolidayRepository),
 ) -> models.Holiday:
-    created_holiday: models.Holiday = repo.create(holiday)
+    created_holiday: models.Holiday = await run_in_executor(
+        repo.create, holiday)
     return created_holiday
 
 
+@ROUTER.post(
+    '/bulk',
+    response_model=schemas.ImportResult,
+    responses={
+        413: {'description': 'Line too long'},
+        422: {'description': 'Atomic import rejected'},
+    },
+)
+async def import_holidays(
+    request: Request,
+    response: Response,
+    mode: schemas.ImportMode = Query(schemas.ImportMode.ATOMIC),
+    batch_size: int = Query(config.BULK_IMPORT_BATCH_SIZE, ge=1, le=10000),
+    _auth: Any = Depends(authenticate),
+    repo: HolidayRepository = Depends(SQLAlchemyHolidayRepository),
+) -> schemas.ImportResult:
+    """Import holidays from a streamed NDJSON or CSV (``text/csv``) body."""
+    content_type = request.headers.get('content-type', '')
+    max_line_length = config.BULK_IMPORT_MAX_LINE_BYTES
+    if content_type.split(';')[0].strip() == 'text/csv':
+        rows = bulk.parse_csv(request.stream(), max_line_length)
+    else:
+        rows = bulk.parse_ndjson(request.stream(), max_line_length)
+    importer = bulk.HolidayImporter(
+        repo,
+        mode=mode,
+        batch_size=batch_size,
+        max_errors=config.BULK_IMPORT_MAX_ERRORS,
+    )
+    try:
+        result = await importer.run(rows)
+    except bulk.LineTooLong as error:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=str(error),
+        ) from error
+    if mode == schemas.ImportMode.ATOMIC and result.failed:
+        response.status_code = status.HTTP_422_UNPROCESSABLE_ENTITY
+    return result
+
+
+@ROUTER.post(
+    '/query',
+    response_model=schemas.HolidayQueryResponse,
+)
+async def query_holidays(
+    query: schemas.HolidayQuery,
+    response: Response,
+    repo: HolidayRepository = Depends(SQLAlchemyHolidayRepository),
+) -> Union[schemas.HolidayQueryResponse, Response]:
+    """Holidays for many (country, years, public) selectors at once.
+
+    Results are returned in the order of the selectors.
+    """
+    results: List[List[CachedHoliday]] = await run_in_executor(
+        repo.get_holidays_batch, query.selectors)
+    if config.FAST_JSON_RESPONSES:
+        return serialization.json_response(
+            serialization.dump_holiday_query(query.selectors, results),
+            response)
+    return schemas.HolidayQueryResponse(results=[
+        schemas.HolidayQueryResult(
+            selector=selector,
+            holidays=[holiday._asdict() for holiday in holidays],
+        )
+        for selector, holidays in zip(query.selectors, results)
+    ])
+
+
+@ROUTER.get(
+    '/export',
+    response_class=StreamingResponse,
+)
+async def export_holidays(
+    filters: schemas.HolidayExportFilters = Depends(),
+    format_: schemas.ExportFormat = Query(
+        schemas.ExportFormat.NDJSON, alias='format'),
+    _auth: Any = Depends(authenticate),
+    repo: HolidayRepository = Depends(SQLAlchemyHolidayRepository),
+) -> StreamingResponse:
+    """Stream all holidays matching the optional filters."""
+    batches = repo.iter_holidays(filters, config.EXPORT_BATCH_SIZE)
+    return StreamingResponse(
+        export.stream_holidays(batches, format_),
+        media_type=export.MEDIA_TYPES[format_],
+    )
+
+
+@ROUTER.get(
+    '/changes',
+    response_model=schemas.HolidayChangePage,
+)
+async def read_changes(
+    since: int = Query(0, ge=0),
+    limit: int = Query(config.PAGE_SIZE, ge=1, le=config.MAX_PAGE_SIZE),
+    repo: HolidayRepository = Depends(SQLAlchemyHolidayRepository),
+) -> schemas.HolidayChangePage:
+    """Holiday changes with a sequence above ``since``, oldest first."""
+    holiday_changes = await run_in_executor(repo.get_changes, since, limit)
+    return schemas.HolidayChangePage(
+        changes=[change._asdict() for change in holiday_changes],
+        last_sequence=(holiday_changes[-1].sequence
+                       if holiday_changes else since),
+    )
+
+
+@ROUTER.get(
+    '/changes/stream',
+    response_class=StreamingResponse,
+    responses={
+        400: {'description': 'Invalid Last-Event-ID'},
+    },
+)
+async def stream_changes(
+    request: Request,
+    since: Optional[int] = Query(None, ge=0),
+    last_event_id: Optional[str] = Header(None),
+    repository: changes.RepositoryFactory = Depends(
+        changes.holiday_repository),
+) -> StreamingResponse:
+    """Server-Sent Events of holiday changes after ``since``.
+
+    Without ``since`` only changes from now on are sent; ``since=0``
+    replays the whole log. Reconnecting clients resume after their
+    ``Last-Event-ID``.
+    """
+    if last_event_id is not None:
+        try:
+            since = max(int(last_event_id), 0)
+        except ValueError:
+            raise HTTPException(  # pylint: disable=raise-missing-from
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail='Invalid Last-Event-ID',
+            )
+    return StreamingResponse(
+        changes.stream_changes(
+            request,
+            changes.CHANGE_BROADCASTER,
+            repository,
+            since=since,
+            heartbeat=config.CHANGE_FEED_HEARTBEAT,
+        ),
+        media_type=changes.MEDIA_TYPE,
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'},
+    )
+
+
+@ROUTER.get(
+    '/next',
+    response_model=List[schemas.HolidayOut],
+)
+async def read_next_holidays(
+    country: str = Query(..., max_length=2),
+    after: datetime.date = Query(...),
+    limit: int = Query(10, ge=1, le=config.MAX_PAGE_SIZE),
+    public: Optional[bool] = Query(None),
+    repo: HolidayRepository = Depends(SQLAlchemyHolidayRepository),
+) -> List[CachedHoliday]:
+    """The first ``limit`` holidays dated after ``after``."""
+    calendar = await run_in_executor(repo.get_calendar, country)
+    return calendar.next_holidays(after, limit, public)
+
+
+@ROUTER.get(
+    '/is-holiday',
+    response_model=schemas.HolidayCheck,
+)
+async def check_holiday(
+    country: str = Query(..., max_length=2),
+    date: datetime.date = Query(...),
+    public: Optional[bool] = Query(None),
+    repo: HolidayRepository = Depends(SQLAlchemyHolidayRepository),
+) -> schemas.HolidayCheck:
+    holidays: List[CachedHoliday] = []
+    # The bitmap answers negatives; non-public holidays need the calendar.
+    bitmap = await run_in_executor(repo.get_bitmap, country)
+    if public is False or bitmap.contains(date, public=bool(public)):
+        calendar = await run_in_executor(repo.get_calendar, country)
+        holidays = calendar.holidays_on(date, public)
+    return schemas.HolidayCheck(
+        country=country,
+        date=date,
+        is_holiday=bool(holidays),
+        holidays=[holiday._asdict() for holiday in holidays],
+    )
+
+
+@ROUTER.post(
+    '/is-holiday',
+    response_model=schemas.HolidayDatesCheckResult,
+)
+async def check_holidays(
+    query: schemas.HolidayDatesCheck,
+    repo: HolidayRepository = Depends(SQLAlchemyHolidayRepository),
+) -> schemas.HolidayDatesCheckResult:
+    """Whether each (country, date) is a holiday, in the order given."""
+    bitmaps = {}
+    for check in query.checks:
+        if check.country not in bitmaps:
+            bitmaps[check.country] = await run_in_executor(
+                repo.get_bitmap, check.country)
+    return schemas.HolidayDatesCheckResult(results=[
+        bitmaps[check.country].contains(check.date, query.public)
+        for check in query.checks
+    ])
+
+
+@ROUTER.get(
+    '/business-days',
+    response_model=schemas.BusinessDays,
+)
+async def count_business_days(
+    country: str = Query(..., max_length=2),
+    start: datetime.date = Query(...),
+    end: datetime.date = Query(...),
+    repo: HolidayRepository = Depends(SQLAlchemyHolidayRepository),
+) -> schemas.BusinessDays:
+    """Count weekdays in ``[start, end)`` that are not public holidays."""
+    if end < start:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail='end must not be before start',
+        )
+    calendar = await run_in_executor(repo.get_calendar, country)
+    return schemas.BusinessDays(
+        country=country,
+        start=start,
+        end=end,
+        business_days=calendar.business_days(start, end),
+    )
+
+
 @ROUTER.get(
     '/{id}',
     response_model=schemas.HolidayOut,
@@ -34,12 +273,21 @@ async def create_holiday(
     },
 )
 async def read_holiday(
+    request: Request,
+    response: Response,
     id_: int = Query(..., alias='id'),
     _auth: Any = Depends(authenticate),
     repo: HolidayRepository = Depends(SQLAlchemyHolidayRepository),
-) -> models.Holiday:
-    if holiday := repo.get_holiday(id_):
-        return holiday
+) -> Union[models.Holiday, Response]:
+    if updated_at := await run_in_executor(repo.get_holiday_version, id_):
+        etag = conditional.make_etag('holiday', id_, updated_at.isoformat())
+        if conditional.is_not_modified(request, etag, updated_at):
+            return conditional.not_modified(etag, updated_at)
+        holiday: Optional[models.Holiday] = await run_in_executor(
+            repo.get_holiday, id_)
+        if holiday:
+            conditional.set_validators(response, etag, updated_at)
+            return holiday
     raise HTTPException(
         status_code=status.HTTP_404_NOT_FOUND,
         detail='Item not found'
@@ -51,13 +299,84 @@ async def read_holiday(
     response_model=List[schemas.HolidayOut],
 )
 async def read_holidays(
+    request: Request,
+    response: Response,
     filters: schemas.HolidayFilters = Depends(),
+    page: pagination.PageParams = Depends(),
     repo: HolidayRepository = Depends(SQLAlchemyHolidayRepository),
-) -> List[models.Holiday]:
-    holidays = repo.get_holidays(filters)  # type: ignore
+) -> Union[List[CachedHoliday], Response]:
+    after = None
+    if page.paginate and page.cursor:
+        after = pagination.decode_cursor(
+            page.cursor, datetime.date.fromisoformat, int)
+    version = await run_in_executor(
+        repo.get_partition_version, filters.country, filters.year)
+    etag = conditional.make_etag(
+        'holidays', version.version if version else 0,
+        *filters.dict().values(), *page.dict().values())
+    last_modified = version.updated_at if version else None
+    if conditional.is_not_modified(request, etag, last_modified):
+        return conditional.not_modified(etag, last_modified)
+    limit = page.limit + 1 if page.paginate else None
+    holidays: List[CachedHoliday] = await run_in_executor(
+        repo.get_holidays, filters, after, limit,
+        version.version if version else 0)
+    if limit is not None and len(holidays) > page.limit:
+        holidays = holidays[:page.limit]
+        last = holidays[-1]
+        pagination.set_next_page(request, response, pagination.encode_cursor(
+            last.date.isoformat(), last.id))
+    conditional.set_validators(response, etag, last_modified)
+    if config.FAST_JSON_RESPONSES:
+        return serialization.json_response(
+            serialization.dump_holidays(holidays), response)
     return holidays
 
 
+@ROUTER.patch(
+    '',
+    response_model=schemas.SelectionResult,
+)
+async def update_holidays(
+    changes: schemas.HolidayChanges,
+    selection: schemas.HolidaySelection = Depends(),
+    dry_run: bool = Query(False),
+    _auth: Any = Depends(authenticate),
+    repo: HolidayRepository = Depends(SQLAlchemyHolidayRepository),
+) -> schemas.SelectionResult:
+    """Apply ``changes`` to every selected holiday in one statement.
+
+    With ``dry_run`` only the number of selected holidays is returned.
+    """
+    if dry_run:
+        affected = await run_in_executor(repo.count_many, selection)
+    else:
+        affected = await run_in_executor(
+            repo.update_many, selection, changes)
+    return schemas.SelectionResult(affected=affected, dry_run=dry_run)
+
+
+@ROUTER.delete(
+    '',
+    response_model=schemas.SelectionResult,
+)
+async def delete_holidays(
+    selection: schemas.HolidaySelection = Depends(),
+    dry_run: bool = Query(False),
+    _auth: Any = Depends(authenticate),
+    repo: HolidayRepository = Depends(SQLAlchemyHolidayRepository),
+) -> schemas.SelectionResult:
+    """Delete every selected holiday in one statement.
+
+    With ``dry_run`` only the number of selected holidays is returned.
+    """
+    if dry_run:
+        affected = await run_in_executor(repo.count_many, selection)
+    else:
+        affected = await run_in_executor(repo.delete_many, selection)
+    return schemas.SelectionResult(affected=affected, dry_run=dry_run)
+
+
 @ROUTER.put(
     '/{id}',
     response_model=schemas.HolidayOut,
@@ -71,7 +390,9 @@ async def replace_holiday(
     _auth: Any = Depends(authenticate),
     repo: HolidayRepository = Depends(SQLAlchemyHolidayRepository),
 ) -> models.Holiday:
-    if updated_holiday := repo.update(id_, holiday):
+    updated_holiday: Optional[models.Holiday] = await run_in_executor(
+        repo.update, id_, holiday)
+    if updated_holiday:
         return updated_holiday
     raise HTTPException(
         status_code=status.HTTP_404_NOT_FOUND,
@@ -92,7 +413,9 @@ async def update_holiday(
     _auth: Any = Depends(authenticate),
     repo: HolidayRepository = Depends(SQLAlchemyHolidayRepository),
 ) -> models.Holiday:
-    if updated_holiday := repo.update(id_, holiday):
+    updated_holiday: Optional[models.Holiday] = await run_in_executor(
+        repo.update, id_, holiday)
+    if updated_holiday:
         return updated_holiday
     raise HTTPException(
         status_code=status.HTTP_404_NOT_FOUND,
@@ -112,7 +435,7 @@ async def delete_holiday(
     _auth: Any = Depends(authenticate),
     repo: HolidayRepository = Depends(SQLAlchemyHolidayRepository),
 ) -> Response:
-    is_deleted = repo.delete(id_)
+    is_deleted = await run_in_executor(repo.delete, id_)
     if is_deleted:
         return Response(status_code=status.HTTP_204_NO_CONTENT)
     raise HTTPException(
@@ -1,11 +1,15 @@
 # pylint: disable=too-few-public-methods
 
+import dataclasses
 import datetime
-from typing import Any, Dict, Optional
+import enum
+from typing import Any, Dict, List, Optional
 
 import pydantic
 from fastapi import HTTPException, Query, status
 
+from holiday_api import config
+
 
 class HolidayFilters(pydantic.BaseModel):
     country: str = Query(..., max_length=2)
@@ -29,6 +33,25 @@ class HolidayFilters(pydantic.BaseModel):
         )
 
 
+@dataclasses.dataclass
+class HolidayExportFilters:
+    # A dataclass, since pydantic models cannot declare list query params.
+    country: Optional[List[str]] = Query(None)
+    date_from: Optional[datetime.date] = Query(None)
+    date_to: Optional[datetime.date] = Query(None)
+    changed_since: Optional[datetime.datetime] = Query(None)
+
+
+@dataclasses.dataclass
+class HolidaySelection:
+    """Holidays of a country, optionally narrowed by dates, name and flag."""
+    country: str = Query(..., max_length=2)
+    date_from: Optional[datetime.date] = Query(None)
+    date_to: Optional[datetime.date] = Query(None)
+    name: Optional[str] = Query(None, max_length=100)
+    public: Optional[bool] = Query(None)
+
+
 class HolidayBase(pydantic.BaseModel):
     name: str = pydantic.Field(..., max_length=100)
     date: datetime.date
@@ -71,6 +94,32 @@ class HolidayInPATCH(pydantic.BaseModel):
         }
 
 
+class HolidayChanges(pydantic.BaseModel):
+    name: Optional[str] = pydantic.Field(None, max_length=100)
+    public: Optional[bool] = None
+
+    @pydantic.root_validator(skip_on_failure=True)
+    def must_change_something(  # pylint: disable=no-self-argument,no-self-use
+            cls,  # pylint: disable=unused-argument
+            values: Dict[str, Any],
+    ) -> Dict[str, Any]:
+        if all(value is None for value in values.values()):
+            raise ValueError('at least one of name and public is required')
+        return values
+
+    class Config:
+        schema_extra = {
+            'example': {
+                'public': False,
+            }
+        }
+
+
+class SelectionResult(pydantic.BaseModel):
+    affected: int
+    dry_run: bool
+
+
 class HolidayOut(HolidayBase):
     id: int
 
@@ -85,3 +134,129 @@ class HolidayOut(HolidayBase):
                 'id': 1,
             }
         }
+
+
+class HolidayCheck(pydantic.BaseModel):
+    country: str
+    date: datetime.date
+    is_holiday: bool
+    holidays: List[HolidayOut]
+
+
+class HolidayDateCheck(pydantic.BaseModel):
+    country: str = pydantic.Field(..., max_length=2)
+    date: datetime.date
+
+
+class HolidayDatesCheck(pydantic.BaseModel):
+    checks: List[HolidayDateCheck] = pydantic.Field(
+        ..., min_items=1, max_items=config.BATCH_CHECK_MAX_DATES)
+    public: bool = False
+
+
+class HolidayDatesCheckResult(pydantic.BaseModel):
+    results: List[bool]
+
+
+class BusinessDays(pydantic.BaseModel):
+    country: str
+    start: datetime.date
+    end: datetime.date
+    business_days: int
+
+
+class HolidaySelector(pydantic.BaseModel):
+    country: str = pydantic.Field(..., max_length=2)
+    year_from: int = pydantic.Field(..., ge=2010, le=2200)
+    year_to: Optional[int] = pydantic.Field(None, ge=2010, le=2200)
+    public: Optional[bool] = None
+
+    @pydantic.validator('year_to', always=True)
+    def year_to_must_not_precede_year_from(  # pylint: disable=no-self-argument,no-self-use
+            cls,  # pylint: disable=unused-argument
+            v: Optional[int],
+            values: Dict[str, Any],
+            **kwargs: Dict[str, Any],
+    ) -> Optional[int]:
+        year_from = values.get('year_from')
+        if v is None:
+            return year_from
+        if year_from is not None and v < year_from:
+            raise ValueError('year_to must not be before year_from')
+        return v
+
+    @property
+    def years(self) -> range:
+        return range(self.year_from, self.year_to + 1)  # type: ignore
+
+
+class HolidayQuery(pydantic.BaseModel):
+    selectors: List[HolidaySelector] = pydantic.Field(
+        ..., min_items=1, max_items=config.BATCH_QUERY_MAX_SELECTORS)
+
+    @pydantic.validator('selectors')
+    def must_not_select_too_many_partitions(  # pylint: disable=no-self-argument,no-self-use
+            cls,  # pylint: disable=unused-argument
+            v: List[HolidaySelector],
+            **kwargs: Dict[str, Any],
+    ) -> List[HolidaySelector]:
+        partitions = sum(len(selector.years) for selector in v)
+        if partitions > config.BATCH_QUERY_MAX_PARTITIONS:
+            raise ValueError(
+                f'selectors cover {partitions} country-years, at most '
+                f'{config.BATCH_QUERY_MAX_PARTITIONS} are allowed')
+        return v
+
+
+class HolidayQueryResult(pydantic.BaseModel):
+    selector: HolidaySelector
+    holidays: List[HolidayOut]
+
+
+class HolidayQueryResponse(pydantic.BaseModel):
+    results: List[HolidayQueryResult]
+
+
+class ChangeOperation(str, enum.Enum):
+    CREATE = 'create'
+    UPDATE = 'update'
+    DELETE = 'delete'
+
+
+class HolidayChangeOut(pydantic.BaseModel):
+    sequence: int
+    operation: ChangeOperation
+    # None for bulk writes, which only record the partitions they touched.
+    holiday_id: Optional[int]
+    country: str
+    year: int
+    changed_at: datetime.datetime
+
+
+class HolidayChangePage(pydantic.BaseModel):
+    changes: List[HolidayChangeOut]
+    # Pass as ``since`` to get the following changes.
+    last_sequence: int
+
+
+class ExportFormat(str, enum.Enum):
+    NDJSON = 'ndjson'
+    CSV = 'csv'
+
+
+class ImportMode(str, enum.Enum):
+    ATOMIC = 'atomic'
+    BEST_EFFORT = 'best_effort'
+
+
+class ImportRowError(pydantic.BaseModel):
+    line: int
+    errors: List[Dict[str, Any]]
+
+
+class ImportResult(pydantic.BaseModel):
+    mode: ImportMode
+    inserted: int
+    failed: int
+    errors: List[ImportRowError]
+    errors_truncated: bool
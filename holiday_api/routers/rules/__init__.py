@@ -0,0 +1,5 @@
+from holiday_api.routers.rules.router import ROUTER
+
+__all__ = [
+    'ROUTER',
+]
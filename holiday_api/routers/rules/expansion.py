@@ -0,0 +1,206 @@
+import calendar
+import datetime
+import threading
+import time
+from typing import (Callable, Dict, Iterable, NamedTuple, Optional, Sequence,
+                    Tuple)
+
+from holiday_api import config
+from holiday_api.routers.holidays.cache import CachedHoliday
+from holiday_api.routers.rules.schemas import ObservedShift, RuleKind
+
+SATURDAY, SUNDAY = 5, 6
+
+
+class Rule(NamedTuple):
+    id: int
+    name: str
+    country: str
+    public: bool
+    kind: str
+    month: Optional[int]
+    day: Optional[int]
+    weekday: Optional[int]
+    nth: Optional[int]
+    offset: Optional[int]
+    observed: str
+    year_from: Optional[int]
+    year_to: Optional[int]
+
+
+def easter_sunday(year: int) -> datetime.date:
+    """Gregorian Easter Sunday (the anonymous Gregorian algorithm)."""
+    golden = year % 19
+    century, year_of_century = divmod(year, 100)
+    leap_centuries, century_rest = divmod(century, 4)
+    correction = (century + 8) // 25
+    moon = (century - correction + 1) // 3
+    epact = (19 * golden + century - leap_centuries - moon + 15) % 30
+    leap_years, year_rest = divmod(year_of_century, 4)
+    weekday = (32 + 2 * century_rest + 2 * leap_years - epact
+               - year_rest) % 7
+    shift = (golden + 11 * epact + 22 * weekday) // 451
+    month, day = divmod(epact + weekday - 7 * shift + 114, 31)
+    return datetime.date(year, month, day + 1)
+
+
+def nth_weekday(
+    year: int,
+    month: int,
+    weekday: int,
+    nth: int,
+) -> Optional[datetime.date]:
+    """The ``nth`` ``weekday`` of a month, or None if there is none.
+
+    Negative ``nth`` counts from the end of the month.
+    """
+    first_weekday, days = calendar.monthrange(year, month)
+    if nth > 0:
+        day = 1 + (weekday - first_weekday) % 7 + (nth - 1) * 7
+    else:
+        last_weekday = (first_weekday + days - 1) % 7
+        day = days - (last_weekday - weekday) % 7 + (nth + 1) * 7
+    if not 1 <= day <= days:
+        return None
+    return datetime.date(year, month, day)
+
+
+def shift_observed(date: datetime.date, observed: str) -> datetime.date:
+    weekday = date.weekday()
+    if observed == ObservedShift.NEAREST_WEEKDAY:
+        if weekday == SATURDAY:
+            return date - datetime.timedelta(days=1)
+        if weekday == SUNDAY:
+            return date + datetime.timedelta(days=1)
+    elif observed == ObservedShift.NEXT_WEEKDAY and weekday >= SATURDAY:
+        return date + datetime.timedelta(days=7 - weekday)
+    return date
+
+
+def next_weekday(date: datetime.date) -> datetime.date:
+    date += datetime.timedelta(days=1)
+    while date.weekday() >= SATURDAY:
+        date += datetime.timedelta(days=1)
+    return date
+
+
+def rule_date(rule: Rule, year: int) -> Optional[datetime.date]:
+    """The date ``rule`` falls on in ``year`` before any observed shift."""
+    if rule.year_from and year < rule.year_from:
+        return None
+    if rule.year_to and year > rule.year_to:
+        return None
+    if rule.kind == RuleKind.FIXED:
+        try:
+            return datetime.date(year, rule.month, rule.day)  # type: ignore
+        except ValueError:  # 29 February outside leap years
+            return None
+    if rule.kind == RuleKind.NTH_WEEKDAY:
+        return nth_weekday(
+            year, rule.month, rule.weekday, rule.nth)  # type: ignore
+    return easter_sunday(year) + datetime.timedelta(
+        days=rule.offset)  # type: ignore
+
+
+def expand(rules: Iterable[Rule], year: int) -> Tuple[CachedHoliday, ...]:
+    """Holidays observed in ``year``, sorted by (date, rule id).
+
+    Observed shifts may move a holiday across New Year, so the neighbouring
+    years are expanded too; a rule is observed at most once a year, on the
+    date of that year's own occurrence if it has one. A shifted holiday
+    landing on another holiday moves on to the next free weekday, in the
+    order of the original dates. Each holiday carries the id of its rule.
+    """
+    # (original date, rule id, observed date, rule)
+    occurrences = []
+    for rule in rules:
+        dates = {}
+        for rule_year in (year - 1, year, year + 1):
+            if date := rule_date(rule, rule_year):
+                dates[rule_year] = (
+                    date, shift_observed(date, rule.observed))
+        for rule_year, (date, observed) in dates.items():
+            own = dates.get(observed.year)
+            if observed.year != rule_year and own \
+                    and own[1].year == observed.year:
+                continue
+            occurrences.append((date, rule.id, observed, rule))
+    taken = {observed for date, _, observed, _ in occurrences
+             if observed == date}
+    holidays = []
+    for date, _, observed, rule in sorted(occurrences):
+        if observed != date:
+            while observed in taken:
+                observed = next_weekday(observed)
+            taken.add(observed)
+        if observed.year == year:
+            holidays.append(CachedHoliday(
+                rule.id, rule.name, observed, rule.public, rule.country))
+    return tuple(sorted(
+        holidays, key=lambda holiday: (holiday.date, holiday.id)))
+
+
+class CountryRules:
+    """Rules of one country with their expansion memoized per year."""
+
+    def __init__(self, rules: Iterable[Rule]):
+        self.rules = tuple(rules)
+        self._years: Dict[int, Tuple[CachedHoliday, ...]] = {}
+
+    def holidays(self, year: int) -> Tuple[CachedHoliday, ...]:
+        # Concurrent expansions of a year give equal results, so a race
+        # costs only duplicate work.
+        if (holidays := self._years.get(year)) is None:
+            holidays = self._years[year] = expand(self.rules, year)
+        return holidays
+
+
+Entry = Tuple[CountryRules, float]
+
+
+class RuleIndex:
+    """Per-country rules, loaded on first use and dropped on writes.
+
+    Dropping a country's rules also drops its memoized expansions; ``ttl``
+    bounds staleness caused by writes handled by other processes.
+    """
+
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        # country -> (rules, expiry time)
+        self._entries: Dict[str, Entry] = {}
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    def get_or_load(
+        self,
+        country: str,
+        loader: Callable[[str], Sequence[Rule]],
+    ) -> CountryRules:
+        with self._lock:
+            if entry := self._entries.get(country):
+                rules, expires_at = entry
+                if expires_at > time.monotonic():
+                    return rules
+                del self._entries[country]
+            generation = self._generation
+        rules = CountryRules(loader(country))
+        with self._lock:
+            # Drop the result if a write changed anything while loading.
+            if generation == self._generation:
+                self._entries[country] = (rules, time.monotonic() + self.ttl)
+        return rules
+
+    def invalidate(self, *countries: str) -> None:
+        with self._lock:
+            self._generation += 1
+            for country in countries:
+                self._entries.pop(country, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+
+
+HOLIDAY_RULES = RuleIndex(ttl=config.HOLIDAY_RULES_TTL)
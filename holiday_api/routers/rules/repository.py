@@ -0,0 +1,175 @@
+from dataclasses import dataclass
+from typing import List, Optional, Protocol, TypeVar
+
+from fastapi import Depends
+from sqlalchemy.orm import Session
+
+from holiday_api import models
+from holiday_api.database import UnitOfWork, get_unit_of_work
+from holiday_api.routers.holidays import schemas as holiday_schemas
+from holiday_api.routers.holidays.cache import CachedHoliday, filter_partition
+from holiday_api.routers.holidays.repository import (HolidayRepository,
+                                                     date_range)
+from holiday_api.routers.rules import schemas
+from holiday_api.routers.rules.expansion import (HOLIDAY_RULES, CountryRules,
+                                                 Rule)
+
+HolidayRule = TypeVar('HolidayRule')
+
+
+class RuleRepository(Protocol):
+    def create(self, rule: schemas.RuleInPOST) -> HolidayRule:
+        raise NotImplementedError
+
+    def get(self, id_: int) -> Optional[HolidayRule]:
+        raise NotImplementedError
+
+    def get_all(self, country: str) -> List[HolidayRule]:
+        raise NotImplementedError
+
+    def get_rules(self, country: str) -> CountryRules:
+        raise NotImplementedError
+
+    def expand(
+        self,
+        filters: holiday_schemas.HolidayFilters,
+    ) -> List[CachedHoliday]:
+        raise NotImplementedError
+
+    def materialize(
+        self,
+        materialization: schemas.Materialization,
+        holidays: HolidayRepository,
+    ) -> schemas.MaterializationResult:
+        raise NotImplementedError
+
+    def update(
+        self,
+        id_: int,
+        rule: schemas.RuleInPUT,
+    ) -> Optional[HolidayRule]:
+        raise NotImplementedError
+
+    def delete(self, id_: int) -> bool:
+        raise NotImplementedError
+
+
+@dataclass
+class SQLAlchemyRuleRepository:
+    uow: UnitOfWork = Depends(get_unit_of_work)
+
+    @property
+    def session(self) -> Session:
+        return self.uow.session
+
+    @property
+    def read_session(self) -> Session:
+        return self.uow.read_session
+
+    def create(self, rule: schemas.RuleInPOST) -> models.HolidayRule:
+        rule_db = models.HolidayRule(**rule.dict())
+        self.session.add(rule_db)
+        self.session.flush()
+        self.session.refresh(rule_db)
+        self._changed(rule_db.country)
+        return rule_db
+
+    def get(self, id_: int) -> Optional[models.HolidayRule]:
+        rule = self.read_session.query(
+            models.HolidayRule).get(id_)
+        return rule
+
+    def _get_for_write(self, id_: int) -> Optional[models.HolidayRule]:
+        rule = self.session.query(
+            models.HolidayRule).get(id_)
+        return rule
+
+    def get_all(self, country: str) -> List[models.HolidayRule]:
+        rules = self.read_session.query(
+            models.HolidayRule).filter_by(country=country)\
+            .order_by(models.HolidayRule.id).all()
+        return rules
+
+    def get_rules(self, country: str) -> CountryRules:
+        return HOLIDAY_RULES.get_or_load(country, self._load_rules)
+
+    def _load_rules(self, country: str) -> List[Rule]:
+        query = self.read_session.query(
+            *(getattr(models.HolidayRule, name) for name in Rule._fields)
+        ).filter(models.HolidayRule.country == country)
+        return [Rule(*row) for row in query]
+
+    def expand(
+        self,
+        filters: holiday_schemas.HolidayFilters,
+    ) -> List[CachedHoliday]:
+        """Holidays generated by the rules, ordered by (date, rule id)."""
+        holidays = self.get_rules(filters.country).holidays(filters.year)
+        return filter_partition(
+            holidays,
+            month=filters.month,
+            day=filters.day,
+            public=filters.public,
+        )
+
+    def materialize(
+        self,
+        materialization: schemas.Materialization,
+        holidays: HolidayRepository,
+    ) -> schemas.MaterializationResult:
+        """Store expanded holidays through the ``holidays`` repository.
+
+        Holidays already stored with the same name and date are skipped,
+        so the job can be rerun over overlapping years.
+        """
+        country = materialization.country
+        rules = self.get_rules(country)
+        start, _ = date_range(materialization.year_from)
+        _, end = date_range(materialization.year_to)
+        existing = {
+            (name, date)
+            for name, date in self.session.query(
+                models.Holiday.name, models.Holiday.date,
+            ).filter(
+                models.Holiday.country == country,
+                models.Holiday.date >= start,
+                models.Holiday.date < end,
+            )
+        }
+        new_holidays, skipped = [], 0
+        for year in range(
+                materialization.year_from, materialization.year_to + 1):
+            for holiday in rules.holidays(year):
+                if (holiday.name, holiday.date) in existing:
+                    skipped += 1
+                    continue
+                new_holidays.append(holiday_schemas.HolidayInPOST(
+                    name=holiday.name, date=holiday.date,
+                    public=holiday.public, country=holiday.country))
+        inserted = holidays.create_many(new_holidays)
+        return schemas.MaterializationResult(
+            inserted=inserted, skipped=skipped)
+
+    def update(
+        self,
+        id_: int,
+        rule: schemas.RuleInPUT,
+    ) -> Optional[models.HolidayRule]:
+        if rule_db := self._get_for_write(id_):
+            old_country = rule_db.country
+            for name, value in rule.dict().items():
+                setattr(rule_db, name, value)
+            self.session.flush()
+            self.session.refresh(rule_db)
+            self._changed(old_country, rule_db.country)
+        return rule_db
+
+    def delete(self, id_: int) -> Optional[models.HolidayRule]:
+        if rule_db := self._get_for_write(id_):
+            self.session.delete(rule_db)  # type: ignore
+            self.session.flush()
+            self._changed(rule_db.country)
+        return rule_db
+
+    def _changed(self, *countries: str) -> None:
+        self.uow.changed(lambda: HOLIDAY_RULES.invalidate(*countries))
@@ -0,0 +1,145 @@
+from typing import Any, List, Optional, Union
+
+from fastapi import (APIRouter, Depends, HTTPException, Query, Response,
+                     status)
+from holiday_api import config, models, serialization
+from holiday_api.auth import authenticate
+from holiday_api.database import run_in_executor
+from holiday_api.routers.holidays import schemas as holiday_schemas
+from holiday_api.routers.holidays.cache import CachedHoliday
+from holiday_api.routers.holidays.repository import (
+    HolidayRepository, SQLAlchemyHolidayRepository)
+from holiday_api.routers.rules import schemas
+from holiday_api.routers.rules.repository import (RuleRepository,
+                                                  SQLAlchemyRuleRepository)
+
+ROUTER = APIRouter(
+    redirect_slashes=False,
+)
+
+
+@ROUTER.post(
+    '',
+    response_model=schemas.RuleOut,
+    status_code=status.HTTP_201_CREATED,
+)
+async def create_rule(
+    rule: schemas.RuleInPOST,
+    _auth: Any = Depends(authenticate),
+    repo: RuleRepository = Depends(SQLAlchemyRuleRepository),
+) -> models.HolidayRule:
+    created_rule: models.HolidayRule = await run_in_executor(
+        repo.create, rule)
+    return created_rule
+
+
+@ROUTER.get(
+    '',
+    response_model=List[schemas.RuleOut],
+)
+async def read_rules(
+    country: str = Query(..., max_length=2),
+    repo: RuleRepository = Depends(SQLAlchemyRuleRepository),
+) -> List[models.HolidayRule]:
+    rules: List[models.HolidayRule] = await run_in_executor(
+        repo.get_all, country)
+    return rules
+
+
+@ROUTER.get(
+    '/holidays',
+    response_model=List[holiday_schemas.HolidayOut],
+)
+async def read_rule_holidays(
+    response: Response,
+    filters: holiday_schemas.HolidayFilters = Depends(),
+    repo: RuleRepository = Depends(SQLAlchemyRuleRepository),
+) -> Union[List[CachedHoliday], Response]:
+    """Holidays generated by the country's rules.
+
+    Each holiday's ``id`` is the id of the rule that generated it.
+    """
+    holidays = await run_in_executor(repo.expand, filters)
+    if config.FAST_JSON_RESPONSES:
+        return serialization.json_response(
+            serialization.dump_holidays(holidays), response)
+    return holidays
+
+
+@ROUTER.post(
+    '/materialize',
+    response_model=schemas.MaterializationResult,
+)
+async def materialize_rules(
+    materialization: schemas.Materialization,
+    _auth: Any = Depends(authenticate),
+    repo: RuleRepository = Depends(SQLAlchemyRuleRepository),
+    holidays: HolidayRepository = Depends(SQLAlchemyHolidayRepository),
+) -> schemas.MaterializationResult:
+    """Store the holidays generated for a range of years in ``/holidays``."""
+    result: schemas.MaterializationResult = await run_in_executor(
+        repo.materialize, materialization, holidays)
+    return result
+
+
+@ROUTER.get(
+    '/{id}',
+    response_model=schemas.RuleOut,
+    responses={
+        404: {'description': 'Item not found'},
+    },
+)
+async def read_rule(
+    id_: int = Query(..., alias='id'),
+    repo: RuleRepository = Depends(SQLAlchemyRuleRepository),
+) -> models.HolidayRule:
+    rule: Optional[models.HolidayRule] = await run_in_executor(repo.get, id_)
+    if rule:
+        return rule
+    raise HTTPException(
+        status_code=status.HTTP_404_NOT_FOUND,
+        detail='Item not found'
+    )
+
+
+@ROUTER.put(
+    '/{id}',
+    response_model=schemas.RuleOut,
+    responses={
+        404: {'description': 'Item not found'},
+    },
+)
+async def replace_rule(
+    rule: schemas.RuleInPUT,
+    id_: int = Query(..., alias='id'),
+    _auth: Any = Depends(authenticate),
+    repo: RuleRepository = Depends(SQLAlchemyRuleRepository),
+) -> models.HolidayRule:
+    updated_rule: Optional[models.HolidayRule] = await run_in_executor(
+        repo.update, id_, rule)
+    if updated_rule:
+        return updated_rule
+    raise HTTPException(
+        status_code=status.HTTP_404_NOT_FOUND,
+        detail='Item not found',
+    )
+
+
+@ROUTER.delete(
+    '/{id}',
+    status_code=status.HTTP_204_NO_CONTENT,
+    responses={
+        404: {'description': 'Item not found'},
+    },
+)
+async def delete_rule(
+    id_: int = Query(..., alias='id'),
+    _auth: Any = Depends(authenticate),
+    repo: RuleRepository = Depends(SQLAlchemyRuleRepository),
+) -> Response:
+    if await run_in_executor(repo.delete, id_):
+        return Response(status_code=status.HTTP_204_NO_CONTENT)
+    raise HTTPException(
+        status_code=status.HTTP_404_NOT_FOUND,
+        detail='Item not found'
+    )
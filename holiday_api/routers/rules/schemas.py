@@ -0,0 +1,135 @@
+# pylint: disable=too-few-public-methods
+
+import calendar
+import enum
+from typing import Any, Dict, Optional
+
+import pydantic
+
+
+class RuleKind(str, enum.Enum):
+    FIXED = 'fixed'
+    NTH_WEEKDAY = 'nth_weekday'
+    EASTER = 'easter'
+
+
+class ObservedShift(str, enum.Enum):
+    NONE = 'none'
+    # Saturday to Friday, Sunday to Monday.
+    NEAREST_WEEKDAY = 'nearest_weekday'
+    # Saturday and Sunday to Monday.
+    NEXT_WEEKDAY = 'next_weekday'
+
+
+# Fields each kind of rule requires.
+REQUIRED_FIELDS = {
+    RuleKind.FIXED: ('month', 'day'),
+    RuleKind.NTH_WEEKDAY: ('month', 'weekday', 'nth'),
+    RuleKind.EASTER: ('offset',),
+}
+
+
+class RuleBase(pydantic.BaseModel):
+    name: str = pydantic.Field(..., max_length=100)
+    country: str = pydantic.Field(..., max_length=2)
+    public: bool
+    kind: RuleKind
+    month: Optional[int] = pydantic.Field(None, ge=1, le=12)
+    day: Optional[int] = pydantic.Field(None, ge=1, le=31)
+    # 0 is Monday, like ``datetime.date.weekday``.
+    weekday: Optional[int] = pydantic.Field(None, ge=0, le=6)
+    # 1 to 5 count from the start of the month, -1 to -5 from its end.
+    nth: Optional[int] = pydantic.Field(None, ge=-5, le=5)
+    # Keeps every Easter-relative date within Easter's year.
+    offset: Optional[int] = pydantic.Field(None, ge=-80, le=200)
+    observed: ObservedShift = ObservedShift.NONE
+    year_from: Optional[int] = pydantic.Field(None, ge=2010, le=2200)
+    year_to: Optional[int] = pydantic.Field(None, ge=2010, le=2200)
+
+    @pydantic.root_validator(skip_on_failure=True)
+    def must_define_a_date(  # pylint: disable=no-self-argument,no-self-use
+            cls,  # pylint: disable=unused-argument
+            values: Dict[str, Any],
+    ) -> Dict[str, Any]:
+        kind = RuleKind(values['kind'])
+        if missing := [field for field in REQUIRED_FIELDS[kind]
+                       if values.get(field) is None]:
+            raise ValueError(
+                f'{kind.value} rules require {", ".join(missing)}')
+        if values.get('nth') == 0:
+            raise ValueError('nth must not be 0')
+        # 2000 is a leap year, so rules may fall on 29 February.
+        if kind == RuleKind.FIXED and values['day'] > calendar.monthrange(
+                2000, values['month'])[1]:
+            raise ValueError('day does not exist in month')
+        year_from, year_to = values.get('year_from'), values.get('year_to')
+        if year_from and year_to and year_to < year_from:
+            raise ValueError('year_to must not be before year_from')
+        return values
+
+    class Config:
+        use_enum_values = True
+        schema_extra = {
+            'example': {
+                'name': 'Easter Monday',
+                'country': 'PL',
+                'public': True,
+                'kind': 'easter',
+                'offset': 1,
+            }
+        }
+
+
+class RuleInPOST(RuleBase):
+    pass
+
+
+class RuleInPUT(RuleBase):
+    pass
+
+
+class RuleOut(RuleBase):
+    id: int
+
+    class Config:
+        orm_mode = True
+        schema_extra = {
+            'example': {
+                'name': 'Easter Monday',
+                'country': 'PL',
+                'public': True,
+                'kind': 'easter',
+                'month': None,
+                'day': None,
+                'weekday': None,
+                'nth': None,
+                'offset': 1,
+                'observed': 'none',
+                'year_from': None,
+                'year_to': None,
+                'id': 1,
+            }
+        }
+
+
+class Materialization(pydantic.BaseModel):
+    country: str = pydantic.Field(..., max_length=2)
+    year_from: int = pydantic.Field(..., ge=2010, le=2200)
+    year_to: int = pydantic.Field(..., ge=2010, le=2200)
+
+    @pydantic.validator('year_to')
+    def year_to_must_not_precede_year_from(  # pylint: disable=no-self-argument,no-self-use
+            cls,  # pylint: disable=unused-argument
+            v: int,
+            values: Dict[str, Any],
+            **kwargs: Dict[str, Any],
+    ) -> int:
+        year_from = values.get('year_from')
+        if year_from is not None and v < year_from:
+            raise ValueError('year_to must not be before year_from')
+        return v
+
+
+class MaterializationResult(pydantic.BaseModel):
+    inserted: int
+    skipped: int
@@ -4,8 +4,8 @@ from typing import List, Optional, Protocol, TypeVar, Union
 from fastapi import Depends
 from sqlalchemy.orm import Session
 
-from holiday_api import models
-from holiday_api.database import get_session
+from holiday_api import auth, models
+from holiday_api.database import UnitOfWork, get_unit_of_work
 from holiday_api.routers.users import schemas
 
 User = TypeVar('User')
@@ -18,7 +18,11 @@ class UserRepository(Protocol):
     def get(self, id_: int) -> Optional[User]:
         raise NotImplementedError
 
-    def get_all(self) -> List[User]:
+    def get_all(
+        self,
+        after: Optional[int] = None,
+        limit: Optional[int] = None,
+    ) -> List[User]:
         raise NotImplementedError
 
     def update(
@@ -42,7 +46,15 @@ class UserRepository(Protocol):
 
 @dataclass
 class SQLAlchemyUserRepository:
-    session: Session = Depends(get_session)
+    uow: UnitOfWork = Depends(get_unit_of_work)
+
+    @property
+    def session(self) -> Session:
+        return self.uow.session
+
+    @property
+    def read_session(self) -> Session:
+        return self.uow.read_session
 
     def create(
         self,
@@ -51,15 +63,28 @@ class SQLAlchemyUserRepository:
         user_db = models.User(**user.dict(exclude={'password'}))
         user_db.set_password(user.password.get_secret_value())
         self.session.add(user_db)
-        self.session.commit()  # type: ignore
+        self.session.flush()
+        self.session.refresh(user_db)
+        self.uow.changed()
         return user_db
 
     def get(self, id_: int) -> Optional[models.User]:
+        user = self.read_session.query(models.User).get(id_)
+        return user
+
+    def _get_for_write(self, id_: int) -> Optional[models.User]:
         user = self.session.query(models.User).get(id_)  # type: ignore
         return user  # type: ignore
 
-    def get_all(self) -> List[models.User]:
-        users = self.session.query(models.User).all()  # type: ignore
+    def get_all(
+        self,
+        after: Optional[int] = None,
+        limit: Optional[int] = None,
+    ) -> List[models.User]:
+        query = self.read_session.query(models.User)
+        if after is not None:
+            query = query.filter(models.User.id > after)
+        users = query.order_by(models.User.id).limit(limit).all()
         return users  # type: ignore
 
     def update(
@@ -68,14 +93,16 @@ class SQLAlchemyUserRepository:
         user: Union[schemas.UserInPUT,
                     schemas.UserInPATCH],
     ) -> Optional[models.User]:
-        if user_db := self.get(id_):
+        if user_db := self._get_for_write(id_):
             user_dict = user.dict(exclude_unset=True, exclude={'password'})
             self.session.query(  # type: ignore
                 models.User).filter(models.User.id == id_).\
                 update(user_dict)
             if user.password:
                 user_db.set_password(user.password.get_secret_value())
-            self.session.commit()  # type: ignore
+            self.session.flush()
+            self.session.refresh(user_db)
+            self._invalidate_credentials(id_)
         return user_db
 
     def change_password(
@@ -83,16 +110,22 @@ class SQLAlchemyUserRepository:
         id_: int,
         password_change: schemas.UserPassword,
     ) -> bool:
-        if user := self.get(id_):
+        if user := self._get_for_write(id_):
             if user.check_password(password_change.current_password.get_secret_value()):
                 user.set_password(
                     password_change.new_password.get_secret_value())
-                self.session.commit()  # type: ignore
+                self.session.flush()
+                self._invalidate_credentials(id_)
                 return True
         return False
 
     def delete(self, id_: int,) -> Optional[models.User]:
-        if user_db := self.get(id_):
+        if user_db := self._get_for_write(id_):
             self.session.delete(user_db)  # type: ignore
-            self.session.commit()  # type: ignore
+            self.session.flush()
+            self._invalidate_credentials(id_)
         return user_db
+
+    def _invalidate_credentials(self, id_: int) -> None:
+        self.uow.changed(
+            lambda: auth.CREDENTIALS_CACHE.invalidate(id_))
@@ -1,7 +1,9 @@
-from typing import List
+from typing import List, Optional, Union
 
-from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
-from holiday_api import models
+from fastapi import (APIRouter, Depends, HTTPException, Query, Request,
+                     Response, status)
+from holiday_api import config, models, pagination, serialization
+from holiday_api.database import run_in_executor
 from holiday_api.routers.users import schemas
 from holiday_api.routers.users.repository import (SQLAlchemyUserRepository,
                                                   UserRepository)
@@ -21,7 +23,7 @@ async def register_user(
     user: schemas.UserInPOST,
     repo: UserRepository = Depends(SQLAlchemyUserRepository),
 ) -> models.User:
-    registered_user: models.User = repo.create(user)
+    registered_user: models.User = await run_in_executor(repo.create, user)
     return registered_user
 
 
@@ -33,7 +35,8 @@ async def read_user(
     id_: int = Query(..., alias='id'),
     repo: UserRepository = Depends(SQLAlchemyUserRepository),
 ) -> models.User:
-    if user := repo.get(id_):
+    user: Optional[models.User] = await run_in_executor(repo.get, id_)
+    if user:
         return user
     raise HTTPException(
         status_code=status.HTTP_404_NOT_FOUND,
@@ -46,9 +49,26 @@ async def read_user(
     response_model=List[schemas.UserOut],
 )
 async def read_all_users(
+    request: Request,
+    response: Response,
+    page: pagination.PageParams = Depends(),
     repo: UserRepository = Depends(SQLAlchemyUserRepository),
-) -> List[models.User]:
-    users: List[models.User] = repo.get_all()
+) -> Union[List[models.User], Response]:
+    users: List[models.User]
+    if not page.paginate:
+        users = await run_in_executor(repo.get_all)
+    else:
+        after = None
+        if page.cursor:
+            after, = pagination.decode_cursor(page.cursor, int)
+        users = await run_in_executor(repo.get_all, after, page.limit + 1)
+        if len(users) > page.limit:
+            users = users[:page.limit]
+            pagination.set_next_page(
+                request, response, pagination.encode_cursor(users[-1].id))
+    if config.FAST_JSON_RESPONSES:
+        return serialization.json_response(
+            serialization.dump_users(users), response)
     return users
 
 
@@ -61,7 +81,9 @@ async def replace_user(
     id_: int = Query(..., alias='id'),
     repo: UserRepository = Depends(SQLAlchemyUserRepository),
 ) -> models.User:
-    if updated_user := repo.update(id_, user):
+    updated_user: Optional[models.User] = await run_in_executor(
+        repo.update, id_, user)
+    if updated_user:
         return updated_user
     raise HTTPException(
         status_code=status.HTTP_404_NOT_FOUND,
@@ -78,7 +100,9 @@ async def update_user(
     id_: int = Query(..., alias='id'),
     repo: UserRepository = Depends(SQLAlchemyUserRepository),
 ) -> models.User:
-    if updated_user := repo.update(id_, user):
+    updated_user: Optional[models.User] = await run_in_executor(
+        repo.update, id_, user)
+    if updated_user:
         return updated_user
     raise HTTPException(
         status_code=status.HTTP_404_NOT_FOUND,
@@ -94,7 +118,8 @@ async def change_user_password(
     id_: int = Query(..., alias='id'),
     repo: UserRepository = Depends(SQLAlchemyUserRepository),
 ) -> Response:
-    is_password_changed = repo.change_password(id_, password_change)
+    is_password_changed = await run_in_executor(
+        repo.change_password, id_, password_change)
     if is_password_changed:
         return Response(status_code=status.HTTP_204_NO_CONTENT)
     raise HTTPException(
@@ -110,7 +135,7 @@ async def delete_user(
     id_: int = Query(..., alias='id'),
     repo: UserRepository = Depends(SQLAlchemyUserRepository),
 ) -> Response:
-    is_deleted = repo.delete(id_)
+    is_deleted = await run_in_executor(repo.delete, id_)
     if is_deleted:
         return Response(status_code=status.HTTP_204_NO_CONTENT)
     raise HTTPException(
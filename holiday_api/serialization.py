@@ -0,0 +1,79 @@
+import json
+from typing import Any, Dict, Iterable
+
+from fastapi import Response
+
+from holiday_api.instrumentation import timed
+
+JSON_MEDIA_TYPE = 'application/json'
+
+
+def dump_json(content: Any) -> bytes:
+    """Encode ``content`` exactly like ``JSONResponse.render``."""
+    with timed('render'):
+        return json.dumps(
+            content,
+            ensure_ascii=False,
+            allow_nan=False,
+            indent=None,
+            separators=(',', ':'),
+        ).encode('utf-8')
+
+
+def _holiday(holiday: Any) -> Dict[str, Any]:
+    return {
+        'name': holiday.name,
+        'date': holiday.date.isoformat(),
+        'public': holiday.public,
+        'country': holiday.country,
+        'id': holiday.id,
+    }
+
+
+def dump_holidays(holidays: Iterable[Any]) -> bytes:
+    """Serialize holidays in the shape and key order of ``HolidayOut``."""
+    return dump_json([_holiday(holiday) for holiday in holidays])
+
+
+def dump_holiday_query(
+    selectors: Iterable[Any],
+    results: Iterable[Iterable[Any]],
+) -> bytes:
+    """Serialize a batch query like ``HolidayQueryResponse``."""
+    return dump_json({'results': [
+        {
+            'selector': selector.dict(),
+            'holidays': [_holiday(holiday) for holiday in holidays],
+        }
+        for selector, holidays in zip(selectors, results)
+    ]})
+
+
+def dump_users(users: Iterable[Any]) -> bytes:
+    """Serialize users in the shape and key order of ``UserOut``."""
+    return dump_json([
+        {
+            'id': user.id,
+            'first_name': user.first_name,
+            'last_name': user.last_name,
+            'username': user.username,
+        }
+        for user in users
+    ])
+
+
+def json_response(body: bytes, response: Response) -> Response:
+    """Wrap a pre-encoded body, keeping headers set on ``response``.
+
+    Returning a response skips FastAPI's ``response_model`` validation, while
+    the declared model still documents the endpoint in the OpenAPI schema.
+    """
+    raw = Response(
+        content=body,
+        status_code=response.status_code or 200,
+        media_type=JSON_MEDIA_TYPE,
+    )
+    for key, value in response.headers.items():
+        if key != 'content-length':
+            raw.headers.append(key, value)
+    return raw
@@ -0,0 +1,422 @@
+"""Read-only binary snapshots of the ``holidays`` table.
+
+A snapshot file is laid out as follows, all integers little-endian:
+
+- a header (``HEADER``) with counts, section offsets, the change log
+  sequence number the snapshot reflects and its creation time;
+- a string table of deduplicated UTF-8 holiday names;
+- fixed-width holiday records (``RECORD``) sorted by (country, date, id);
+- one index entry per (country, year) partition (``PARTITION``) pointing
+  at its run of records, sorted by (country, year);
+- an id index (``ID_ENTRY``) mapping holiday ids to records, sorted by id.
+
+Files are memory-mapped, so worker processes share their pages, and
+``SnapshotStore`` switches to a new file once it is renamed over the old one.
+
+Build a snapshot with ``python -m holiday_api.snapshot holidays.snapshot``.
+"""
+import argparse
+import bisect
+import datetime
+import logging
+import mmap
+import os
+import struct
+import tempfile
+import threading
+import time
+from typing import (Any, Callable, Dict, Iterator, List, NamedTuple,
+                    Optional, Sequence, Tuple)
+
+from prometheus_client import Gauge
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from holiday_api import config, database, models
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b'HOLSNAP\0'
+FORMAT_VERSION = 1
+
+# magic, format version, holidays, partitions, change log sequence,
+# created at (µs since the epoch), then offsets of the string table,
+# records, partition index and id index.
+HEADER = struct.Struct('<8sHxxIIqqQQQQ')
+# id, date ordinal, name offset, updated at (µs), name length, public
+RECORD = struct.Struct('<IIIqH?x')
+# country, year, first record, records, version, updated at (µs)
+PARTITION = struct.Struct('<2sHIIIq')
+# id, record index
+ID_ENTRY = struct.Struct('<II')
+
+EPOCH = datetime.datetime(1970, 1, 1)
+
+SNAPSHOT_SEQUENCE = Gauge(
+    'holiday_snapshot_sequence',
+    'Change log sequence number of the loaded holiday snapshot.',
+    multiprocess_mode='liveall',
+)
+
+
+class SnapshotError(ValueError):
+    pass
+
+
+class SnapshotHoliday(NamedTuple):
+    id: int
+    name: str
+    date: datetime.date
+    public: bool
+    country: str
+    updated_at: datetime.datetime
+
+
+class SnapshotPartition(NamedTuple):
+    country: str
+    year: int
+    first: int
+    size: int
+    version: int
+    updated_at: datetime.datetime
+
+
+def _micros(value: datetime.datetime) -> int:
+    return (value - EPOCH) // datetime.timedelta(microseconds=1)
+
+
+def _datetime(micros: int) -> datetime.datetime:
+    return EPOCH + datetime.timedelta(microseconds=micros)
+
+
+def _country(code: str) -> bytes:
+    encoded = code.encode()
+    if len(encoded) > 2:
+        raise SnapshotError(f'Country code too long: {code!r}')
+    return encoded
+
+
+def _align(buffer: bytearray) -> int:
+    buffer.extend(b'\0' * (-len(buffer) % 8))
+    return len(buffer)
+
+
+class _Keys(Sequence[Any]):
+    """Keys of fixed-width entries, for ``bisect`` without copying them."""
+
+    def __init__(
+        self,
+        buffer: Any,
+        offset: int,
+        count: int,
+        entry: struct.Struct,
+        key: Callable[[Tuple[Any, ...]], Any],
+    ):
+        self._buffer = buffer
+        self._offset = offset
+        self._count = count
+        self._entry = entry
+        self._key = key
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __getitem__(self, index: Any) -> Any:
+        return self._key(self._entry.unpack_from(
+            self._buffer, self._offset + index * self._entry.size))
+
+
+class Snapshot:
+    """A memory-mapped snapshot file."""
+
+    holiday_count: int
+    partition_count: int
+    sequence: int
+
+    def __init__(self, path: str):
+        with open(path, 'rb') as file:
+            # Mapping an empty file fails with a bare ValueError.
+            if os.fstat(file.fileno()).st_size < HEADER.size:
+                raise SnapshotError(f'Not a holiday snapshot: {path}')
+            self._map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        (magic, version, self.holiday_count, self.partition_count,
+         self.sequence, created_at, self._strings, self._records,
+         self._partitions, self._ids) = HEADER.unpack_from(self._map)
+        if magic != MAGIC:
+            raise SnapshotError(f'Not a holiday snapshot: {path}')
+        if version != FORMAT_VERSION:
+            raise SnapshotError(
+                f'Unsupported snapshot format version {version}: {path}')
+        sections = (
+            (self._strings, self._records - self._strings),
+            (self._records, self.holiday_count * RECORD.size),
+            (self._partitions, self.partition_count * PARTITION.size),
+            (self._ids, self.holiday_count * ID_ENTRY.size),
+        )
+        if any(size < 0 or offset + size > len(self._map)
+               for offset, size in sections):
+            raise SnapshotError(f'Truncated holiday snapshot: {path}')
+        self.created_at = _datetime(created_at)
+        self._partition_keys = _Keys(
+            self._map, self._partitions, self.partition_count, PARTITION,
+            lambda entry: (entry[0], entry[1]))
+        self._partition_firsts = _Keys(
+            self._map, self._partitions, self.partition_count, PARTITION,
+            lambda entry: entry[2])
+        self._id_keys = _Keys(
+            self._map, self._ids, self.holiday_count, ID_ENTRY,
+            lambda entry: entry[0])
+
+    def _partition(self, index: int) -> SnapshotPartition:
+        country, year, first, size, version, updated_at = \
+            PARTITION.unpack_from(
+                self._map, self._partitions + index * PARTITION.size)
+        return SnapshotPartition(
+            country.rstrip(b'\0').decode(), year, first, size, version,
+            _datetime(updated_at))
+
+    def _find_partition(self, country: str, year: int) -> Optional[int]:
+        key = (country.encode().ljust(2, b'\0'), year)
+        index = bisect.bisect_left(self._partition_keys, key)
+        if index < self.partition_count \
+                and self._partition_keys[index] == key:
+            return index
+        return None
+
+    def _holiday(self, index: int, country: str) -> SnapshotHoliday:
+        id_, ordinal, name_offset, updated_at, name_length, public = \
+            RECORD.unpack_from(self._map, self._records + index * RECORD.size)
+        start = self._strings + name_offset
+        return SnapshotHoliday(
+            id_,
+            self._map[start:start + name_length].decode(),
+            datetime.date.fromordinal(ordinal),
+            public,
+            country,
+            _datetime(updated_at),
+        )
+
+    def partition(
+        self,
+        country: str,
+        year: int,
+    ) -> Optional[SnapshotPartition]:
+        index = self._find_partition(country, year)
+        return None if index is None else self._partition(index)
+
+    def holidays(self, country: str, year: int) -> List[SnapshotHoliday]:
+        """Holidays of a partition, sorted by (date, id)."""
+        if (partition := self.partition(country, year)) is None:
+            return []
+        return [self._holiday(index, country) for index in range(
+            partition.first, partition.first + partition.size)]
+
+    def country_holidays(self, country: str) -> List[SnapshotHoliday]:
+        """All holidays of a country, sorted by (date, id)."""
+        code = country.encode().ljust(2, b'\0')
+        start = bisect.bisect_left(self._partition_keys, (code, 0))
+        end = bisect.bisect_left(self._partition_keys, (code, 1 << 16))
+        holidays: List[SnapshotHoliday] = []
+        for index in range(start, end):
+            partition = self._partition(index)
+            holidays.extend(self._holiday(record, country) for record in range(
+                partition.first, partition.first + partition.size))
+        return holidays
+
+    def holiday(self, id_: int) -> Optional[SnapshotHoliday]:
+        index = bisect.bisect_left(self._id_keys, id_)
+        if index == self.holiday_count or self._id_keys[index] != id_:
+            return None
+        _, record = ID_ENTRY.unpack_from(
+            self._map, self._ids + index * ID_ENTRY.size)
+        return self._holiday(record, self._country_of(record))
+
+    def iter_holidays(self) -> Iterator[SnapshotHoliday]:
+        """All holidays in id order."""
+        for index in range(self.holiday_count):
+            _, record = ID_ENTRY.unpack_from(
+                self._map, self._ids + index * ID_ENTRY.size)
+            yield self._holiday(record, self._country_of(record))
+
+    def _country_of(self, record: int) -> str:
+        index = bisect.bisect_right(self._partition_firsts, record) - 1
+        return self._partition(index).country
+
+
+class SnapshotStore:
+    """The current snapshot at ``path``, reopened when the file changes.
+
+    The file is checked at most every ``check_interval`` seconds. Requests
+    keep using the snapshot they started with; the old mapping is released
+    once nothing refers to it. Publish new snapshots by renaming them over
+    ``path``, as ``write_snapshot`` does.
+    """
+
+    def __init__(self, path: str, check_interval: float):
+        self.path = path
+        self.check_interval = check_interval
+        self._snapshot: Optional[Snapshot] = None
+        self._file_key: Optional[Tuple[int, int, int]] = None
+        self._next_check = 0.0
+        self._listeners: List[Callable[[], Any]] = []
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.path)
+
+    def on_swap(self, listener: Callable[[], Any]) -> None:
+        """Call ``listener`` whenever a new snapshot is loaded."""
+        self._listeners.append(listener)
+
+    def get(self) -> Snapshot:
+        if self._snapshot is None or time.monotonic() >= self._next_check:
+            with self._lock:
+                if (self._snapshot is None
+                        or time.monotonic() >= self._next_check):
+                    self._refresh()
+        assert self._snapshot is not None
+        return self._snapshot
+
+    def _refresh(self) -> None:
+        self._next_check = time.monotonic() + self.check_interval
+        try:
+            stat = os.stat(self.path)
+            file_key = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+            if file_key == self._file_key:
+                return
+            snapshot = Snapshot(self.path)
+        except (OSError, ValueError):  # including SnapshotError
+            if self._snapshot is None:
+                raise
+            logger.exception('Failed to load holiday snapshot %s', self.path)
+            return
+        self._snapshot, self._file_key = snapshot, file_key
+        SNAPSHOT_SEQUENCE.set(snapshot.sequence)
+        logger.info('Loaded holiday snapshot %s (%d holidays, sequence %d)',
+                    self.path, snapshot.holiday_count, snapshot.sequence)
+        for listener in self._listeners:
+            listener()
+
+
+HOLIDAY_SNAPSHOT = SnapshotStore(
+    path=config.HOLIDAY_SNAPSHOT_PATH,
+    check_interval=config.HOLIDAY_SNAPSHOT_CHECK_INTERVAL,
+)
+
+
+def build_snapshot(session: Session) -> bytes:
+    """Compile the holidays visible in ``session`` into snapshot bytes."""
+    # pylint: disable=too-many-locals
+    sequence = session.query(  # type: ignore
+        func.max(models.HolidayChange.sequence)).scalar() or 0
+    query = session.query(
+        models.HolidayPartitionVersion.country,
+        models.HolidayPartitionVersion.year,
+        models.HolidayPartitionVersion.version,
+        models.HolidayPartitionVersion.updated_at,
+    )
+    versions = {(country, year): (version, updated_at)
+                for country, year, version, updated_at in query}
+    rows = session.query(
+        models.Holiday.id,
+        models.Holiday.name,
+        models.Holiday.date,
+        models.Holiday.public,
+        models.Holiday.country,
+        models.Holiday.updated_at,
+    ).order_by(
+        models.Holiday.date, models.Holiday.id,
+    ).yield_per(config.EXPORT_BATCH_SIZE)
+
+    strings = bytearray()
+    name_offsets: Dict[str, Tuple[int, int]] = {}
+    # Records are grouped by partition here rather than by the query, so
+    # that partition order does not depend on the database collation.
+    partition_records: Dict[Tuple[str, int], bytearray] = {}
+    ids: List[Tuple[int, Tuple[str, int], int]] = []
+    for id_, name, date, public, country, updated_at in rows:
+        records = partition_records.setdefault(
+            (country, date.year), bytearray())
+        if name not in name_offsets:
+            encoded = name.encode()
+            name_offsets[name] = (len(strings), len(encoded))
+            strings.extend(encoded)
+        name_offset, name_length = name_offsets[name]
+        ids.append((id_, (country, date.year), len(records) // RECORD.size))
+        records.extend(RECORD.pack(
+            id_, date.toordinal(), name_offset, _micros(updated_at),
+            name_length, public))
+
+    # Partitions without holidays are kept for their versions. They start
+    # where the next partition starts, so every record still belongs to
+    # the last partition starting at or before it.
+    partitions = bytearray()
+    firsts: Dict[Tuple[str, int], int] = {}
+    first = 0
+    for key in sorted(set(partition_records) | set(versions),
+                      key=lambda key: (_country(key[0]), key[1])):
+        count = len(partition_records.get(key, b'')) // RECORD.size
+        version, updated_at = versions.get(key, (0, EPOCH))
+        partitions.extend(PARTITION.pack(
+            _country(key[0]), key[1], first, count, version,
+            _micros(updated_at)))
+        firsts[key] = first
+        first += count
+
+    data = bytearray(HEADER.size)
+    strings_offset = _align(data)
+    data.extend(strings)
+    records_offset = _align(data)
+    for key in sorted(partition_records, key=firsts.__getitem__):
+        data.extend(partition_records[key])
+    partitions_offset = _align(data)
+    data.extend(partitions)
+    ids_offset = _align(data)
+    for id_, key, index in sorted(ids):
+        data.extend(ID_ENTRY.pack(id_, firsts[key] + index))
+    HEADER.pack_into(
+        data, 0, MAGIC, FORMAT_VERSION, len(ids),
+        len(partitions) // PARTITION.size, sequence,
+        _micros(datetime.datetime.utcnow()), strings_offset, records_offset,
+        partitions_offset, ids_offset)
+    return bytes(data)
+
+
+def write_snapshot(data: bytes, path: str) -> None:
+    """Write ``data`` to ``path`` atomically, by renaming a complete file."""
+    directory = os.path.dirname(os.path.abspath(path))
+    with tempfile.NamedTemporaryFile(
+            dir=directory, prefix='.snapshot-', delete=False) as file:
+        try:
+            file.write(data)
+            file.flush()
+            os.fsync(file.fileno())
+        except BaseException:
+            os.unlink(file.name)
+            raise
+    os.chmod(file.name, 0o644)
+    os.replace(file.name, path)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(
+        prog='python -m holiday_api.snapshot',
+        description='Compile the holidays table of DATABASE_URL into a '
+                    'read-only snapshot file.',
+    )
+    parser.add_argument('output', help='snapshot file to create or replace')
+    args = parser.parse_args(argv)
+    session = database.SessionLocal()
+    try:
+        data = build_snapshot(session)
+    finally:
+        session.close()  # pylint: disable=no-member
+    write_snapshot(data, args.output)
+    _, _, holidays, partitions, sequence, *_ = HEADER.unpack_from(data)
+    print(f'Wrote {holidays} holidays in {partitions} partitions '
+          f'(sequence {sequence}, {len(data)} bytes) to {args.output}')
+
+
+if __name__ == '__main__':
+    main()
@@ -1,5 +1,13 @@
+from holiday_api.stats.aggregator import UniqueUsersAggregator
+from holiday_api.stats.collector import UniqueUsersCollector
+from holiday_api.stats.hyperloglog import HyperLogLog
+from holiday_api.stats.sketches import UniqueUsersSketches
 from holiday_api.stats.unique_users import UniqueUsers
 
 __all__ = [
+    'HyperLogLog',
     'UniqueUsers',
+    'UniqueUsersAggregator',
+    'UniqueUsersCollector',
+    'UniqueUsersSketches',
 ]
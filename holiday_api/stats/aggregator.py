@@ -0,0 +1,103 @@
+import asyncio
+import logging
+import threading
+from ipaddress import IPv4Address, IPv6Address
+from typing import Callable, Dict, Optional, Protocol, Union
+
+from sqlalchemy.orm import Session
+
+from holiday_api import database
+from holiday_api.stats.unique_users import UniqueUsers
+
+logger = logging.getLogger(__name__)
+
+
+class UniqueUsersStore(Protocol):
+    def update_many(self, hits: Dict[str, int]) -> int:
+        raise NotImplementedError
+
+    def total(self) -> int:
+        raise NotImplementedError
+
+
+class UniqueUsersAggregator:
+    """Counts hits per IP in memory and writes them behind in batches.
+
+    Pending hits are flushed by a background task every ``flush_interval``
+    seconds, or earlier once ``flush_threshold`` distinct addresses are
+    waiting. ``stop`` performs a final flush.
+    """
+
+    def __init__(
+        self,
+        flush_interval: float,
+        flush_threshold: int,
+        store: Callable[[Session], UniqueUsersStore] = UniqueUsers,
+    ):
+        self.flush_interval = flush_interval
+        self.flush_threshold = flush_threshold
+        self.store = store
+        self._hits: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def add(self, ip_address: Union[IPv4Address, IPv6Address]) -> None:
+        if ip_address.is_loopback:
+            return
+        key = ip_address.exploded
+        with self._lock:
+            self._hits[key] = self._hits.get(key, 0) + 1
+            pending = len(self._hits)
+        if pending >= self.flush_threshold and self._wakeup is not None:
+            self._wakeup.set()
+
+    def flush(self) -> int:
+        with self._flush_lock:
+            with self._lock:
+                hits, self._hits = self._hits, {}
+            if not hits:
+                return 0
+            session = database.SessionLocal()
+            try:
+                return self.store(session).update_many(hits)
+            except Exception:
+                self._restore(hits)
+                raise
+            finally:
+                session.close()  # pylint: disable=no-member
+
+    def _restore(self, hits: Dict[str, int]) -> None:
+        with self._lock:
+            for key, count in hits.items():
+                self._hits[key] = self._hits.get(key, 0) + count
+
+    async def start(self) -> None:
+        self._wakeup = asyncio.Event()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        self._wakeup = None
+        await database.run_in_executor(self.flush)
+
+    async def _run(self) -> None:
+        assert self._wakeup is not None
+        while True:
+            try:
+                await asyncio.wait_for(
+                    self._wakeup.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            try:
+                await database.run_in_executor(self.flush)
+            except Exception:  # pylint: disable=broad-except
+                logger.exception('Failed to flush unique users stats')
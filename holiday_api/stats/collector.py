@@ -0,0 +1,54 @@
+import logging
+import time
+from typing import Callable, Iterator, List, Optional
+
+from prometheus_client.core import GaugeMetricFamily
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from holiday_api import database
+from holiday_api.stats.aggregator import UniqueUsersStore
+
+logger = logging.getLogger(__name__)
+
+NAME = 'unique_users_total'
+DOCUMENTATION = 'Total count of all unique users using api.'
+
+
+class UniqueUsersCollector:
+    """Reports the unique users total stored in the database as a gauge.
+
+    Every worker reads the same shared total, so scrapes agree no matter
+    which process answers them. The value is cached for ``ttl`` seconds.
+    """
+
+    def __init__(
+        self,
+        store: Callable[[Session], UniqueUsersStore],
+        ttl: float,
+    ):
+        self.store = store
+        self.ttl = ttl
+        self._total: Optional[int] = None
+        self._expires_at = 0.0
+
+    def describe(self) -> List[GaugeMetricFamily]:
+        return [GaugeMetricFamily(NAME, DOCUMENTATION)]
+
+    def collect(self) -> Iterator[GaugeMetricFamily]:
+        if (total := self._get_total()) is not None:
+            yield GaugeMetricFamily(NAME, DOCUMENTATION, value=total)
+
+    def _get_total(self) -> Optional[int]:
+        if time.monotonic() < self._expires_at:
+            return self._total
+        session = database.SessionLocal()
+        try:
+            self._total = self.store(session).total()
+        except (SQLAlchemyError, ValueError):
+            logger.exception('Failed to read the unique users total')
+            return self._total
+        finally:
+            session.close()  # pylint: disable=no-member
+        self._expires_at = time.monotonic() + self.ttl
+        return self._total
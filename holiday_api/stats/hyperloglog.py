@@ -0,0 +1,94 @@
+import hashlib
+import math
+from typing import Optional
+
+MIN_PRECISION = 4
+MAX_PRECISION = 16
+
+
+class HyperLogLog:
+    """Cardinality sketch with ``2 ** precision`` one-byte registers.
+
+    The standard error of ``count`` is about ``1.04 / sqrt(2 ** precision)``,
+    e.g. 0.8% for the default precision of 14 (16 KiB of registers).
+    """
+
+    def __init__(self, precision: int = 14, registers: Optional[bytes] = None):
+        if not MIN_PRECISION <= precision <= MAX_PRECISION:
+            raise ValueError(
+                f'precision must be between {MIN_PRECISION} and {MAX_PRECISION}')
+        self.precision = precision
+        self.size = 1 << precision
+        if registers is None:
+            self.registers = bytearray(self.size)
+        elif len(registers) == self.size:
+            self.registers = bytearray(registers)
+        else:
+            raise ValueError(
+                f'expected {self.size} registers, got {len(registers)}')
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> 'HyperLogLog':
+        return cls(precision=len(data).bit_length() - 1, registers=data)
+
+    def to_bytes(self) -> bytes:
+        return bytes(self.registers)
+
+    def add(self, value: str) -> bool:
+        """Add ``value``; returns whether any register changed."""
+        digest = hashlib.blake2b(value.encode(), digest_size=8).digest()
+        hash_ = int.from_bytes(digest, 'big')
+        width = 64 - self.precision
+        index = hash_ >> width
+        rank = width - (hash_ & ((1 << width) - 1)).bit_length() + 1
+        if rank > self.registers[index]:
+            self.registers[index] = rank
+            return True
+        return False
+
+    def merge(self, other: 'HyperLogLog') -> 'HyperLogLog':
+        """Merge ``other`` into this sketch in place (union of both sets)."""
+        if other.precision != self.precision:
+            raise ValueError('cannot merge sketches of different precision')
+        self.registers = bytearray(
+            max(mine, theirs)
+            for mine, theirs in zip(self.registers, other.registers))
+        return self
+
+    def fold(self, precision: int) -> 'HyperLogLog':
+        """Return this sketch at a lower ``precision``.
+
+        The result equals a sketch of the same values built at ``precision``:
+        the index bits that are dropped become the leading bits of the rank.
+        """
+        if precision == self.precision:
+            return self
+        if precision > self.precision:
+            raise ValueError('cannot fold a sketch to a higher precision')
+        shift = self.precision - precision
+        folded = HyperLogLog(precision)
+        for index, register in enumerate(self.registers):
+            if not register:
+                continue
+            dropped = index & ((1 << shift) - 1)
+            if dropped:
+                rank = shift - dropped.bit_length() + 1
+            else:
+                rank = shift + register
+            target = index >> shift
+            if rank > folded.registers[target]:
+                folded.registers[target] = rank
+        return folded
+
+    def count(self) -> int:
+        size = self.size
+        if size >= 128:
+            alpha = 0.7213 / (1 + 1.079 / size)
+        else:
+            alpha = {16: 0.673, 32: 0.697, 64: 0.709}[size]
+        estimate = alpha * size * size / math.fsum(
+            2.0 ** -register for register in self.registers)
+        zeros = self.registers.count(0)
+        if estimate <= 2.5 * size and zeros:
+            estimate = size * math.log(size / zeros)
+        return int(round(estimate))
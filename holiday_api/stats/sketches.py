@@ -0,0 +1,106 @@
+import datetime
+from typing import Dict, Iterable, List, Optional
+
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from holiday_api import config, models
+from holiday_api.stats.hyperloglog import HyperLogLog
+
+ALL_TIME = 'all'
+
+
+def day_period(day: datetime.date) -> str:
+    return f'day:{day.isoformat()}'
+
+
+def month_period(day: datetime.date) -> str:
+    return f'month:{day.year:04d}-{day.month:02d}'
+
+
+class UniqueUsersSketches:
+    """Approximate unique users counting backed by HyperLogLog sketches.
+
+    Every hit updates the daily, monthly and all-time sketch, so storage
+    stays fixed per period no matter how many distinct clients there are.
+    Stored sketches keep the precision they were created with; when
+    ``HLL_PRECISION`` changes, counts are taken at the lowest precision
+    involved.
+    """
+
+    def __init__(self, session: Session, precision: int = config.HLL_PRECISION):
+        self.session = session
+        self.precision = precision
+
+    def get(self, period: str) -> Optional[HyperLogLog]:
+        row = self.session.query(
+            models.UniqueUsersSketch).get(period)
+        if row is None:
+            return None
+        return HyperLogLog.from_bytes(row.registers)
+
+    def count(self, periods: Iterable[str]) -> int:
+        """Estimate unique users over the union of ``periods``."""
+        sketches = [
+            sketch for period in periods if (sketch := self.get(period))]
+        precision = min(
+            [self.precision, *(sketch.precision for sketch in sketches)])
+        merged = HyperLogLog(precision)
+        for sketch in sketches:
+            merged.merge(sketch.fold(precision))
+        return merged.count()
+
+    def total(self) -> int:
+        return self.count([ALL_TIME])
+
+    def update_many(
+        self,
+        hits: Dict[str, int],
+        day: Optional[datetime.date] = None,
+    ) -> int:
+        """Add exploded IP addresses to the sketches of ``day``.
+
+        Returns the increase of the all-time estimate.
+        """
+        day = day or datetime.datetime.utcnow().date()
+        try:
+            added = self._update_many(hits, day)
+        except IntegrityError:
+            # Another process created one of the period sketches first.
+            self.session.rollback()
+            added = self._update_many(hits, day)
+        return added
+
+    def _update_many(self, hits: Dict[str, int], day: datetime.date) -> int:
+        periods = [ALL_TIME, month_period(day), day_period(day)]
+        rows = self._get_rows_for_update(periods)
+        added = 0
+        for period in periods:
+            sketch = HyperLogLog.from_bytes(rows[period].registers)
+            before = sketch.count() if period == ALL_TIME else 0
+            if any([sketch.add(ip_address) for ip_address in hits]):
+                rows[period].registers = sketch.to_bytes()
+                if period == ALL_TIME:
+                    added = max(sketch.count() - before, 0)
+        self.session.commit()
+        return added
+
+    def _get_rows_for_update(
+        self,
+        periods: List[str],
+    ) -> Dict[str, models.UniqueUsersSketch]:
+        rows = {
+            row.period: row
+            for row in self.session.query(
+                models.UniqueUsersSketch)
+            .filter(models.UniqueUsersSketch.period.in_(periods))
+            .with_for_update()
+        }
+        for period in periods:
+            if period not in rows:
+                rows[period] = models.UniqueUsersSketch(
+                    period=period,
+                    registers=HyperLogLog(self.precision).to_bytes(),
+                )
+                self.session.add(rows[period])
+        return rows
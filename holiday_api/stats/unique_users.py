@@ -1,72 +1,68 @@
-from ipaddress import IPv4Address, IPv6Address
-from typing import Optional, Union
+from typing import Dict, Set
 
+from sqlalchemy import bindparam
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
-from prometheus_client import Counter
 
 from holiday_api import models
 
-
-UNIQUE_USERS = Counter(
-    'unique_users', 'Total count of all unique users using api.'
-)
+# Keeps IN (...) lists below SQLite's default bound parameter limit.
+LOOKUP_CHUNK_SIZE = 500
 
 
 class UniqueUsers:
     def __init__(self, session: Session):
         self.session = session
-        self._set_initial_counter_value()
 
-    def _set_initial_counter_value(self) -> None:
-        if UNIQUE_USERS._value.get() == 0:  # pylint: disable=W0212
-            total_users = self._get_total_unique_users()
-            UNIQUE_USERS.inc(total_users.count)
-            self.session.commit()  # type: ignore
+    def total(self) -> int:
+        return self._get_total_unique_users().count
 
     def _get_total_unique_users(self) -> models.TotalUniqueUsers:
         total_users = self.session.query(  # type: ignore
             models.TotalUniqueUsers).get(1)
         return total_users  # type: ignore
 
-    def update(
-        self,
-        ip_address: Union[IPv4Address, IPv6Address],
-    ) -> Optional[models.UniqueUser]:
-        if ip_address.is_loopback:
-            return None
-        if unique_user := self.get(ip_address):
-            unique_user.count = unique_user.count + 1
-            self.session.commit()  # type: ignore
-        else:
-            unique_user = self.create(ip_address)
-            total_unique_users = self._get_total_unique_users()
-            total_unique_users.count = total_unique_users.count + 1
-            UNIQUE_USERS.inc()
-            self.session.commit()  # type: ignore
-        return unique_user
-
-    def create(
-        self,
-        ip_address: Union[IPv4Address, IPv6Address],
-    ) -> models.UniqueUser:
-        unique_user = models.UniqueUser(ip_address=ip_address.exploded)
-        self.session.add(unique_user)
-        self.session.commit()  # type: ignore
-        return unique_user
+    def update_many(self, hits: Dict[str, int]) -> int:
+        """Add hit counts per exploded IP address in a single transaction.
 
-    def get(
-        self,
-        ip_address: Union[IPv4Address, IPv6Address],
-    ) -> Optional[models.UniqueUser]:
-        unique_user = self.session.query(  # type: ignore
-            models.UniqueUser).filter_by(ip_address=ip_address.exploded).first()
-        return unique_user  # type: ignore
+        Returns the number of addresses seen for the first time.
+        """
+        try:
+            new_users = self._update_many(hits)
+        except IntegrityError:
+            # Another process inserted one of the new addresses first.
+            self.session.rollback()
+            new_users = self._update_many(hits)
+        return new_users
 
-    def delete(
-        self,
-        ip_address: Union[IPv4Address, IPv6Address],
-    ) -> Optional[models.UniqueUser]:
-        if unique_user := self.get(ip_address):
-            self.session.delete(unique_user)  # type: ignore
-            self.session.commit()  # type: ignore
-        return unique_user
+    def _update_many(self, hits: Dict[str, int]) -> int:
+        ip_addresses = list(hits)
+        known: Set[str] = set()
+        for start in range(0, len(ip_addresses), LOOKUP_CHUNK_SIZE):
+            chunk = ip_addresses[start:start + LOOKUP_CHUNK_SIZE]
+            rows = self.session.query(
+                models.UniqueUser.ip_address)\
+                .filter(models.UniqueUser.ip_address.in_(chunk))
+            known.update(ip for ip, in rows)
+        table = models.UniqueUser.__table__
+        if known:
+            self.session.execute(
+                table.update()
+                .where(table.c.ip_address == bindparam('ip'))
+                .values(count=table.c.count + bindparam('hits')),
+                [{'ip': ip, 'hits': hits[ip]} for ip in known],
+            )
+        new = [ip for ip in ip_addresses if ip not in known]
+        if new:
+            self.session.execute(
+                table.insert(),
+                [{'ip_address': ip, 'count': hits[ip]} for ip in new],
+            )
+            total_table = models.TotalUniqueUsers.__table__
+            self.session.execute(
+                total_table.update()
+                .where(total_table.c.id == 1)
+                .values(count=total_table.c.count + len(new)),
+            )
+        self.session.commit()
+        return len(new)
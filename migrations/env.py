@@ -0,0 +1,64 @@
+from logging.config import fileConfig
+from typing import Any
+
+from alembic import context
+from sqlalchemy import engine_from_config, pool
+
+from holiday_api import config as app_config
+from holiday_api import models  # pylint: disable=unused-import
+from holiday_api.database import Base
+
+config = context.config
+config.set_main_option('sqlalchemy.url', app_config.DATABASE_URL)
+
+fileConfig(config.config_file_name)
+
+target_metadata = Base.metadata
+
+# Maintained by SQLite itself for AUTOINCREMENT columns.
+INTERNAL_TABLES = {'sqlite_sequence'}
+
+
+def include_object(
+        object_: Any, name: str, type_: str, reflected: bool,
+        compare_to: Any) -> bool:
+    # pylint: disable=unused-argument
+    return not (type_ == 'table' and name in INTERNAL_TABLES)
+
+
+def run_migrations_offline() -> None:
+    context.configure(
+        url=config.get_main_option('sqlalchemy.url'),
+        target_metadata=target_metadata,
+        literal_binds=True,
+        dialect_opts={'paramstyle': 'named'},
+        include_object=include_object,
+    )
+
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def run_migrations_online() -> None:
+    connectable = engine_from_config(
+        config.get_section(config.config_ini_section),
+        prefix='sqlalchemy.',
+        poolclass=pool.NullPool,
+    )
+
+    with connectable.connect() as connection:
+        context.configure(
+            connection=connection,
+            target_metadata=target_metadata,
+            render_as_batch=connection.dialect.name == 'sqlite',
+            include_object=include_object,
+        )
+
+        with context.begin_transaction():
+            context.run_migrations()
+
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
@@ -0,0 +1,28 @@
+"""Index holidays by country and date
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18 12:30:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '0002'
+down_revision = '0001'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index(
+        'ix_holidays_country_date', 'holidays', ['country', 'date'])
+    op.create_index(
+        'ix_holidays_country_public_date', 'holidays',
+        ['country', 'public', 'date'])
+
+
+def downgrade():
+    op.drop_index('ix_holidays_country_public_date', table_name='holidays')
+    op.drop_index('ix_holidays_country_date', table_name='holidays')
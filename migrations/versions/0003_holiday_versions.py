@@ -0,0 +1,40 @@
+"""Track holiday modification times and partition versions
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18 13:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0003'
+down_revision = '0002'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column(
+        'holidays', sa.Column('updated_at', sa.DateTime(), nullable=True))
+    holidays = sa.table('holidays', sa.column('updated_at', sa.DateTime()))
+    op.execute(holidays.update().values(updated_at=sa.func.current_timestamp()))
+    with op.batch_alter_table('holidays') as batch_op:
+        batch_op.alter_column(
+            'updated_at', existing_type=sa.DateTime(), nullable=False)
+    op.create_table(
+        'holiday_partition_versions',
+        sa.Column('country', sa.String(), nullable=False),
+        sa.Column('year', sa.Integer(), autoincrement=False, nullable=False),
+        sa.Column('version', sa.Integer(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('country', 'year'),
+    )
+
+
+def downgrade():
+    op.drop_table('holiday_partition_versions')
+    with op.batch_alter_table('holidays') as batch_op:
+        batch_op.drop_column('updated_at')
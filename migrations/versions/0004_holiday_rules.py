@@ -0,0 +1,44 @@
+"""Add recurring holiday rules
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-18 15:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0004'
+down_revision = '0003'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'holiday_rules',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('name', sa.String(), nullable=False),
+        sa.Column('country', sa.String(), nullable=False),
+        sa.Column('public', sa.Boolean(), nullable=False),
+        sa.Column('kind', sa.String(), nullable=False),
+        sa.Column('month', sa.Integer(), nullable=True),
+        sa.Column('day', sa.Integer(), nullable=True),
+        sa.Column('weekday', sa.Integer(), nullable=True),
+        sa.Column('nth', sa.Integer(), nullable=True),
+        sa.Column('offset', sa.Integer(), nullable=True),
+        sa.Column('observed', sa.String(), nullable=False),
+        sa.Column('year_from', sa.Integer(), nullable=True),
+        sa.Column('year_to', sa.Integer(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index(
+        'ix_holiday_rules_country', 'holiday_rules', ['country'])
+
+
+def downgrade():
+    op.drop_index('ix_holiday_rules_country', table_name='holiday_rules')
+    op.drop_table('holiday_rules')
@@ -0,0 +1,34 @@
+"""Log holiday changes
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-18 17:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0005'
+down_revision = '0004'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'holiday_changes',
+        sa.Column('sequence', sa.Integer(), nullable=False),
+        sa.Column('operation', sa.String(), nullable=False),
+        sa.Column('holiday_id', sa.Integer(), nullable=True),
+        sa.Column('country', sa.String(), nullable=False),
+        sa.Column('year', sa.Integer(), nullable=False),
+        sa.Column('changed_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('sequence'),
+        sqlite_autoincrement=True,
+    )
+
+
+def downgrade():
+    op.drop_table('holiday_changes')
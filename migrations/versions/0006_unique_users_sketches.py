@@ -0,0 +1,33 @@
+"""Store approximate unique users sketches
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-18 19:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0006'
+down_revision = '0005'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Earlier revisions of 0001 created the table already.
+    inspector = sa.inspect(op.get_bind())
+    if 'unique_users_sketches' in inspector.get_table_names():
+        return
+    op.create_table(
+        'unique_users_sketches',
+        sa.Column('period', sa.String(), nullable=False),
+        sa.Column('registers', sa.LargeBinary(), nullable=False),
+        sa.PrimaryKeyConstraint('period'),
+    )
+
+
+def downgrade():
+    op.drop_table('unique_users_sketches')
@@ -0,0 +1,74 @@
+import os
+import pathlib
+import tempfile
+from typing import Iterator, Tuple
+
+import pytest
+
+# Configuration is read on import, so the test database is set up first.
+os.environ.setdefault(
+    'DATABASE_URL',
+    'sqlite:///' + os.path.join(tempfile.mkdtemp(), 'holiday_api.db'),
+)
+
+# pylint: disable=wrong-import-position
+from alembic import command  # noqa: E402
+from alembic.config import Config  # noqa: E402
+from fastapi.testclient import TestClient  # noqa: E402
+
+from holiday_api import database, models  # noqa: E402
+from holiday_api.auth import CREDENTIALS_CACHE  # noqa: E402
+from holiday_api.main import app  # noqa: E402
+from holiday_api.routers.holidays.bitmap import HOLIDAY_BITMAPS  # noqa: E402
+from holiday_api.routers.holidays.cache import HOLIDAY_CACHE  # noqa: E402
+from holiday_api.routers.holidays.calendar import \
+    HOLIDAY_CALENDARS  # noqa: E402
+from holiday_api.routers.rules.expansion import HOLIDAY_RULES  # noqa: E402
+
+ROOT = pathlib.Path(__file__).resolve().parent.parent
+
+Auth = Tuple[str, str]
+
+
+@pytest.fixture(scope='session', autouse=True)
+def migrated_database() -> None:
+    alembic_config = Config(str(ROOT / 'alembic.ini'))
+    alembic_config.set_main_option(
+        'script_location', str(ROOT / 'migrations'))
+    command.upgrade(alembic_config, 'head')
+
+
+@pytest.fixture(autouse=True)
+def clean_state() -> Iterator[None]:
+    yield
+    session = database.SessionLocal()
+    try:
+        for table in reversed(database.Base.metadata.sorted_tables):
+            if table.name != 'total_unique_users':
+                session.execute(table.delete())
+        session.query(models.TotalUniqueUsers).update({'count': 0})
+        session.commit()
+    finally:
+        session.close()
+    for cache in (CREDENTIALS_CACHE, HOLIDAY_CACHE, HOLIDAY_CALENDARS,
+                  HOLIDAY_BITMAPS, HOLIDAY_RULES, database.RECENT_WRITERS):
+        cache.clear()
+
+
+@pytest.fixture
+def client() -> TestClient:
+    return TestClient(app)
+
+
+@pytest.fixture
+def admin() -> Auth:
+    session = database.SessionLocal()
+    try:
+        user = models.User(first_name='Ada', last_name='Admin',
+                           username='admin')
+        user.set_password('secret')
+        session.add(user)
+        session.commit()
+    finally:
+        session.close()
+    return 'admin', 'secret'
@@ -0,0 +1,52 @@
+import asyncio
+from typing import AsyncIterator, List
+
+import pytest
+from fastapi import Request, Response
+from fastapi.responses import StreamingResponse
+
+from holiday_api.main import admission_controller, admit_request, app
+
+
+@pytest.fixture(autouse=True)
+def concurrency_limit(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(admission_controller, 'max_concurrency', 1)
+    monkeypatch.setattr(admission_controller, 'in_progress', 0)
+
+
+def request() -> Request:
+    return Request({'type': 'http', 'method': 'GET', 'path': '/stream',
+                    'app': app, 'headers': [], 'client': None})
+
+
+def test_streamed_response_holds_its_slot_until_the_body_ends() -> None:
+    in_progress: List[int] = []
+
+    async def body() -> AsyncIterator[bytes]:
+        for chunk in (b'first', b'second'):
+            yield chunk
+
+    async def call_next(request_: Request) -> Response:
+        return StreamingResponse(body())
+
+    async def handle() -> None:
+        response = await admit_request(request(), call_next)
+        rejected = await admit_request(request(), call_next)
+        assert rejected.status_code == 503
+        async for _ in response.body_iterator:  # type: ignore
+            in_progress.append(admission_controller.in_progress)
+
+    asyncio.run(handle())
+
+    assert in_progress == [1, 1]
+    assert admission_controller.in_progress == 0
+
+
+def test_failed_request_releases_its_slot() -> None:
+    async def call_next(request_: Request) -> Response:
+        raise RuntimeError
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(admit_request(request(), call_next))
+
+    assert admission_controller.in_progress == 0
@@ -0,0 +1,88 @@
+from typing import Tuple
+
+import pytest
+from fastapi.security import HTTPBasicCredentials
+from fastapi.testclient import TestClient
+
+from holiday_api import auth, database, models
+from holiday_api.auth import CREDENTIALS_CACHE, CredentialsCache
+
+Auth = Tuple[str, str]
+
+
+def test_add_is_dropped_after_concurrent_invalidation() -> None:
+    cache = CredentialsCache(ttl=60, max_size=10)
+    generation = cache.generation
+
+    cache.invalidate(1)
+    cache.add('admin', 'hash', 'old', 1, generation)
+    cache.add('guest', 'hash', 'secret', 2, generation)
+
+    assert not cache.contains('admin', 'hash', 'old')
+    assert cache.contains('guest', 'hash', 'secret')
+
+
+def password_hash(username: str) -> str:
+    session = database.SessionLocal()
+    try:
+        user = session.query(models.User).filter_by(username=username).one()
+        return user.password_hash  # type: ignore
+    finally:
+        session.close()
+
+
+def test_password_change_during_verification_is_not_cached(
+    client: TestClient,
+    admin: Auth,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    check_credentials = auth.check_credentials
+
+    def check_then_change_password(
+        user: models.User,
+        credentials: HTTPBasicCredentials,
+    ) -> bool:
+        # The password change commits while this request still verifies.
+        CREDENTIALS_CACHE.invalidate(user.id)
+        return check_credentials(user, credentials)
+
+    monkeypatch.setattr(
+        auth, 'check_credentials', check_then_change_password)
+
+    assert client.get('/users', auth=admin).status_code == 200
+    username, password = admin
+    assert not CREDENTIALS_CACHE.contains(
+        username, password_hash(username), password)
+
+
+def test_password_changed_by_another_worker_is_not_served_from_cache(
+    client: TestClient,
+    admin: Auth,
+) -> None:
+    assert client.get('/users', auth=admin).status_code == 200
+    # Another worker changes the password: this worker's cache is not told.
+    session = database.SessionLocal()
+    try:
+        user = session.query(models.User).filter_by(username='admin').one()
+        user.set_password('changed')
+        session.commit()
+    finally:
+        session.close()
+
+    assert client.get('/users', auth=admin).status_code == 401
+    assert client.get('/users', auth=('admin', 'changed')).status_code == 200
+
+
+def test_user_deleted_by_another_worker_is_not_served_from_cache(
+    client: TestClient,
+    admin: Auth,
+) -> None:
+    assert client.get('/users', auth=admin).status_code == 200
+    session = database.SessionLocal()
+    try:
+        session.query(models.User).filter_by(username='admin').delete()
+        session.commit()
+    finally:
+        session.close()
+
+    assert client.get('/users', auth=admin).status_code == 401
@@ -0,0 +1,76 @@
+from typing import Any, List, Tuple
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.exc import SQLAlchemyError
+
+from holiday_api import config, database, models
+from holiday_api.main import app
+from holiday_api.routers.holidays import schemas
+from holiday_api.routers.holidays.repository import SQLAlchemyHolidayRepository
+
+Auth = Tuple[str, str]
+
+
+class RejectingRepository(SQLAlchemyHolidayRepository):
+    """Fails every insert that contains a holiday named ``Bad``."""
+
+    def create_many(self, holidays: List[schemas.HolidayInPOST]) -> int:
+        if any(holiday.name == 'Bad' for holiday in holidays):
+            raise SQLAlchemyError('rejected')
+        return super().create_many(holidays)
+
+
+def ndjson(*names: str) -> str:
+    return ''.join(
+        f'{{"name": "{name}", "date": "2021-01-0{day}", '
+        f'"public": true, "country": "PL"}}\n'
+        for day, name in enumerate(names, 1))
+
+
+def stored_names() -> List[Any]:
+    session = database.SessionLocal()
+    try:
+        return sorted(name for name, in session.query(models.Holiday.name))
+    finally:
+        session.close()
+
+
+@pytest.fixture
+def rejecting_repository(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setitem(app.dependency_overrides,
+                        SQLAlchemyHolidayRepository, RejectingRepository)
+
+
+@pytest.mark.usefixtures('rejecting_repository')
+def test_best_effort_reports_rows_the_database_rejects(
+    client: TestClient,
+    admin: Auth,
+) -> None:
+    response = client.post(
+        '/holidays/bulk?mode=best_effort&batch_size=10', auth=admin,
+        data=ndjson('One', 'Bad', 'Three'))
+
+    assert response.status_code == 200
+    result = response.json()
+    assert (result['inserted'], result['failed']) == (2, 1)
+    assert [error['line'] for error in result['errors']] == [2]
+    assert stored_names() == ['One', 'Three']
+
+
+@pytest.mark.parametrize('mode', ['atomic', 'best_effort'])
+def test_overlong_line_is_rejected(
+    client: TestClient,
+    admin: Auth,
+    monkeypatch: pytest.MonkeyPatch,
+    mode: str,
+) -> None:
+    monkeypatch.setattr(config, 'BULK_IMPORT_MAX_LINE_BYTES', 100)
+    body = ndjson('One') + '{"name": "' + 'x' * 200 + '"}\n'
+
+    response = client.post(
+        f'/holidays/bulk?mode={mode}', auth=admin, data=body)
+
+    assert response.status_code == 413
+    assert response.json() == {'detail': 'Line 2 is longer than 100 bytes'}
+    assert stored_names() == []
@@ -0,0 +1,94 @@
+from typing import List, Tuple
+
+import pytest
+from fastapi.testclient import TestClient
+
+from holiday_api import database, models
+
+Auth = Tuple[str, str]
+
+HOLIDAYS = [
+    ('Nowy Rok', '2021-01-01', True, 'PL'),
+    ('Wigilia', '2021-12-24', False, 'PL'),
+    ('Nowy Rok', '2022-01-01', True, 'PL'),
+    ('Wigilia', '2022-12-24', False, 'PL'),
+    ('Neujahr', '2021-01-01', True, 'DE'),
+]
+
+SELECTIONS = [
+    ('country=PL', 4),
+    ('country=PL&public=false', 2),
+    ('country=PL&name=Nowy%20Rok', 2),
+    ('country=PL&date_from=2021-06-01&date_to=2022-06-01', 2),
+    ('country=PL&name=Wigilia&date_from=2022-01-01', 1),
+    ('country=DE', 1),
+    ('country=CZ', 0),
+]
+
+
+@pytest.fixture
+def holidays(client: TestClient, admin: Auth) -> None:
+    for name, date, public, country in HOLIDAYS:
+        response = client.post('/holidays', auth=admin, json={
+            'name': name, 'date': date, 'public': public, 'country': country})
+        assert response.status_code == 201
+
+
+def stored() -> List[Tuple[str, str, bool, str]]:
+    session = database.SessionLocal()
+    try:
+        return sorted(
+            (name, date.isoformat(), public, country)
+            for name, date, public, country in session.query(
+                models.Holiday.name, models.Holiday.date,
+                models.Holiday.public, models.Holiday.country))
+    finally:
+        session.close()
+
+
+@pytest.mark.usefixtures('holidays')
+@pytest.mark.parametrize('selection, expected', SELECTIONS)
+def test_delete_dry_run_counts_without_deleting(
+    client: TestClient,
+    admin: Auth,
+    selection: str,
+    expected: int,
+) -> None:
+    before = stored()
+
+    response = client.delete(
+        f'/holidays?{selection}&dry_run=true', auth=admin)
+
+    assert response.status_code == 200
+    assert response.json() == {'affected': expected, 'dry_run': True}
+    assert stored() == before
+
+    response = client.delete(f'/holidays?{selection}', auth=admin)
+
+    assert response.json() == {'affected': expected, 'dry_run': False}
+    assert len(stored()) == len(before) - expected
+
+
+@pytest.mark.usefixtures('holidays')
+@pytest.mark.parametrize('selection, expected', SELECTIONS)
+def test_update_dry_run_counts_without_updating(
+    client: TestClient,
+    admin: Auth,
+    selection: str,
+    expected: int,
+) -> None:
+    before = stored()
+
+    response = client.patch(
+        f'/holidays?{selection}&dry_run=true', auth=admin,
+        json={'name': 'Renamed'})
+
+    assert response.status_code == 200
+    assert response.json() == {'affected': expected, 'dry_run': True}
+    assert stored() == before
+
+    response = client.patch(
+        f'/holidays?{selection}', auth=admin, json={'name': 'Renamed'})
+
+    assert response.json() == {'affected': expected, 'dry_run': False}
+    assert [holiday[0] for holiday in stored()].count('Renamed') == expected
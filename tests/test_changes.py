@@ -0,0 +1,203 @@
+import asyncio
+import datetime
+from typing import Any, List, Optional, Tuple
+
+import pytest
+from fastapi.testclient import TestClient
+
+from holiday_api import config, database, models
+from holiday_api.main import app
+from holiday_api.routers.holidays import changes, router
+from holiday_api.routers.holidays.changes import (ChangeBroadcaster,
+                                                  SequenceWindow,
+                                                  holiday_repository,
+                                                  stream_changes)
+from holiday_api.routers.holidays.repository import (
+    HolidayChange, SQLAlchemyHolidayRepository)
+
+Auth = Tuple[str, str]
+
+
+def change(sequence: int) -> HolidayChange:
+    return HolidayChange(sequence, 'create', sequence, 'PL', 2021,
+                         datetime.datetime(2021, 1, 1))
+
+
+class StubRequest:
+    """Disconnects after ``checks`` calls to ``is_disconnected``."""
+
+    def __init__(self, checks: int):
+        self.app = app
+        self._checks = checks
+
+    async def is_disconnected(self) -> bool:
+        self._checks -= 1
+        return self._checks < 0
+
+
+class StaticRepository:
+    CHANGES = [change(1), change(2)]
+
+    def __init__(self, uow: Any):
+        self.uow = uow
+
+    def get_last_sequence(self) -> int:
+        return self.CHANGES[-1].sequence
+
+    def get_changes(self, after: int, limit: int) -> List[HolidayChange]:
+        return [change_ for change_ in self.CHANGES
+                if change_.sequence > after][:limit]
+
+
+def insert_changes(*sequences: int) -> None:
+    session = database.SessionLocal()
+    try:
+        for sequence in sequences:
+            session.add(models.HolidayChange(
+                sequence=sequence, operation='create', holiday_id=sequence,
+                country='PL', year=2021,
+                changed_at=datetime.datetime(2021, 1, 1)))
+        session.commit()
+    finally:
+        session.close()
+
+
+def test_sequence_window_deduplicates_late_sequences() -> None:
+    window = SequenceWindow(size=3, last=10)
+
+    assert not window.add(10)
+    assert window.add(12)
+    assert window.add(11)
+    assert not window.add(11)
+    assert window.add(15)
+    assert not window.add(12)
+    assert not window.add(11)  # older than the window
+    assert window.last == 15
+
+
+def test_broadcaster_delivers_changes_committed_out_of_order() -> None:
+    insert_changes(1, 3)
+
+    async def scenario() -> List[int]:
+        broadcaster = ChangeBroadcaster(
+            poll_interval=0.01, batch_size=10, queue_size=10, lookback=10)
+        queue, position = await broadcaster.subscribe(
+            SQLAlchemyHolidayRepository)
+        assert position == 3
+        insert_changes(4, 2)
+        received: List[int] = []
+        try:
+            while len(received) < 2:
+                batch = await asyncio.wait_for(queue.get(), timeout=5)
+                assert batch is not None
+                received.extend(change.sequence for change in batch)
+            await asyncio.sleep(0.05)
+            assert queue.empty()
+        finally:
+            await broadcaster.stop()
+        return received
+
+    assert sorted(asyncio.run(scenario())) == [2, 4]
+
+
+def stream_event_ids(since: Optional[int]) -> List[str]:
+    """Event ids a stream sends before its client disconnects."""
+    request = StubRequest(checks=1)
+    repository = holiday_repository(request)  # type: ignore
+
+    async def scenario() -> List[str]:
+        broadcaster = ChangeBroadcaster(
+            poll_interval=0.01, batch_size=10, queue_size=10, lookback=10)
+        try:
+            return [event async for event in stream_changes(
+                request, broadcaster, repository,  # type: ignore
+                since=since, heartbeat=0.01)]
+        finally:
+            await broadcaster.stop()
+
+    return [event.splitlines()[0] for event in asyncio.run(scenario())
+            if event.startswith('id:')]
+
+
+@pytest.fixture
+def static_repository(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setitem(app.dependency_overrides,
+                        SQLAlchemyHolidayRepository, StaticRepository)
+
+
+@pytest.mark.usefixtures('static_repository')
+def test_stream_reads_through_overridden_repository() -> None:
+    request = StubRequest(checks=0)
+    assert holiday_repository(request) is StaticRepository  # type: ignore
+    assert stream_event_ids(since=0) == ['id: 1', 'id: 2']
+
+
+@pytest.mark.usefixtures('static_repository')
+def test_stream_without_since_starts_at_last_change() -> None:
+    assert stream_event_ids(since=None) == []
+    assert stream_event_ids(since=1) == ['id: 2']
+
+
+def test_changes_are_paginated_by_sequence(
+    client: TestClient,
+    admin: Auth,
+) -> None:
+    for day in range(1, 6):
+        response = client.post('/holidays', auth=admin, json={
+            'name': f'Day {day}', 'date': f'2021-01-0{day}',
+            'public': True, 'country': 'PL'})
+        assert response.status_code == 201
+
+    pages, since = [], 0
+    while True:
+        page = client.get(
+            f'/holidays/changes?since={since}&limit=2').json()
+        if not page['changes']:
+            assert page['last_sequence'] == since
+            break
+        pages.append([change_['holiday_id'] for change_ in page['changes']])
+        sequences = [change_['sequence'] for change_ in page['changes']]
+        assert sequences == sorted(sequences)
+        assert sequences[0] > since
+        since = page['last_sequence']
+        assert since == sequences[-1]
+
+    assert [len(page) for page in pages] == [2, 2, 1]
+    assert sorted(sum(pages, [])) == sorted(set(sum(pages, [])))
+
+
+def resumed_event_ids(last_event_id: str) -> List[str]:
+    """Event ids the stream endpoint sends after ``Last-Event-ID``."""
+    request = StubRequest(checks=1)
+
+    async def scenario() -> List[str]:
+        try:
+            response = await router.stream_changes(
+                request,  # type: ignore
+                since=None,
+                last_event_id=last_event_id,
+                repository=holiday_repository(request),  # type: ignore
+            )
+            return [event async for event in response.body_iterator]
+        finally:
+            await changes.CHANGE_BROADCASTER.stop()
+
+    return [event.splitlines()[0] for event in asyncio.run(scenario())
+            if event.startswith('id:')]
+
+
+def test_stream_resumes_after_last_event_id(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.setattr(config, 'CHANGE_FEED_HEARTBEAT', 0.01)
+    insert_changes(1, 2, 3)
+
+    assert resumed_event_ids('1') == ['id: 2', 'id: 3']
+    assert resumed_event_ids('3') == []
+
+
+def test_stream_rejects_invalid_last_event_id(client: TestClient) -> None:
+    response = client.get(
+        '/holidays/changes/stream', headers={'Last-Event-ID': 'abc'})
+
+    assert response.status_code == 400
@@ -0,0 +1,71 @@
+import datetime
+from typing import List, Tuple
+
+import pytest
+from fastapi.testclient import TestClient
+
+from holiday_api.routers.holidays import repository
+from holiday_api.routers.holidays.cache import (CachedHoliday,
+                                                HolidayPartitionCache,
+                                                Partition)
+
+Auth = Tuple[str, str]
+
+URL = '/holidays?country=PL&year=2021'
+
+
+def new_cache() -> HolidayPartitionCache:
+    return HolidayPartitionCache(max_bytes=1024 * 1024, ttl=3600)
+
+
+def create_holiday(client: TestClient, admin: Auth, name: str) -> None:
+    response = client.post('/holidays', auth=admin, json={
+        'name': name, 'date': '2021-11-11', 'public': True, 'country': 'PL'})
+    assert response.status_code == 201
+
+
+def test_version_mismatch_reloads_partition() -> None:
+    cache = new_cache()
+    loads: List[int] = []
+
+    def loader(partition: Partition) -> List[CachedHoliday]:
+        loads.append(len(loads))
+        return [CachedHoliday(len(loads), 'Holiday', datetime.date(2021, 1, 1),
+                              True, partition[0])]
+
+    first = cache.get_or_load(('PL', 2021), loader, version=1)
+    assert cache.get_or_load(('PL', 2021), loader, version=1) == first
+    assert cache.get_or_load(('PL', 2021), loader) == first
+    assert len(loads) == 1
+
+    second = cache.get_or_load(('PL', 2021), loader, version=2)
+    assert second != first
+    assert len(loads) == 2
+
+
+def test_worker_does_not_serve_stale_body_under_new_etag(
+    client: TestClient,
+    admin: Auth,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    # Two workers, each with its own cache; writes only invalidate the
+    # cache of the worker that handled them.
+    worker_a, worker_b = new_cache(), new_cache()
+
+    monkeypatch.setattr(repository, 'HOLIDAY_CACHE', worker_a)
+    create_holiday(client, admin, 'Independence Day')
+    first = client.get(URL)
+    assert [h['name'] for h in first.json()] == ['Independence Day']
+
+    monkeypatch.setattr(repository, 'HOLIDAY_CACHE', worker_b)
+    create_holiday(client, admin, 'Second Holiday')
+
+    monkeypatch.setattr(repository, 'HOLIDAY_CACHE', worker_a)
+    second = client.get(URL)
+    assert second.headers['etag'] != first.headers['etag']
+    assert sorted(h['name'] for h in second.json()) == [
+        'Independence Day', 'Second Holiday']
+
+    revalidated = client.get(
+        URL, headers={'If-None-Match': second.headers['etag']})
+    assert revalidated.status_code == 304
@@ -0,0 +1,54 @@
+from typing import Any, List, Tuple
+
+from sqlalchemy import event
+
+from holiday_api import database
+from holiday_api.routers.holidays.repository import (
+    SQLAlchemyHolidayRepository, date_range)
+
+
+def capture_statements(run: Any) -> List[Tuple[str, Any]]:
+    statements: List[Tuple[str, Any]] = []
+
+    def before_cursor_execute(
+            _conn: Any, _cursor: Any, statement: str, parameters: Any,
+            _context: Any, _executemany: bool) -> None:
+        statements.append((statement, parameters))
+
+    event.listen(database.engine, 'before_cursor_execute',
+                 before_cursor_execute)
+    try:
+        run()
+    finally:
+        event.remove(database.engine, 'before_cursor_execute',
+                     before_cursor_execute)
+    return statements
+
+
+def query_plan(statement: str, parameters: Any) -> List[str]:
+    connection = database.engine.raw_connection()
+    try:
+        cursor = connection.cursor()
+        cursor.execute(f'EXPLAIN QUERY PLAN {statement}', parameters)
+        return [row[-1] for row in cursor.fetchall()]
+    finally:
+        connection.close()
+
+
+def test_country_date_range_query_uses_index() -> None:
+    uow = database.UnitOfWork()
+    repo = SQLAlchemyHolidayRepository(uow)
+    try:
+        statements = capture_statements(
+            lambda: repo._query_holidays(  # pylint: disable=protected-access
+                'PL', *date_range(2021, 12)))
+    finally:
+        uow.close()
+
+    (statement, parameters), = statements
+    plan = query_plan(statement, parameters)
+
+    assert any('USING INDEX ix_holidays_country_date' in step
+               for step in plan), plan
+    assert not any(step.startswith('SCAN') and 'holidays' in step
+                   and 'INDEX' not in step for step in plan), plan
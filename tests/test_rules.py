@@ -0,0 +1,86 @@
+import datetime
+from typing import Any, List, Optional
+
+import pytest
+
+from holiday_api.routers.rules.expansion import (Rule, easter_sunday, expand,
+                                                 nth_weekday)
+
+
+def make_rule(id_: int, kind: str, **fields: Any) -> Rule:
+    values: Any = dict(
+        id=id_, name=f'Rule {id_}', country='GB', public=True, kind=kind,
+        month=None, day=None, weekday=None, nth=None, offset=None,
+        observed='none', year_from=None, year_to=None)
+    values.update(fields)
+    return Rule(**values)
+
+
+def dates(rules: List[Rule], year: int) -> List[Any]:
+    return [(holiday.id, holiday.date) for holiday in expand(rules, year)]
+
+
+@pytest.mark.parametrize('year, month, day', [
+    (2010, 4, 4),
+    (2011, 4, 24),
+    (2016, 3, 27),
+    (2019, 4, 21),
+    (2022, 4, 17),
+    (2024, 3, 31),
+    (2038, 4, 25),
+])
+def test_easter_sunday(year: int, month: int, day: int) -> None:
+    assert easter_sunday(year) == datetime.date(year, month, day)
+
+
+@pytest.mark.parametrize('month, weekday, nth, expected', [
+    # Fourth Thursday of November
+    (11, 3, 4, datetime.date(2021, 11, 25)),
+    # Last Monday of May
+    (5, 0, -1, datetime.date(2021, 5, 31)),
+    # Last Friday of December is the last day of the month
+    (12, 4, -1, datetime.date(2021, 12, 31)),
+    # February 2021 has no fifth Monday
+    (2, 0, 5, None),
+])
+def test_nth_weekday(
+    month: int,
+    weekday: int,
+    nth: int,
+    expected: Optional[datetime.date],
+) -> None:
+    assert nth_weekday(2021, month, weekday, nth) == expected
+
+
+def test_easter_offset_rule() -> None:
+    easter_monday = make_rule(1, 'easter', offset=1)
+
+    assert dates([easter_monday], 2021) == [(1, datetime.date(2021, 4, 5))]
+
+
+def test_observed_collision_moves_to_next_free_weekday() -> None:
+    christmas = make_rule(
+        1, 'fixed', month=12, day=25, observed='next_weekday')
+    boxing_day = make_rule(
+        2, 'fixed', month=12, day=26, observed='next_weekday')
+
+    # Saturday and Sunday both shift to Monday 27 December.
+    assert dates([christmas, boxing_day], 2021) == [
+        (1, datetime.date(2021, 12, 27)),
+        (2, datetime.date(2021, 12, 28)),
+    ]
+    # Christmas shifts from Sunday onto Boxing Day, a Monday.
+    assert dates([christmas, boxing_day], 2022) == [
+        (2, datetime.date(2022, 12, 26)),
+        (1, datetime.date(2022, 12, 27)),
+    ]
+
+
+def test_rule_is_observed_once_a_year() -> None:
+    new_year = make_rule(
+        1, 'fixed', month=1, day=1, observed='nearest_weekday')
+
+    # 1 January 2022 is a Saturday, observed on 31 December 2021.
+    assert dates([new_year], 2021) == [(1, datetime.date(2021, 1, 1))]
+    assert dates([new_year], 2022) == []
+    assert dates([new_year], 2023) == [(1, datetime.date(2023, 1, 2))]
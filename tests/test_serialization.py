@@ -0,0 +1,128 @@
+from typing import Dict, List, Optional, Tuple
+
+import pytest
+from fastapi.testclient import TestClient
+
+from holiday_api import config, database, models
+
+Auth = Tuple[str, str]
+
+HEADERS = ('etag', 'last-modified', 'link', 'x-next-cursor', 'content-type')
+
+HOLIDAYS = [
+    ('Nowy Rok', '2021-01-01', True),
+    ('Święto Pracy', '2021-05-01', True),
+    ('Boże Ciało', '2021-06-03', False),
+    ('元日 "quoted" \\ backslash', '2021-06-03', False),
+    ('Wigilia', '2021-12-24', False),
+]
+
+USERS = [('Zoë', 'Ørsted', 'zoe'), ('Łukasz', 'Żółć', 'lukasz'),
+         ('José', 'Núñez', 'jose')]
+
+
+@pytest.fixture
+def holidays(client: TestClient, admin: Auth) -> None:
+    for name, date, public in HOLIDAYS:
+        response = client.post('/holidays', auth=admin, json={
+            'name': name, 'date': date, 'public': public, 'country': 'PL'})
+        assert response.status_code == 201
+
+
+@pytest.fixture
+def users(admin: Auth) -> None:
+    session = database.SessionLocal()
+    try:
+        for first_name, last_name, username in USERS:
+            user = models.User(first_name=first_name, last_name=last_name,
+                               username=username)
+            user.set_password(username)
+            session.add(user)
+        session.commit()
+    finally:
+        session.close()
+
+
+def fetch(
+    client: TestClient,
+    url: str,
+    auth: Optional[Auth],
+    fast: bool,
+    monkeypatch: pytest.MonkeyPatch,
+) -> Tuple[int, bytes, Dict[str, Optional[str]]]:
+    monkeypatch.setattr(config, 'FAST_JSON_RESPONSES', fast)
+    response = client.get(url, auth=auth)
+    headers = {name: response.headers.get(name) for name in HEADERS}
+    return response.status_code, response.content, headers
+
+
+def follow_pages(
+    client: TestClient,
+    url: str,
+    auth: Optional[Auth],
+    fast: bool,
+    monkeypatch: pytest.MonkeyPatch,
+) -> List[Tuple[int, bytes, Dict[str, Optional[str]]]]:
+    pages = []
+    next_url: Optional[str] = url
+    while next_url:
+        page = fetch(client, next_url, auth, fast, monkeypatch)
+        pages.append(page)
+        next_url = None
+        if link := page[2]['link']:
+            next_url = link[1:link.index('>')]
+    return pages
+
+
+@pytest.mark.parametrize('url', [
+    '/holidays?country=PL&year=2021',
+    '/holidays?country=PL&year=2021&paginate=false',
+    '/holidays?country=PL&year=2021&month=6',
+    '/holidays?country=PL&year=2021&public=false',
+    '/holidays?country=PL&year=2021&limit=2',
+])
+@pytest.mark.usefixtures('holidays')
+def test_holidays_fast_path_matches_models(
+    client: TestClient,
+    monkeypatch: pytest.MonkeyPatch,
+    url: str,
+) -> None:
+    fast = follow_pages(client, url, None, True, monkeypatch)
+    slow = follow_pages(client, url, None, False, monkeypatch)
+
+    assert fast == slow
+    assert all(status == 200 for status, _, _ in fast)
+
+
+@pytest.mark.parametrize('url', [
+    '/users',
+    '/users?paginate=false',
+    '/users?limit=2',
+])
+@pytest.mark.usefixtures('users')
+def test_users_fast_path_matches_models(
+    client: TestClient,
+    admin: Auth,
+    monkeypatch: pytest.MonkeyPatch,
+    url: str,
+) -> None:
+    fast = follow_pages(client, url, admin, True, monkeypatch)
+    slow = follow_pages(client, url, admin, False, monkeypatch)
+
+    assert fast == slow
+    assert all(status == 200 for status, _, _ in fast)
+
+
+@pytest.mark.usefixtures('holidays')
+def test_paginated_holidays_are_split_across_pages(
+    client: TestClient,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    pages = follow_pages(client, '/holidays?country=PL&year=2021&limit=2',
+                         None, True, monkeypatch)
+
+    assert len(pages) == 3
+    assert pages[0][2]['x-next-cursor'] is not None
+    assert pages[0][2]['etag'] is not None
+    assert 'Święto Pracy'.encode() in pages[0][1]
+    assert pages[-1][2]['link'] is None
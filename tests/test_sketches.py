@@ -0,0 +1,70 @@
+import datetime
+from typing import Iterator, List
+
+import pytest
+from sqlalchemy.orm import Session
+
+from holiday_api import database, models
+from holiday_api.stats import (HyperLogLog, UniqueUsersCollector,
+                               UniqueUsersSketches)
+from holiday_api.stats.sketches import ALL_TIME
+
+IP_ADDRESSES = [f'10.0.{i // 256}.{i % 256}' for i in range(5000)]
+
+
+def sketch_of(values: List[str], precision: int) -> HyperLogLog:
+    sketch = HyperLogLog(precision)
+    for value in values:
+        sketch.add(value)
+    return sketch
+
+
+@pytest.fixture
+def session() -> Iterator[Session]:
+    session = database.SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+def store(session: Session, period: str, registers: bytes) -> None:
+    session.add(models.UniqueUsersSketch(period=period, registers=registers))
+    session.commit()
+
+
+@pytest.mark.parametrize('precision', [4, 10, 12])
+def test_fold_matches_sketch_built_at_lower_precision(precision: int) -> None:
+    folded = sketch_of(IP_ADDRESSES, 14).fold(precision)
+
+    assert folded.registers == sketch_of(IP_ADDRESSES, precision).registers
+
+
+def test_fold_to_higher_precision_is_rejected() -> None:
+    with pytest.raises(ValueError):
+        HyperLogLog(10).fold(12)
+
+
+@pytest.mark.parametrize('stored, configured', [(12, 14), (14, 12)])
+def test_count_across_precision_change(
+    session: Session,
+    stored: int,
+    configured: int,
+) -> None:
+    store(session, 'day:2021-01-01',
+          sketch_of(IP_ADDRESSES[:3000], stored).to_bytes())
+    sketches = UniqueUsersSketches(session, precision=configured)
+    sketches.update_many(
+        {ip_address: 1 for ip_address in IP_ADDRESSES[2000:]},
+        day=datetime.date(2021, 1, 1))
+
+    expected = sketch_of(IP_ADDRESSES, min(stored, configured)).count()
+    assert sketches.count(['day:2021-01-01', ALL_TIME]) == expected
+    assert abs(expected - len(IP_ADDRESSES)) < 0.05 * len(IP_ADDRESSES)
+
+
+def test_collector_skips_unreadable_sketches(session: Session) -> None:
+    store(session, ALL_TIME, b'\x00' * 3)
+    collector = UniqueUsersCollector(UniqueUsersSketches, ttl=0)
+
+    assert list(collector.collect()) == []
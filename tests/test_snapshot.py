@@ -0,0 +1,167 @@
+import datetime
+import pathlib
+from typing import List, Tuple
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import func
+
+from holiday_api import database, models
+from holiday_api.main import app
+from holiday_api.routers.holidays.repository import (
+    SnapshotHolidayRepository, SQLAlchemyHolidayRepository)
+from holiday_api.snapshot import (Snapshot, SnapshotError, SnapshotHoliday,
+                                  SnapshotStore, build_snapshot,
+                                  write_snapshot)
+
+Auth = Tuple[str, str]
+
+
+def compile_snapshot(path: pathlib.Path) -> None:
+    session = database.SessionLocal()
+    try:
+        data = build_snapshot(session)
+    finally:
+        session.close()
+    write_snapshot(data, str(path))
+
+
+def add_holiday(name: str, date: datetime.date, country: str) -> None:
+    session = database.SessionLocal()
+    try:
+        session.add(models.Holiday(
+            name=name, date=date, public=True, country=country,
+            updated_at=datetime.datetime(2021, 1, 1)))
+        session.commit()
+    finally:
+        session.close()
+
+
+def stored_holidays() -> List[SnapshotHoliday]:
+    session = database.SessionLocal()
+    try:
+        return [
+            SnapshotHoliday(holiday.id, holiday.name, holiday.date,
+                            holiday.public, holiday.country,
+                            holiday.updated_at)
+            for holiday in session.query(models.Holiday).order_by(
+                models.Holiday.id)
+        ]
+    finally:
+        session.close()
+
+
+def test_snapshot_round_trip(
+    client: TestClient,
+    admin: Auth,
+    tmp_path: pathlib.Path,
+) -> None:
+    for name, date, public, country in [
+            ('Nowy Rok', '2021-01-01', True, 'PL'),
+            ('Wigilia', '2021-12-24', False, 'PL'),
+            ('Nowy Rok', '2022-01-01', True, 'PL'),
+            ('Trzech Króli', '2021-01-06', True, 'PL'),
+            ('元日', '2021-01-01', True, 'JP'),
+            ('Neujahr', '2020-01-01', True, 'DE')]:
+        response = client.post('/holidays', auth=admin, json={
+            'name': name, 'date': date, 'public': public,
+            'country': country})
+        assert response.status_code == 201
+        last_id = response.json()['id']
+    # The emptied DE 2020 partition keeps its version.
+    assert client.delete(
+        f'/holidays/x?id={last_id}', auth=admin).status_code == 204
+    path = tmp_path / 'holidays.snapshot'
+    compile_snapshot(path)
+
+    snapshot = Snapshot(str(path))
+
+    holidays = stored_holidays()
+    assert list(snapshot.iter_holidays()) == holidays
+    for holiday in holidays:
+        assert snapshot.holiday(holiday.id) == holiday
+    assert snapshot.holiday(last_id) is None
+    assert snapshot.holidays('PL', 2021) == sorted(
+        (holiday for holiday in holidays
+         if holiday.country == 'PL' and holiday.date.year == 2021),
+        key=lambda holiday: (holiday.date, holiday.id))
+    assert [holiday.name for holiday in snapshot.country_holidays('PL')] \
+        == ['Nowy Rok', 'Trzech Króli', 'Wigilia', 'Nowy Rok']
+    assert snapshot.holidays('JP', 2022) == []
+    session = database.SessionLocal()
+    try:
+        for version in session.query(models.HolidayPartitionVersion):
+            partition = snapshot.partition(version.country, version.year)
+            assert partition is not None
+            assert (partition.version, partition.updated_at) == (
+                version.version, version.updated_at)
+        assert snapshot.sequence == session.query(
+            func.max(models.HolidayChange.sequence)).scalar()
+    finally:
+        session.close()
+    assert snapshot.partition('DE', 2020).size == 0  # type: ignore
+    assert snapshot.partition('CZ', 2021) is None
+
+
+@pytest.mark.parametrize('content', [b'', b'HOLSNAP', b'x' * 4096])
+def test_invalid_files_raise_snapshot_error(
+    tmp_path: pathlib.Path,
+    content: bytes,
+) -> None:
+    path = tmp_path / 'holidays.snapshot'
+    path.write_bytes(content)
+
+    with pytest.raises(SnapshotError):
+        Snapshot(str(path))
+
+
+def test_truncated_file_raises_snapshot_error(tmp_path: pathlib.Path) -> None:
+    add_holiday('Święto Pracy', datetime.date(2021, 5, 1), 'PL')
+    path = tmp_path / 'holidays.snapshot'
+    compile_snapshot(path)
+    path.write_bytes(path.read_bytes()[:-4])
+
+    with pytest.raises(SnapshotError):
+        Snapshot(str(path))
+
+
+def test_store_keeps_previous_snapshot_when_replacement_is_bad(
+    tmp_path: pathlib.Path,
+) -> None:
+    path = tmp_path / 'holidays.snapshot'
+    compile_snapshot(path)
+    store = SnapshotStore(str(path), check_interval=0)
+    loaded = store.get()
+
+    empty = tmp_path / 'empty'
+    empty.write_bytes(b'')
+    empty.replace(path)
+
+    assert store.get() is loaded
+
+
+@pytest.fixture
+def read_only(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setitem(app.dependency_overrides,
+                        SQLAlchemyHolidayRepository, SnapshotHolidayRepository)
+
+
+@pytest.mark.usefixtures('read_only')
+def test_materialize_is_rejected_on_read_only_node(
+    client: TestClient,
+    admin: Auth,
+) -> None:
+    response = client.post('/rules', auth=admin, json={
+        'name': 'Nowy Rok', 'country': 'PL', 'public': True,
+        'kind': 'fixed', 'month': 1, 'day': 1})
+    assert response.status_code == 201
+
+    response = client.post('/rules/materialize', auth=admin, json={
+        'country': 'PL', 'year_from': 2021, 'year_to': 2022})
+
+    assert response.status_code == 405
+    session = database.SessionLocal()
+    try:
+        assert session.query(models.Holiday).count() == 0
+    finally:
+        session.close()
@@ -0,0 +1,31 @@
+import asyncio
+from typing import List
+
+import pytest
+from fastapi import Request, Response
+from starlette.background import BackgroundTask
+
+from holiday_api import database
+from holiday_api.main import manage_unit_of_work
+
+
+def test_closing_the_unit_of_work_keeps_response_background_task(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    calls: List[str] = []
+    monkeypatch.setattr(
+        database.UnitOfWork, 'close', lambda self: calls.append('close'))
+
+    async def call_next(request: Request) -> Response:
+        return Response(
+            background=BackgroundTask(calls.append, 'response task'))
+
+    async def handle() -> None:
+        request = Request({'type': 'http', 'headers': [], 'client': None})
+        response = await manage_unit_of_work(request, call_next)
+        assert response.background is not None
+        await response.background()
+
+    asyncio.run(handle())
+
+    assert calls == ['response task', 'close']